@@ -0,0 +1,49 @@
+# benchmark_carga_paralela.py
+# Mede a escalabilidade da carga paralela de 1 até N processos de leitura.
+# Uso: python benchmark_carga_paralela.py [qtd_arquivos] [copias_por_arquivo] [max_processos]
+import os
+import sys
+import tempfile
+import pandas as pd
+from sqlalchemy import create_engine
+from conexao_sqlalchemy import Base
+from carga_paralela import carregar_arquivos_em_paralelo
+
+def gerar_arquivos(diretorio: str, qtd_arquivos: int, copias_por_arquivo: int, base_csv: str = "interacoes_globo.csv"):
+   """Replica o CSV de exemplo em vários arquivos, deslocando os ids de usuário"""
+   base = pd.read_csv(base_csv)
+   for numero in range(qtd_arquivos):
+      partes = []
+      for copia in range(copias_por_arquivo):
+         parte = base.copy()
+         parte["id_usuario"] += (numero * copias_por_arquivo + copia) * 10_000
+         partes.append(parte)
+      pd.concat(partes).to_csv(os.path.join(diretorio, f"interacoes_{numero:03d}.csv"), index=False)
+
+def executar_benchmark(qtd_arquivos: int = 8, copias_por_arquivo: int = 500, max_processos: int = None):
+   max_processos = max_processos or os.cpu_count()
+   resultados = []
+
+   with tempfile.TemporaryDirectory() as diretorio:
+      gerar_arquivos(diretorio, qtd_arquivos, copias_por_arquivo)
+
+      for processos in range(1, max_processos + 1):
+         # SQLite aceita um único escritor por vez, então a escrita usa uma conexão
+         engine = create_engine(f"sqlite:///{os.path.join(diretorio, f'bench_{processos}.db')}")
+         Base.metadata.create_all(engine)
+         resultado = carregar_arquivos_em_paralelo(diretorio, engine=engine, processos=processos, conexoes_escrita=1)
+         resultados.append((processos, resultado["segundos"], resultado["linhas_por_segundo"]))
+         engine.dispose()
+
+   print("\n⏱️ Escalabilidade da carga paralela:")
+   base_segundos = resultados[0][1]
+   for processos, segundos, linhas_por_segundo in resultados:
+      print(f"- {processos} processo(s): {segundos:8.2f}s  {linhas_por_segundo:12,.0f} linhas/s  "
+            f"speedup {base_segundos / segundos:5.2f}x")
+   return resultados
+
+if __name__ == "__main__":
+   qtd_arquivos = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+   copias = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+   max_processos = int(sys.argv[3]) if len(sys.argv) > 3 else None
+   executar_benchmark(qtd_arquivos, copias, max_processos)
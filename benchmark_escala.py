@@ -0,0 +1,152 @@
+# benchmark_escala.py
+# Carga e relatórios em escala com dados sintéticos (gerador_dados), em um ou mais bancos.
+# Grava uma linha JSON por medição (carga e cada relatório), com o commit atual, para
+# comparar resultados entre versões do código.
+# Uso: python benchmark_escala.py --linhas 1e6 [--banco sqlite] [--banco mysql+mysqlconnector://.../globo_tech_benchmark]
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from sqlalchemy import create_engine, event
+from conexao_sqlalchemy import Base, consultas, criar_database_if_not_exists
+from carga_dados import carregar_dados_em_lotes, LINHAS_POR_LOTE_PADRAO
+from relatorios import ler_relatorio
+from gerador_dados import salvar_interacoes
+from benchmark_memoria_carga import zerar_pico_rss, rss_mb
+
+ARQUIVO_RESULTADOS = "resultados_benchmark.jsonl"
+
+def _commit_atual():
+   try:
+      return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                            check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+   except (OSError, subprocess.CalledProcessError):
+      return None
+
+def _sec_to_time(segundos):
+   # Equivalente ao SEC_TO_TIME do MySQL, para os relatórios rodarem também no SQLite
+   if segundos is None:
+      return None
+   horas, resto = divmod(float(segundos), 3600)
+   minutos, segundos = divmod(resto, 60)
+   return f"{int(horas):02d}:{int(minutos):02d}:{segundos:07.4f}"
+
+def preparar_banco(url: str):
+   """Engine com o schema recriado do zero; fora do SQLite, só aceita bancos dedicados ao benchmark"""
+   engine = create_engine(url)
+   if engine.dialect.name == "sqlite":
+      event.listen(engine, "connect", lambda conexao, _: conexao.create_function("SEC_TO_TIME", 1, _sec_to_time))
+   else:
+      if "benchmark" not in (engine.url.database or ""):
+         raise ValueError(f"O benchmark recria as tabelas; use um banco dedicado (nome com 'benchmark'), "
+                          f"não '{engine.url.database}'")
+      criar_database_if_not_exists(engine.url.username, engine.url.password,
+                                   f"{engine.url.host}:{engine.url.port or 3306}", engine.url.database)
+   Base.metadata.drop_all(engine)
+   Base.metadata.create_all(engine)
+   return engine
+
+def _medir_carga(engine, csv_path: str, linhas_por_lote: int) -> dict:
+   zerar_pico_rss()
+   base, _ = rss_mb()
+   inicio = time.perf_counter()
+   inseridas = carregar_dados_em_lotes(csv_path, engine=engine, linhas_por_lote=linhas_por_lote)
+   segundos = time.perf_counter() - inicio
+   return {
+      "etapa": "carga",
+      "linhas_inseridas": inseridas,
+      "segundos": segundos,
+      "linhas_por_segundo": inseridas / segundos if segundos else 0.0,
+      "pico_rss_mb": rss_mb()[1] - base,
+   }
+
+def _medir_relatorio(engine, nome: str, query_sql: str, repeticoes: int) -> dict:
+   zerar_pico_rss()
+   base, _ = rss_mb()
+   latencias = []
+   for _ in range(repeticoes):
+      inicio = time.perf_counter()
+      df = ler_relatorio(query_sql, engine, usar_cache=False)
+      latencias.append((time.perf_counter() - inicio) * 1000)
+   return {
+      "etapa": "relatorio",
+      "relatorio": nome,
+      "linhas_resultado": len(df),
+      "repeticoes": repeticoes,
+      "p50_ms": float(np.percentile(latencias, 50)),
+      "p95_ms": float(np.percentile(latencias, 95)),
+      "max_ms": max(latencias),
+      "pico_rss_mb": rss_mb()[1] - base,
+   }
+
+def executar_benchmark(linhas: int = 1_000_000, bancos: list = None, repeticoes: int = 5, semente: int = 42,
+                       linhas_por_lote: int = LINHAS_POR_LOTE_PADRAO, saida: str = ARQUIVO_RESULTADOS) -> list:
+   """Gera `linhas` interações, carrega em cada banco e mede todos os relatórios de `consultas`.
+
+   Cada medição vira uma linha JSON em `saida` (acrescentada ao arquivo), com
+   commit, banco e volume, para comparação entre execuções.
+   """
+   comum = {
+      "commit": _commit_atual(),
+      "executado_em": datetime.now().isoformat(timespec="seconds"),
+      "linhas": linhas,
+      "semente": semente,
+   }
+   resultados = []
+
+   with tempfile.TemporaryDirectory() as diretorio:
+      csv_path = os.path.join(diretorio, "interacoes.csv")
+      geracao = salvar_interacoes(csv_path, linhas, semente=semente)
+      print(f"✅ {linhas:,} interações geradas em {geracao['segundos']:.2f}s")
+
+      for url in bancos or ["sqlite"]:
+         if url == "sqlite":
+            url = f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}"
+         engine = preparar_banco(url)
+         with engine.connect() as conn:
+            versao = ".".join(str(parte) for parte in conn.dialect.server_version_info or ())
+         banco = {**comum, "banco": engine.dialect.name, "versao_servidor": versao}
+
+         medicoes = [_medir_carga(engine, csv_path, linhas_por_lote)]
+         for nome, query_sql in sorted(consultas.items()):
+            try:
+               medicoes.append(_medir_relatorio(engine, nome, query_sql, repeticoes))
+            except Exception as e:
+               medicoes.append({"etapa": "relatorio", "relatorio": nome, "erro": str(e)})
+         resultados += [{**banco, **medicao} for medicao in medicoes]
+         engine.dispose()
+
+   with open(saida, "a", encoding="utf-8") as arquivo:
+      for resultado in resultados:
+         arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+   print(f"\n⏱️ Benchmark em escala ({linhas:,} linhas, commit {comum['commit']}):")
+   for resultado in resultados:
+      if resultado["etapa"] == "carga":
+         print(f"- [{resultado['banco']}] carga: {resultado['linhas_por_segundo']:,.0f} linhas/s, "
+               f"pico {resultado['pico_rss_mb']:.0f} MiB")
+      elif "erro" in resultado:
+         print(f"- [{resultado['banco']}] ❌ {resultado['relatorio']}: {resultado['erro']}")
+      else:
+         print(f"- [{resultado['banco']}] {resultado['relatorio']}: p50 {resultado['p50_ms']:.1f} ms, "
+               f"p95 {resultado['p95_ms']:.1f} ms")
+   print(f"📊 {len(resultados)} medições acrescentadas a {saida}")
+   return resultados
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Benchmark de carga e relatórios com dados sintéticos")
+   parser.add_argument("--linhas", type=float, default=1_000_000)
+   parser.add_argument("--banco", action="append", default=None,
+                       help="URL do banco (repetível); 'sqlite' usa um arquivo temporário. Padrão: sqlite")
+   parser.add_argument("--repeticoes", type=int, default=5, help="Execuções de cada relatório")
+   parser.add_argument("--semente", type=int, default=42)
+   parser.add_argument("--linhas-por-lote", type=int, default=LINHAS_POR_LOTE_PADRAO)
+   parser.add_argument("--saida", default=ARQUIVO_RESULTADOS)
+   args = parser.parse_args()
+
+   executar_benchmark(int(args.linhas), args.banco, args.repeticoes, args.semente, args.linhas_por_lote, args.saida)
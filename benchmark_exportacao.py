@@ -0,0 +1,57 @@
+# benchmark_exportacao.py
+# Tempo de exportação e tamanho do arquivo por formato e compressão.
+# Uso: python benchmark_exportacao.py [qtd_linhas] [url_banco]
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from exportacao import exportar_relatorio
+
+# (extensão, compressão) de cada cenário medido
+CENARIOS = [
+   (".csv", None),
+   (".csv.gz", None),
+   (".parquet", "none"),
+   (".parquet", "snappy"),
+   (".parquet", "zstd"),
+   (".parquet", "gzip"),
+   (".feather", "uncompressed"),
+   (".feather", "lz4"),
+   (".feather", "zstd"),
+]
+
+def _gerar_resultado(qtd_linhas: int) -> pd.DataFrame:
+   # Formato parecido com comentarios_por_conteudo: id, nome e contagem
+   rng = np.random.default_rng(42)
+   ids = np.arange(1, qtd_linhas + 1)
+   return pd.DataFrame({
+      "id_conteudo": ids,
+      "nome_conteudo": [f"Conteúdo {i % 5000}" for i in ids],
+      "quantidade_comentarios": rng.zipf(1.5, qtd_linhas).clip(max=1_000_000),
+   })
+
+def executar_benchmark(qtd_linhas: int = 1_000_000, url: str = None):
+   with tempfile.TemporaryDirectory() as diretorio:
+      engine = create_engine(url or f"sqlite:///{os.path.join(diretorio, 'bench.db')}")
+      _gerar_resultado(qtd_linhas).to_sql("bench_exportacao", engine, index=False, if_exists="replace", chunksize=50_000)
+      query_sql = "SELECT * FROM bench_exportacao ORDER BY quantidade_comentarios DESC"
+
+      resultados = []
+      for extensao, compressao in CENARIOS:
+         caminho = os.path.join(diretorio, f"saida_{compressao or 'padrao'}{extensao}")
+         resultado = exportar_relatorio(query_sql, engine, caminho, compressao=compressao)
+         resultados.append({**resultado, "extensao": extensao})
+      engine.dispose()
+
+   print(f"\n⏱️ Exportação de {qtd_linhas} linhas:")
+   for r in resultados:
+      print(f"- {r['extensao']:<9} {str(r['compressao']):<13} {r['segundos']:7.2f}s  "
+            f"{r['bytes'] / 1024 / 1024:8.2f} MiB  {r['linhas'] / r['segundos']:12,.0f} linhas/s")
+   return resultados
+
+if __name__ == "__main__":
+   qtd = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+   url = sys.argv[2] if len(sys.argv) > 2 else None
+   executar_benchmark(qtd, url)
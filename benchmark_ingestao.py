@@ -0,0 +1,87 @@
+# benchmark_ingestao.py
+# Latência evento → consultável do serviço de ingestão contínua com carga constante, para alguns
+# limites de micro-lote, e eventos/s sustentados com os clientes enviando o mais rápido possível
+# (com a fila pequena, a backpressure segura os clientes). Eventos sintéticos (gerador_dados) pelo socket.
+# Uso: python benchmark_ingestao.py [eventos] [eventos_por_segundo] [url_banco]
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from benchmark_escala import preparar_banco
+from gerador_dados import gerar_interacoes
+from ingestao_continua import ServicoIngestao
+
+CLIENTES = 4
+EVENTOS_POR_ENVIO = 100
+# (máximo de eventos, espera máxima em segundos) das rodadas com carga constante
+CONFIGURACOES = [(500, 0.1), (2000, 0.5), (5000, 1.0)]
+CAPACIDADE_SEM_LIMITE = 10_000
+
+def _linhas_json(eventos: int, semente: int) -> list:
+   linhas = []
+   for bloco in gerar_interacoes(eventos, semente=semente):
+      bloco = bloco.assign(timestamp_interacao=bloco["timestamp_interacao"].dt.strftime("%Y-%m-%d %H:%M:%S"))
+      linhas.extend(bloco.to_dict("records"))
+   return [{chave: (None if valor is None or valor != valor else valor) for chave, valor in linha.items()}
+           for linha in linhas]
+
+def _cliente(endereco, eventos: list, eventos_por_segundo: float = None):
+   intervalo = EVENTOS_POR_ENVIO / eventos_por_segundo if eventos_por_segundo else 0.0
+   proximo = time.monotonic()
+   with socket.create_connection(endereco) as conexao:
+      for inicio in range(0, len(eventos), EVENTOS_POR_ENVIO):
+         proximo += intervalo
+         agora = time.time()
+         dados = "".join(json.dumps({**evento, "enviado_em": agora}, default=int) + "\n"
+                         for evento in eventos[inicio:inicio + EVENTOS_POR_ENVIO])
+         conexao.sendall(dados.encode())
+         time.sleep(max(0.0, proximo - time.monotonic()))
+
+def _rodada(url: str, por_cliente: list, max_eventos: int, max_espera: float, eventos_por_segundo: float = None,
+            capacidade: int = None) -> dict:
+   with tempfile.TemporaryDirectory() as diretorio:
+      engine = preparar_banco(url or f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}")
+      opcoes = {"capacidade": capacidade} if capacidade else {}
+      servico = ServicoIngestao(engine, porta=0, max_eventos=max_eventos, max_espera=max_espera,
+                                intervalo_metricas=3600, intervalo_compactacao=3600, **opcoes)
+      servico.iniciar()
+      gravacao = threading.Thread(target=servico.executar)
+      gravacao.start()
+      taxa_cliente = eventos_por_segundo / len(por_cliente) if eventos_por_segundo else None
+      envios = [threading.Thread(target=_cliente, args=(servico.endereco, lote, taxa_cliente)) for lote in por_cliente]
+      for envio in envios:
+         envio.start()
+      for envio in envios:
+         envio.join()
+      # Espera a fila esvaziar antes de encerrar, para medir só o regime contínuo
+      while sum(servico.metricas()[c] for c in ("gravados", "descartados")) < sum(map(len, por_cliente)):
+         time.sleep(0.05)
+      servico.parar()
+      gravacao.join()
+      engine.dispose()
+      return servico.metricas()
+
+def _imprimir(rotulo: str, m: dict):
+   print(f"{rotulo:<26} {m['eventos_por_segundo']:>10,.0f} {m['latencia_p50'] * 1000:>7.0f}ms "
+         f"{m['latencia_p95'] * 1000:>7.0f}ms {m['latencia_max'] * 1000:>7.0f}ms {m['lotes']:>7} "
+         f"{m['segundos_fila_cheia']:>10.1f}s")
+
+def executar_benchmark(eventos: int = 100_000, eventos_por_segundo: float = 1000, url: str = None):
+   por_cliente = [_linhas_json(eventos // CLIENTES, semente) for semente in range(CLIENTES)]
+   print(f"\n⏱️ Ingestão contínua de {eventos:,} eventos por {CLIENTES} clientes ({url or 'sqlite'}):")
+   print(f"{'rodada':<26} {'eventos/s':>10} {'p50':>9} {'p95':>9} {'máx':>9} {'lotes':>7} {'fila cheia':>11}")
+   for max_eventos, max_espera in CONFIGURACOES:
+      m = _rodada(url, por_cliente, max_eventos, max_espera, eventos_por_segundo)
+      _imprimir(f"{eventos_por_segundo:,.0f}/s, {max_eventos} / {max_espera}s", m)
+   m = _rodada(url, por_cliente, 5000, 1.0, capacidade=CAPACIDADE_SEM_LIMITE)
+   _imprimir("sem limite, 5000 / 1.0s", m)
+
+
+if __name__ == "__main__":
+   eventos = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+   eventos_por_segundo = float(sys.argv[2]) if len(sys.argv) > 2 else 1000
+   url = sys.argv[3] if len(sys.argv) > 3 else None
+   executar_benchmark(eventos, eventos_por_segundo, url)
@@ -0,0 +1,57 @@
+# benchmark_inicializacao.py
+# Tempo até o primeiro relatório: inicialização antiga (engine nova + bootstrap a cada chamada)
+# contra a engine memoizada com pool.
+# Uso: python benchmark_inicializacao.py [repeticoes] [url_banco]
+import statistics
+import sys
+import time
+import pandas as pd
+from sqlalchemy import create_engine, text
+from conexao_sqlalchemy import Base, consultas, montar_url_mysql, obter_engine, descartar_engines, criar_database_if_not_exists
+
+def _inicializacao_antiga(url: str, query_sql: str):
+   # Reproduz o criar_engine_mysql anterior (sem echo, para não poluir a saída)
+   engine = create_engine(url)
+   if engine.dialect.name == "mysql":
+      criar_database_if_not_exists(engine.url.username, engine.url.password,
+                                   f"{engine.url.host}:{engine.url.port or 3306}", engine.url.database)
+      with engine.connect() as conn:
+         existe = conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_schema = :banco AND table_name = 'relatorios_sql'"
+         ), {"banco": engine.url.database}).scalar()
+         if existe:
+            conn.execute(text("SELECT COUNT(*) FROM relatorios_sql")).scalar()
+   Base.metadata.create_all(engine)
+   pd.read_sql(query_sql, con=engine)
+
+def _inicializacao_nova(url: str, query_sql: str):
+   engine = obter_engine(url)
+   pd.read_sql(query_sql, con=engine)
+
+def _medir(funcao, url: str, query_sql: str, repeticoes: int) -> list:
+   tempos = []
+   for _ in range(repeticoes):
+      inicio = time.perf_counter()
+      funcao(url, query_sql)
+      tempos.append(time.perf_counter() - inicio)
+   return tempos
+
+def executar_benchmark(repeticoes: int = 20, url: str = None, query_sql: str = consultas["relatorios_sql"]):
+   url = url or montar_url_mysql()
+   Base.metadata.create_all(create_engine(url))
+
+   antiga = _medir(_inicializacao_antiga, url, query_sql, repeticoes)
+   descartar_engines()
+   nova = _medir(_inicializacao_nova, url, query_sql, repeticoes)
+
+   print(f"\n⏱️ Tempo até o primeiro relatório ({repeticoes} repetições):")
+   for nome, tempos in (("antiga (engine + bootstrap)", antiga), ("nova (engine memoizada)", nova)):
+      print(f"- {nome:<30} primeira {tempos[0] * 1000:8.1f} ms  "
+            f"mediana {statistics.median(tempos) * 1000:8.1f} ms  máx {max(tempos) * 1000:8.1f} ms")
+   return {"antiga": antiga, "nova": nova}
+
+if __name__ == "__main__":
+   repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+   url = sys.argv[2] if len(sys.argv) > 2 else None
+   executar_benchmark(repeticoes, url)
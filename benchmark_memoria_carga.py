@@ -0,0 +1,113 @@
+# benchmark_memoria_carga.py
+# Pico de memória (RSS acima do processo já inicializado) e tempo por etapa da preparação da carga:
+# pipeline antigo (strings, int64, várias cópias) contra o atual (ler_csv com categorias, ids em
+# 32 bits, leitura em blocos e filtro único).
+# Cada pipeline roda em um processo novo, para que o pico de um não contamine o outro.
+# Uso: python benchmark_memoria_carga.py [qtd_linhas]
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from carga_dados import ler_csv, validar_lote, mapear_plataformas, preparar_interacoes
+
+def gerar_csv(caminho: str, linhas: int, base_csv: str = "interacoes_globo.csv"):
+   """Replica o CSV de exemplo até `linhas` linhas, deslocando os ids de usuário"""
+   base = pd.read_csv(base_csv)
+   copias = -(-linhas // len(base))
+   df = base.loc[np.tile(base.index, copias)].head(linhas).reset_index(drop=True)
+   df["id_usuario"] += (np.arange(len(df)) // len(base)) * 10_000
+   df.to_csv(caminho, index=False)
+
+def zerar_pico_rss():
+   # Linux ≥ 4.0: zera o VmHWM, descartando o pico atingido durante os imports
+   try:
+      with open("/proc/self/clear_refs", "w") as clear_refs:
+         clear_refs.write("5")
+   except OSError:
+      pass
+
+def rss_mb() -> tuple:
+   """(RSS atual, pico de RSS do processo) em MiB"""
+   try:
+      with open("/proc/self/status") as status:
+         campos = dict(linha.split(":", 1) for linha in status)
+      return int(campos["VmRSS"].split()[0]) / 1024, int(campos["VmHWM"].split()[0]) / 1024
+   except (OSError, KeyError):
+      pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+      return pico, pico
+
+def _pipeline_antigo(caminho: str, mapa_plataformas: dict):
+   df = pd.read_csv(caminho)
+   yield "leitura", df
+   df = df.dropna(subset=["id_usuario", "id_conteudo", "plataforma"])
+   df = df[df["watch_duration_seconds"] >= 0]
+   df["tipo_interacao"] = df["tipo_interacao"].replace({"view_start": "view"})
+   yield "validação", df
+   df["id_plataforma"] = df["plataforma"].map(mapa_plataformas)
+   yield "mapeamento", df
+   df = df.rename(columns={"timestamp_interacao": "data_interacao"})
+   df["data_interacao"] = pd.to_datetime(df["data_interacao"])
+   yield "preparação", df[["id_usuario", "id_conteudo", "id_plataforma", "tipo_interacao", "data_interacao",
+                           "watch_duration_seconds"]]
+
+def _pipeline_atual(caminho: str, mapa_plataformas: dict):
+   df = ler_csv(caminho)
+   yield "leitura", df
+   df = validar_lote(df)
+   yield "validação", df
+   df["id_plataforma"] = mapear_plataformas(df["plataforma"], mapa_plataformas)
+   yield "mapeamento", df
+   yield "preparação", preparar_interacoes(df)
+
+def _medir(nome: str, caminho: str, mapa_plataformas: dict) -> list:
+   # Executado em um processo novo (spawn), com os módulos já importados: mede só os dados
+   pipeline = _pipeline_antigo if nome == "antigo" else _pipeline_atual
+   zerar_pico_rss()
+   base, _ = rss_mb()
+   etapas = []
+   inicio = time.perf_counter()
+   for etapa, df in pipeline(caminho, mapa_plataformas):
+      atual, pico = rss_mb()
+      etapas.append({
+         "pipeline": nome,
+         "etapa": etapa,
+         "segundos": time.perf_counter() - inicio,
+         "rss_mb": atual - base,
+         "pico_rss_mb": pico - base,
+         "dataframe_mb": df.memory_usage(deep=True).sum() / 2**20,
+      })
+      inicio = time.perf_counter()
+   return etapas
+
+def executar_benchmark(qtd_linhas: int = 1_000_000) -> pd.DataFrame:
+   with tempfile.TemporaryDirectory() as diretorio:
+      caminho = os.path.join(diretorio, "interacoes.csv")
+      gerar_csv(caminho, qtd_linhas)
+      plataformas = pd.read_csv(caminho, usecols=["plataforma"])["plataforma"].unique()
+      mapa_plataformas = {nome: i for i, nome in enumerate(sorted(plataformas), 1)}
+
+      etapas = []
+      contexto = multiprocessing.get_context("spawn")
+      for nome in ("antigo", "atual"):
+         with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            etapas += executor.submit(_medir, nome, caminho, mapa_plataformas).result()
+
+   resultado = pd.DataFrame(etapas)
+   print(f"\n⏱️ Preparação da carga com {qtd_linhas:,} linhas:")
+   print(resultado.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+   picos = resultado.groupby("pipeline")["pico_rss_mb"].max()
+   fator = picos["antigo"] / picos["atual"]
+   milhoes = qtd_linhas / 1_000_000
+   print(f"\n📊 Pico de RSS por milhão de linhas: antigo {picos['antigo'] / milhoes:.0f} MiB, "
+         f"atual {picos['atual'] / milhoes:.0f} MiB ({fator:.1f}x menor)")
+   return resultado
+
+if __name__ == "__main__":
+   qtd_linhas = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+   executar_benchmark(qtd_linhas)
@@ -0,0 +1,79 @@
+# benchmark_motor_colunar.py
+# Tempo do catálogo de relatórios no motor colunar em volumes sintéticos (1M, 10M, 100M interações)
+# e, com uma URL de banco, comparação com as consultas SQL sobre os dados reais desse banco.
+# Uso: python benchmark_motor_colunar.py [tamanhos separados por vírgula] [url_banco]
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from conexao_sqlalchemy import consultas
+from motor_colunar import SnapshotColunar, RELATORIOS_COLUNARES, executar_relatorios_colunar, comparar_com_sql
+
+TAMANHOS_PADRAO = (1_000_000, 10_000_000, 100_000_000)
+
+def gerar_snapshot_sintetico(linhas: int, qtd_conteudos: int = 5_000, qtd_plataformas: int = 12,
+                             semente: int = 42) -> SnapshotColunar:
+   """Snapshot aleatório, gerado direto em memória (sem passar pelo banco)"""
+   rng = np.random.default_rng(semente)
+   conteudos = pd.DataFrame({
+      "id_conteudo": np.arange(1, qtd_conteudos + 1),
+      "nome_conteudo": [f"Conteúdo {i}" for i in range(1, qtd_conteudos + 1)],
+      "tipo_conteudo": rng.choice(["Vídeo", "Podcast", "Artigo"], qtd_conteudos),
+   })
+   plataformas = pd.DataFrame({
+      "id_plataforma": np.arange(1, qtd_plataformas + 1),
+      "nome": [f"Plataforma {i}" for i in range(1, qtd_plataformas + 1)],
+   })
+   tipo_codigo = rng.choice(4, linhas, p=[0.7, 0.15, 0.05, 0.1]).astype(np.int8)
+   watch_valido = tipo_codigo == 0
+   return SnapshotColunar(
+      id_conteudo=rng.integers(1, qtd_conteudos + 1, linhas, dtype=np.int32),
+      id_plataforma=rng.integers(1, qtd_plataformas + 1, linhas, dtype=np.int32),
+      tipo_codigo=tipo_codigo,
+      watch=np.where(watch_valido, rng.integers(1, 7_200, linhas), 0),
+      watch_valido=watch_valido,
+      conteudos=conteudos,
+      plataformas=plataformas,
+   )
+
+def _medir_sql(engine) -> float:
+   inicio = time.perf_counter()
+   for nome in RELATORIOS_COLUNARES:
+      pd.read_sql(consultas[nome], con=engine)
+   return time.perf_counter() - inicio
+
+def executar_benchmark(tamanhos=TAMANHOS_PADRAO, url: str = None):
+   resultados = []
+   for linhas in tamanhos:
+      snapshot = gerar_snapshot_sintetico(linhas)
+      inicio = time.perf_counter()
+      executar_relatorios_colunar(snapshot)
+      segundos = time.perf_counter() - inicio
+      resultados.append((linhas, segundos))
+      del snapshot
+
+   print(f"\n⏱️ Motor colunar ({len(RELATORIOS_COLUNARES)} relatórios, uma varredura):")
+   for linhas, segundos in resultados:
+      print(f"- {linhas:>12,} interações  {segundos:8.3f}s  ({linhas / segundos:,.0f} linhas/s)")
+
+   if url:
+      engine = create_engine(url)
+      inicio = time.perf_counter()
+      snapshot = SnapshotColunar.do_banco(engine)
+      segundos_snapshot = time.perf_counter() - inicio
+      inicio = time.perf_counter()
+      executar_relatorios_colunar(snapshot)
+      segundos_colunar = time.perf_counter() - inicio
+      segundos_sql = _medir_sql(engine)
+      print(f"\n⏱️ Banco {engine.url.database} ({len(snapshot):,} interações):")
+      print(f"- SQL (consultas)     {segundos_sql:8.3f}s")
+      print(f"- colunar             {segundos_colunar:8.3f}s (snapshot {segundos_snapshot:.3f}s, feito uma vez)")
+      divergencias = comparar_com_sql(snapshot, engine)
+      print("✅ Resultados idênticos ao SQL." if not divergencias else f"❌ {len(divergencias)} relatório(s) divergente(s).")
+   return resultados
+
+if __name__ == "__main__":
+   tamanhos = [int(float(t)) for t in sys.argv[1].split(",")] if len(sys.argv) > 1 else TAMANHOS_PADRAO
+   url = sys.argv[2] if len(sys.argv) > 2 else None
+   executar_benchmark(tamanhos, url)
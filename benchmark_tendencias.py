@@ -0,0 +1,54 @@
+# benchmark_tendencias.py
+# Custo de uma tendência de 90 dias x uma de 1 dia, com e sem o cache de períodos fechados.
+# Usa dados sintéticos (gerador_dados) num SQLite temporário, ou uma URL de banco de benchmark.
+# Uso: python benchmark_tendencias.py [linhas] [url_banco]
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+from carga_dados import carregar_dados_em_lotes
+from gerador_dados import salvar_interacoes
+from benchmark_escala import preparar_banco
+from tendencias import TENDENCIAS, CacheTendencias, tendencia
+
+INICIO_DADOS = "2024-10-01"
+DIAS_DADOS = 120
+
+def _medir(engine, nome: str, cache: CacheTendencias, agora, ultimos_dias: int, repeticoes: int = 3) -> float:
+   opcoes = TENDENCIAS[nome]
+   por_dia = {"hora": 24, "dia": 1, "semana": 1 / 7}[opcoes["granularidade"]]
+   ultimos = max(1, int(ultimos_dias * por_dia))
+   melhor = float("inf")
+   for _ in range(repeticoes):
+      inicio = time.perf_counter()
+      tendencia(engine, cache=cache, agora=agora, ultimos=ultimos, nome=nome, **opcoes)
+      melhor = min(melhor, time.perf_counter() - inicio)
+   return melhor * 1000
+
+def executar_benchmark(linhas: int = 1_000_000, url: str = None):
+   with tempfile.TemporaryDirectory() as diretorio:
+      csv_path = os.path.join(diretorio, "interacoes.csv")
+      salvar_interacoes(csv_path, linhas, inicio=INICIO_DADOS, dias=DIAS_DADOS)
+      engine = preparar_banco(url or f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}")
+      carregar_dados_em_lotes(csv_path, engine=engine)
+      # "Agora" no meio do último dia gerado: há períodos fechados e um aberto
+      agora = pd.Timestamp(INICIO_DADOS) + pd.Timedelta(days=DIAS_DADOS - 1, hours=12)
+
+      print(f"\n⏱️ Tendências sobre {linhas:,} interações ({engine.dialect.name}), melhor de 3:")
+      print(f"{'relatório':<40} {'1 dia':>10} {'90 dias':>10} {'90 dias (cache)':>16}")
+      for nome in TENDENCIAS:
+         um_dia = _medir(engine, nome, CacheTendencias(), agora, 1, repeticoes=1)
+         # Sem cache: cada repetição começa com um cache vazio
+         frio = min(_medir(engine, nome, CacheTendencias(), agora, 90, repeticoes=1) for _ in range(3))
+         cache = CacheTendencias()
+         _medir(engine, nome, cache, agora, 90, repeticoes=1)
+         quente = _medir(engine, nome, cache, agora, 90)
+         print(f"{nome:<40} {um_dia:>8.1f}ms {frio:>8.1f}ms {quente:>14.1f}ms")
+      engine.dispose()
+
+
+if __name__ == "__main__":
+   linhas = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+   url = sys.argv[2] if len(sys.argv) > 2 else None
+   executar_benchmark(linhas, url)
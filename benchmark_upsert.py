@@ -0,0 +1,63 @@
+# benchmark_upsert.py
+# Compara o upsert linha a linha (carregamento original) com o upsert em lotes.
+# Uso: python benchmark_upsert.py [qtd_usuarios] [tamanho_lote] [url_banco]
+import sys
+import time
+from sqlalchemy import create_engine, text
+from conexao_sqlalchemy import Base
+from upsert_lotes import upsert_em_lotes, TAMANHO_LOTE_PADRAO
+
+def _upsert_linha_a_linha(conn, usuarios):
+   if conn.dialect.name == "mysql":
+      sql = text("""
+         INSERT INTO usuario (id_usuario) VALUES (:id_usuario)
+         ON DUPLICATE KEY UPDATE id_usuario = VALUES(id_usuario)
+      """)
+   else:
+      sql = text("""
+         INSERT INTO usuario (id_usuario) VALUES (:id_usuario)
+         ON CONFLICT (id_usuario) DO NOTHING
+      """)
+   for usuario in usuarios:
+      conn.execute(sql, usuario)
+
+def _medir(engine, funcao, usuarios):
+   with engine.begin() as conn:
+      conn.execute(text("DELETE FROM usuario"))
+   inicio = time.perf_counter()
+   with engine.begin() as conn:
+      funcao(conn, usuarios)
+   return time.perf_counter() - inicio
+
+def executar_benchmark(qtd_usuarios: int = 100_000, tamanho_lote: int = TAMANHO_LOTE_PADRAO, url: str = "sqlite://"):
+   engine = create_engine(url)
+   Base.metadata.create_all(engine)
+   usuarios = [{"id_usuario": uid} for uid in range(1, qtd_usuarios + 1)]
+
+   resultados = {
+      "linha_a_linha": _medir(engine, _upsert_linha_a_linha, usuarios),
+      f"lotes_{tamanho_lote}": _medir(
+         engine,
+         lambda conn, linhas: upsert_em_lotes(conn, "usuario", linhas, chaves=["id_usuario"], tamanho_lote=tamanho_lote),
+         usuarios
+      ),
+   }
+
+   # Segunda carga com as mesmas chaves: o filtro de existentes evita reenviar as linhas
+   inicio = time.perf_counter()
+   with engine.begin() as conn:
+      upsert_em_lotes(conn, "usuario", usuarios, chaves=["id_usuario"], tamanho_lote=tamanho_lote)
+   resultados[f"lotes_{tamanho_lote}_recarga"] = time.perf_counter() - inicio
+
+   print(f"\n⏱️ Upsert de {qtd_usuarios} usuários ({engine.dialect.name}):")
+   for nome, segundos in resultados.items():
+      print(f"- {nome:<28} {segundos:8.3f}s  {qtd_usuarios / segundos:12,.0f} linhas/s")
+
+   engine.dispose()
+   return resultados
+
+if __name__ == "__main__":
+   qtd = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+   lote = int(sys.argv[2]) if len(sys.argv) > 2 else TAMANHO_LOTE_PADRAO
+   url = sys.argv[3] if len(sys.argv) > 3 else "sqlite://"
+   executar_benchmark(qtd, lote, url)
@@ -0,0 +1,13 @@
+# bootstrap.py
+# Preparação única do ambiente: cria o banco, as tabelas e os índices.
+# Depois dele, os scripts de carga e de relatórios só abrem conexões.
+import sys
+from conexao_sqlalchemy import bootstrap_banco
+
+if __name__ == "__main__":
+   try:
+      bootstrap_banco()
+      print("✅ Banco e tabelas prontos.")
+   except Exception as e:
+      print(f"❌ Falha no bootstrap do banco: {e}")
+      sys.exit(1)
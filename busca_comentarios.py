@@ -0,0 +1,162 @@
+# busca_comentarios.py
+import argparse
+import re
+import time
+import pandas as pd
+from sqlalchemy import text, bindparam, Integer, String
+from conexao_sqlalchemy import criar_engine_mysql
+from instrumentacao import medir_relatorio, registrar_resultado
+
+LIMITE_PADRAO = 20
+
+# Busca pelo índice de texto completo: MATCH ... AGAINST (FULLTEXT) no MySQL e a tabela
+# comentario_fts (FTS5) no SQLite. Os filtros por conteúdo e plataforma vão no mesmo WHERE.
+SQL_BUSCA = {
+   "mysql": """
+      SELECT c.id_comentario, c.id_conteudo, ct.nome_conteudo, p.nome AS plataforma,
+         c.data_interacao, c.texto,
+         MATCH(c.texto) AGAINST (:expressao IN BOOLEAN MODE) AS relevancia
+      FROM comentario c
+      JOIN conteudo ct ON ct.id_conteudo = c.id_conteudo
+      JOIN plataforma p ON p.id_plataforma = c.id_plataforma
+      WHERE MATCH(c.texto) AGAINST (:expressao IN BOOLEAN MODE){filtros}
+      ORDER BY relevancia DESC, c.data_interacao DESC
+      LIMIT :limite
+   """,
+   "sqlite": """
+      SELECT c.id_comentario, c.id_conteudo, ct.nome_conteudo, p.nome AS plataforma,
+         c.data_interacao, c.texto,
+         -f.rank AS relevancia
+      FROM comentario_fts f
+      JOIN comentario c ON c.id_comentario = f.rowid
+      JOIN conteudo ct ON ct.id_conteudo = c.id_conteudo
+      JOIN plataforma p ON p.id_plataforma = c.id_plataforma
+      WHERE comentario_fts MATCH :expressao{filtros}
+      ORDER BY f.rank, c.data_interacao DESC
+      LIMIT :limite
+   """,
+}
+
+# Contagem dos comentários encontrados por conteúdo ou por plataforma
+SQL_RESUMO = {
+   "mysql": """
+      SELECT {coluna} AS chave, {nome} AS nome, COUNT(*) AS comentarios
+      FROM comentario c
+      JOIN {tabela} d ON d.{coluna_dimensao} = c.{coluna_dimensao}
+      WHERE MATCH(c.texto) AGAINST (:expressao IN BOOLEAN MODE)
+      GROUP BY {coluna}, {nome}
+      ORDER BY comentarios DESC
+      LIMIT :limite
+   """,
+   "sqlite": """
+      SELECT {coluna} AS chave, {nome} AS nome, COUNT(*) AS comentarios
+      FROM comentario_fts f
+      JOIN comentario c ON c.id_comentario = f.rowid
+      JOIN {tabela} d ON d.{coluna_dimensao} = c.{coluna_dimensao}
+      WHERE comentario_fts MATCH :expressao
+      GROUP BY {coluna}, {nome}
+      ORDER BY comentarios DESC
+      LIMIT :limite
+   """,
+}
+AGRUPAMENTOS = {
+   "conteudo": {"tabela": "conteudo", "coluna_dimensao": "id_conteudo", "coluna": "c.id_conteudo", "nome": "d.nome_conteudo"},
+   "plataforma": {"tabela": "plataforma", "coluna_dimensao": "id_plataforma", "coluna": "c.id_plataforma", "nome": "d.nome"},
+}
+
+def expressao_busca(termos: str, dialeto: str, prefixo: bool = True) -> str:
+   """Converte palavras livres na sintaxe do índice: todas as palavras, opcionalmente como prefixo.
+
+   Só letras e dígitos são mantidos, então operadores digitados pelo usuário
+   não chegam ao MATCH (nem geram erro de sintaxe no FTS5).
+   """
+   palavras = re.findall(r"\w+", termos or "")
+   if not palavras:
+      raise ValueError("Informe ao menos uma palavra para a busca")
+   sufixo = "*" if prefixo else ""
+   if dialeto == "sqlite":
+      return " AND ".join(f'"{palavra}"{sufixo}' for palavra in palavras)
+   return " ".join(f"+{palavra}{sufixo}" for palavra in palavras)
+
+def _dialeto(engine) -> str:
+   return "sqlite" if engine.dialect.name == "sqlite" else "mysql"
+
+def buscar_comentarios(engine, termos: str, id_conteudo: int = None, plataforma: str = None,
+                       limite: int = LIMITE_PADRAO, prefixo: bool = True) -> pd.DataFrame:
+   """Comentários que contêm todas as palavras de `termos`, mais relevantes primeiro.
+
+   A busca usa o índice de texto completo (sem LIKE '%...%'); `id_conteudo`
+   e `plataforma` restringem o resultado a um conteúdo ou a uma plataforma.
+   """
+   dialeto = _dialeto(engine)
+   filtros = ""
+   valores = {"expressao": expressao_busca(termos, dialeto, prefixo), "limite": int(limite)}
+   parametros = [bindparam("expressao", type_=String), bindparam("limite", type_=Integer)]
+   if id_conteudo is not None:
+      filtros += " AND c.id_conteudo = :id_conteudo"
+      valores["id_conteudo"] = int(id_conteudo)
+      parametros.append(bindparam("id_conteudo", type_=Integer))
+   if plataforma:
+      filtros += " AND c.id_plataforma = (SELECT id_plataforma FROM plataforma WHERE nome = :plataforma)"
+      valores["plataforma"] = plataforma
+      parametros.append(bindparam("plataforma", type_=String))
+   instrucao = text(SQL_BUSCA[dialeto].format(filtros=filtros)).bindparams(*parametros)
+
+   with medir_relatorio("busca_comentarios", engine) as medicao:
+      inicio = time.perf_counter()
+      with engine.connect() as conn:
+         df = pd.read_sql(instrucao, con=conn, params=valores)
+      registrar_resultado(medicao, df, inicio)
+   return df
+
+def resumir_busca(engine, termos: str, por: str = "conteudo", limite: int = LIMITE_PADRAO,
+                  prefixo: bool = True) -> pd.DataFrame:
+   """Quantidade de comentários encontrados por conteúdo ou por plataforma"""
+   if por not in AGRUPAMENTOS:
+      raise ValueError(f"Agrupamento inválido: '{por}'. Use {', '.join(AGRUPAMENTOS)}")
+   dialeto = _dialeto(engine)
+   instrucao = text(SQL_RESUMO[dialeto].format(**AGRUPAMENTOS[por])).bindparams(
+      bindparam("expressao", type_=String), bindparam("limite", type_=Integer)
+   )
+   valores = {"expressao": expressao_busca(termos, dialeto, prefixo), "limite": int(limite)}
+
+   with medir_relatorio(f"busca_comentarios_por_{por}", engine) as medicao:
+      inicio = time.perf_counter()
+      with engine.connect() as conn:
+         df = pd.read_sql(instrucao, con=conn, params=valores)
+      registrar_resultado(medicao, df, inicio)
+   return df.rename(columns={"chave": AGRUPAMENTOS[por]["coluna_dimensao"], "nome": por})
+
+def reconstruir_indice(engine):
+   """Reconstrói o índice FTS5 a partir de comentario (SQLite); no MySQL o FULLTEXT é mantido pelo banco"""
+   if _dialeto(engine) != "sqlite":
+      print("ℹ️ No MySQL o índice FULLTEXT é mantido automaticamente.")
+      return
+   with engine.begin() as conn:
+      conn.execute(text("INSERT INTO comentario_fts(comentario_fts) VALUES ('rebuild')"))
+   print("✅ Índice comentario_fts reconstruído.")
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Busca comentários pelo índice de texto completo")
+   parser.add_argument("termos", help="Palavras buscadas (todas devem aparecer)")
+   parser.add_argument("--conteudo", type=int, help="Restringe a um id_conteudo")
+   parser.add_argument("--plataforma", help="Restringe a uma plataforma")
+   parser.add_argument("--por", choices=sorted(AGRUPAMENTOS), help="Mostra a contagem por conteúdo ou plataforma")
+   parser.add_argument("--limite", type=int, default=LIMITE_PADRAO)
+   parser.add_argument("--exata", action="store_true", help="Palavras inteiras (sem busca por prefixo)")
+   args = parser.parse_args()
+
+   engine = criar_engine_mysql()
+   inicio = time.perf_counter()
+   if args.por:
+      df = resumir_busca(engine, args.termos, por=args.por, limite=args.limite, prefixo=not args.exata)
+   else:
+      df = buscar_comentarios(engine, args.termos, id_conteudo=args.conteudo, plataforma=args.plataforma,
+                              limite=args.limite, prefixo=not args.exata)
+   milissegundos = (time.perf_counter() - inicio) * 1000
+   if df.empty:
+      print(f"ℹ️ Nenhum comentário encontrado ({milissegundos:.0f} ms).")
+   else:
+      print(f"\n🔍 {len(df)} resultados em {milissegundos:.0f} ms:")
+      print(df.to_string(index=False))
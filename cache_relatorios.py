@@ -0,0 +1,167 @@
+# cache_relatorios.py
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+import pandas as pd
+from sqlalchemy import text
+from upsert_lotes import upsert_em_lotes
+
+try:
+   import pyarrow  # noqa: F401  (necessário para o cache em disco em Parquet)
+   PARQUET_DISPONIVEL = True
+except ImportError:
+   PARQUET_DISPONIVEL = False
+
+DIRETORIO_CACHE_PADRAO = os.getenv("CACHE_RELATORIOS_DIR", ".cache_relatorios")
+# Dia em versao_dados_dia das cargas sem datas (menor DATE do MySQL): antes de qualquer período guardado
+DIA_TODOS = date(1000, 1, 1)
+
+def ler_versao_dados(conn) -> int:
+   versao = conn.execute(text("SELECT versao FROM versao_dados WHERE id = 1")).scalar()
+   return int(versao or 0)
+
+def incrementar_versao_dados(conn, datas=None):
+   """Chamado pelas cargas, na mesma transação das inserções.
+
+   Cada dia de `datas` (as data_interacao gravadas) fica em versao_dados_dia com
+   a nova versão. Sem `datas`, a carga vale para todos os dias (DIA_TODOS);
+   com `datas` vazio, nenhum dia mudou.
+   """
+   upsert_em_lotes(conn, "versao_dados", [{"id": 1, "versao": 1}], chaves=["id"], somar=["versao"])
+   dias = [DIA_TODOS] if datas is None else pd.to_datetime(pd.Series(datas)).dt.date.dropna().unique()
+   if len(dias):
+      versao = ler_versao_dados(conn)
+      upsert_em_lotes(conn, "versao_dados_dia", [{"dia": dia, "versao": versao} for dia in dias],
+                      chaves=["dia"], atualizar=["versao"], pular_existentes=False)
+
+def ler_menor_dia_alterado(conn, desde_versao: int):
+   """Menor dia gravado por uma carga posterior a `desde_versao` (None se nenhuma mudou dados)"""
+   dia = conn.execute(text("SELECT MIN(dia) FROM versao_dados_dia WHERE versao > :versao"),
+                      {"versao": desde_versao}).scalar()
+   return pd.Timestamp(dia) if dia is not None else None
+
+def normalizar_sql(query_sql: str) -> str:
+   return re.sub(r"\s+", " ", query_sql).strip().rstrip(";").strip()
+
+class CacheRelatorios:
+   """Cache de resultados de relatórios em dois níveis: memória (LRU) e disco (Parquet).
+
+   A chave combina o banco, o SQL normalizado e a versão dos dados, então
+   qualquer carga que incremente `versao_dados` invalida os resultados antigos.
+   """
+
+   def __init__(self, limite_memoria_mb: float = 256, limite_disco_mb: float = 1024,
+                diretorio: str = DIRETORIO_CACHE_PADRAO):
+      self.limite_memoria = int(limite_memoria_mb * 1024 * 1024)
+      self.limite_disco = int(limite_disco_mb * 1024 * 1024)
+      self.diretorio = diretorio
+      self.usar_disco = PARQUET_DISPONIVEL and self.limite_disco > 0
+      self._memoria = OrderedDict()
+      self._bytes_memoria = 0
+      self._lock = threading.Lock()
+      self.estatisticas = {"hits_memoria": 0, "hits_disco": 0, "misses": 0}
+
+   def chave(self, query_sql: str, engine, versao: int) -> str:
+      banco = engine.url.render_as_string(hide_password=True)
+      conteudo = f"{banco}|{versao}|{normalizar_sql(query_sql)}"
+      return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+   def _caminho(self, chave: str) -> str:
+      return os.path.join(self.diretorio, f"{chave}.parquet")
+
+   def _guardar_memoria(self, chave: str, df: pd.DataFrame):
+      tamanho = int(df.memory_usage(deep=True).sum())
+      if tamanho > self.limite_memoria:
+         return
+      with self._lock:
+         if chave in self._memoria:
+            self._bytes_memoria -= self._memoria.pop(chave)[1]
+         self._memoria[chave] = (df, tamanho)
+         self._bytes_memoria += tamanho
+         # Remove os menos usados recentemente até caber no limite
+         while self._bytes_memoria > self.limite_memoria:
+            _, (_, tamanho_removido) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= tamanho_removido
+
+   def _guardar_disco(self, chave: str, df: pd.DataFrame):
+      os.makedirs(self.diretorio, exist_ok=True)
+      temporario = self._caminho(chave) + ".tmp"
+      df.to_parquet(temporario, index=False)
+      os.replace(temporario, self._caminho(chave))
+      self._aplicar_limite_disco()
+
+   def _aplicar_limite_disco(self):
+      arquivos = [
+         os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio) if nome.endswith(".parquet")
+      ]
+      # Arquivos removidos por outra thread durante a varredura são ignorados
+      situacoes = []
+      for caminho in arquivos:
+         try:
+            situacoes.append((caminho, os.stat(caminho)))
+         except FileNotFoundError:
+            pass
+      situacoes.sort(key=lambda item: item[1].st_mtime)
+      total = sum(situacao.st_size for _, situacao in situacoes)
+      while situacoes and total > self.limite_disco:
+         caminho, situacao = situacoes.pop(0)
+         total -= situacao.st_size
+         try:
+            os.remove(caminho)
+         except FileNotFoundError:
+            pass
+
+   def obter(self, chave: str):
+      with self._lock:
+         if chave in self._memoria:
+            self._memoria.move_to_end(chave)
+            self.estatisticas["hits_memoria"] += 1
+            return self._memoria[chave][0].copy()
+
+      if self.usar_disco:
+         # Sem checar antes: outra thread pode remover o arquivo (limite de disco) a qualquer momento
+         try:
+            df = pd.read_parquet(self._caminho(chave))
+            os.utime(self._caminho(chave))  # mtime marca o último uso para a remoção por tamanho
+         except OSError:
+            df = None
+         if df is not None:
+            self._guardar_memoria(chave, df)
+            self.estatisticas["hits_disco"] += 1
+            return df.copy()
+
+      self.estatisticas["misses"] += 1
+      return None
+
+   def guardar(self, chave: str, df: pd.DataFrame):
+      self._guardar_memoria(chave, df.copy())
+      if self.usar_disco:
+         try:
+            self._guardar_disco(chave, df)
+         except Exception as e:
+            # Tipos sem representação em Parquet ficam só no cache em memória
+            print(f"⚠️ Resultado não gravado no cache em disco: {e}")
+
+   def limpar(self):
+      with self._lock:
+         self._memoria.clear()
+         self._bytes_memoria = 0
+      if os.path.isdir(self.diretorio):
+         for nome in os.listdir(self.diretorio):
+            if nome.endswith(".parquet"):
+               os.remove(os.path.join(self.diretorio, nome))
+
+   def resumo(self) -> dict:
+      consultas = sum(self.estatisticas.values())
+      hits = self.estatisticas["hits_memoria"] + self.estatisticas["hits_disco"]
+      return {
+         **self.estatisticas,
+         "taxa_acerto": hits / consultas if consultas else 0.0,
+         "itens_memoria": len(self._memoria),
+         "bytes_memoria": self._bytes_memoria,
+      }
+
+cache_padrao = CacheRelatorios()
@@ -1,72 +1,227 @@
 # carga_dados.py
+import numpy as np
 import pandas as pd
 import os
-from sqlalchemy import text
-from conexao_sqlalchemy import criar_engine_mysql
+import sys
+from sqlalchemy import text, bindparam, Table, MetaData, Column, BigInteger, Integer, String, DateTime
+from conexao_sqlalchemy import criar_engine_mysql, garantir_tabela_comentario, CargaCheckpoint, CargaWatermark, VersaoDadosDia, Comentario
 from utils import validar_dataframe
+from upsert_lotes import upsert_em_lotes, TAMANHO_LOTE_PADRAO
+from rollups import atualizar_rollups
+from sketches import atualizar_sketches
+from cache_relatorios import incrementar_versao_dados
 
-def carregar_dados(csv_path: str):
-   df = pd.read_csv(csv_path)
-   df = validar_dataframe(df)
-   df["tipo_interacao"] = df["tipo_interacao"].replace({"view_start": "view"})
+LINHAS_POR_LOTE_PADRAO = 100_000
+
+# Valores de tipo_interacao aceitos no CSV (view_start vira view na validação) e o tipo final
+TIPOS_INTERACAO_CSV = pd.CategoricalDtype(["view", "like", "share", "comment", "view_start"])
+TIPO_INTERACAO = pd.CategoricalDtype(["view", "like", "share", "comment"])
+
+# Tipos explícitos e compactos: ids em 32 bits (como as colunas do banco) e textos
+# repetitivos como categorias, guardados uma vez e referenciados por código
+DTYPES_CSV = {
+   "id_conteudo": "Int32",
+   "nome_conteudo": "category",
+   "id_usuario": "Int32",
+   "plataforma": "category",
+   "tipo_interacao": TIPOS_INTERACAO_CSV,
+   "watch_duration_seconds": "Int32",
+   "comment_text": "string",
+}
+
+COLUNAS_INTERACAO = ["id_usuario", "id_conteudo", "id_plataforma", "tipo_interacao", "data_interacao", "watch_duration_seconds"]
+COLUNAS_COMENTARIO = ["id_usuario", "id_conteudo", "id_plataforma", "data_interacao", "texto"]
+
+# O parser C converte inteiros anuláveis (Int32) bem mais devagar: lê como float64 e converte depois
+_DTYPES_LEITURA = {coluna: "float64" if tipo == "Int32" else tipo for coluna, tipo in DTYPES_CSV.items()}
+# tipo_interacao lido como categoria livre: com as categorias fixas, um valor desconhecido
+# viraria nulo já na leitura, sem aviso; validar_lote descarta e informa esses valores
+_DTYPES_LEITURA["tipo_interacao"] = "category"
+_COLUNAS_INTEIRAS = {coluna: tipo for coluna, tipo in DTYPES_CSV.items() if tipo == "Int32"}
+
+LINHAS_POR_BLOCO_LEITURA = 100_000
+_LIMITES_INT32 = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+
+def para_int32(valores: pd.Series) -> pd.Series:
+   """Int32 anulável; valores não numéricos, não inteiros ou fora dos 32 bits viram nulos (e a validação descarta a linha)"""
+   numeros = pd.to_numeric(valores, errors="coerce")
+   return numeros.where((numeros == numeros.round()) & numeros.between(*_LIMITES_INT32)).astype("Int32")
+
+def _converter_inteiros(lote: pd.DataFrame) -> pd.DataFrame:
+   return lote.assign(**{coluna: para_int32(lote[coluna]) for coluna in _COLUNAS_INTEIRAS})
+
+def _concatenar_blocos(blocos: list) -> pd.DataFrame:
+   # pd.concat só mantém uma coluna categórica se todos os blocos tiverem as mesmas categorias
+   for coluna, tipo in blocos[0].dtypes.items():
+      if isinstance(tipo, pd.CategoricalDtype) and not tipo.ordered:
+         categorias = blocos[0][coluna].cat.categories
+         for bloco in blocos[1:]:
+            categorias = categorias.union(bloco[coluna].cat.categories, sort=False)
+         blocos = [bloco.assign(**{coluna: bloco[coluna].cat.set_categories(categorias)}) for bloco in blocos]
+   return pd.concat(blocos, ignore_index=True)
 
-   engine = criar_engine_mysql()
+def ler_csv(caminho: str, chunksize: int = None, **opcoes):
+   """Lê o CSV de interações com os tipos de DTYPES_CSV e a data já convertida na leitura.
 
+   Com `chunksize`, devolve um iterador de lotes. Sem ele, o arquivo é lido em
+   blocos de LINHAS_POR_BLOCO_LEITURA linhas, compactados um a um, para que o
+   texto bruto do arquivo inteiro nunca fique em memória de uma vez.
+   """
+   leitor = pd.read_csv(caminho, dtype=_DTYPES_LEITURA, parse_dates=["timestamp_interacao"],
+                        chunksize=chunksize or LINHAS_POR_BLOCO_LEITURA, **opcoes)
+   if chunksize:
+      return (_converter_inteiros(lote) for lote in leitor)
+   with leitor:
+      blocos = [_converter_inteiros(lote) for lote in leitor]
+   if not blocos:
+      return pd.read_csv(caminho, dtype=_DTYPES_LEITURA, parse_dates=["timestamp_interacao"], nrows=0, **opcoes) \
+         .pipe(_converter_inteiros)
+   return _concatenar_blocos(blocos)
+
+def gravar_plataformas_e_usuarios(conn, df: pd.DataFrame, tamanho_lote: int):
    # Plataformas
-   plataformas = df["plataforma"].unique()
-   with engine.begin() as conn:
-      for nome in plataformas:
-         conn.execute(text("""
-               INSERT INTO plataforma (nome) VALUES (:nome)
-               ON DUPLICATE KEY UPDATE nome = VALUES(nome)
-         """), {"nome": nome})
+   plataformas = [{"nome": nome} for nome in df["plataforma"].unique()]
+   upsert_em_lotes(conn, "plataforma", plataformas, chaves=["nome"], tamanho_lote=tamanho_lote)
 
    # Usuários
-   usuarios = df["id_usuario"].unique()
+   usuarios = [{"id_usuario": int(uid)} for uid in df["id_usuario"].unique()]
+   upsert_em_lotes(conn, "usuario", usuarios, chaves=["id_usuario"], tamanho_lote=tamanho_lote)
+
+def gravar_conteudos(conn, df: pd.DataFrame, tamanho_lote: int):
+   conteudos = df[["id_conteudo", "nome_conteudo", "id_plataforma"]].drop_duplicates(subset=["id_conteudo"], keep="last")
+   conteudos = conteudos.astype({"id_conteudo": int, "id_plataforma": int}).assign(tipo_conteudo="Vídeo")
+   upsert_em_lotes(
+      conn, "conteudo", conteudos.to_dict("records"),
+      chaves=["id_conteudo"],
+      atualizar=["nome_conteudo", "id_plataforma"],
+      tamanho_lote=tamanho_lote
+   )
+
+def ler_mapa_plataformas(conn) -> dict:
+   df_plataformas = pd.read_sql("SELECT id_plataforma, nome FROM plataforma", con=conn)
+   return dict(zip(df_plataformas["nome"], df_plataformas["id_plataforma"]))
+
+def mapear_plataformas(plataformas: pd.Series, mapa: dict) -> pd.Series:
+   """id_plataforma de cada linha; numa coluna categórica o mapa é aplicado só às categorias"""
+   if not isinstance(plataformas.dtype, pd.CategoricalDtype):
+      return plataformas.map(mapa).astype("Int32")
+   ids = pd.array(plataformas.cat.categories.map(mapa), dtype="Int32")
+   return pd.Series(ids.take(plataformas.cat.codes.to_numpy(), allow_fill=True), index=plataformas.index)
+
+def validar_lote(df: pd.DataFrame) -> pd.DataFrame:
+   df = validar_dataframe(df)
+   tipos = df["tipo_interacao"].astype(TIPOS_INTERACAO_CSV)
+   invalido = tipos.isna().to_numpy()
+   if invalido.any():
+      valores = df["tipo_interacao"][invalido].astype("string").fillna("<vazio>").value_counts()
+      print(f"⚠️ {int(invalido.sum())} linhas descartadas por tipo_interacao inválido: "
+            + ", ".join(f"'{valor}' ({quantidade})" for valor, quantidade in valores.items()))
+      df, tipos = df[~invalido], tipos[~invalido]
+   # view_start → view trocando apenas os códigos da categoria
+   codigos = tipos.cat.codes.to_numpy()
+   codigos = np.where(codigos == TIPOS_INTERACAO_CSV.categories.get_loc("view_start"), 0, codigos)
+   return df.assign(tipo_interacao=pd.Categorical.from_codes(codigos, dtype=TIPO_INTERACAO))
+
+def preparar_interacoes(df: pd.DataFrame) -> pd.DataFrame:
+   # Com Copy-on-Write, renomear e projetar colunas não copia os dados
+   df = df.rename(columns={"timestamp_interacao": "data_interacao"})
+   if not pd.api.types.is_datetime64_any_dtype(df["data_interacao"]):
+      df["data_interacao"] = pd.to_datetime(df["data_interacao"])
+   return df[COLUNAS_INTERACAO]
+
+def preparar_comentarios(df: pd.DataFrame) -> pd.DataFrame:
+   """Comentários com texto do lote (já com id_plataforma), no formato da tabela comentario"""
+   if "comment_text" not in df.columns:
+      return pd.DataFrame(columns=COLUNAS_COMENTARIO)
+   df = df.rename(columns={"timestamp_interacao": "data_interacao", "comment_text": "texto"})
+   texto = df["texto"].str.strip()
+   # Troca o texto antes de filtrar: atribuir uma Series a um DataFrame vazio adota o
+   # índice dela, e um lote sem comentários viraria linhas nulas
+   comentarios = df.assign(texto=texto)
+   return comentarios[((df["tipo_interacao"] == "comment") & texto.notna() & (texto != "")).fillna(False)][COLUNAS_COMENTARIO]
+
+def _inserir_comentarios(conn, comentarios: pd.DataFrame, tamanho_lote: int) -> int:
+   # O índice de texto completo é atualizado pelo próprio banco (FULLTEXT ou triggers do FTS5).
+   # INSERT pelo modelo, e não to_sql: sem a tabela, falha em vez de criar uma comentario sem
+   # o índice (as cargas chamam garantir_tabela_comentario antes)
+   valores = comentarios.astype(object).to_numpy()
+   valores[comentarios.isna().to_numpy()] = None
+   registros = [dict(zip(comentarios.columns, linha)) for linha in valores]
+   for inicio in range(0, len(registros), tamanho_lote):
+      conn.execute(Comentario.__table__.insert(), registros[inicio:inicio + tamanho_lote])
+   return len(registros)
+
+def gravar_comentarios(conn, df: pd.DataFrame, tamanho_lote: int) -> int:
+   """Insere em lote os comentários com texto do lote de interações"""
+   return _inserir_comentarios(conn, preparar_comentarios(df), tamanho_lote)
+
+def carregar_comentarios(csv_path: str, engine=None, tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> int:
+   """Grava só os comentários de um CSV já carregado (bancos carregados antes da tabela comentario).
+
+   Comentários que já existem (mesmo usuário, conteúdo, data e texto) são
+   ignorados, então pode ser executada mais de uma vez para o mesmo arquivo.
+   """
+   engine = engine or criar_engine_mysql()
+   garantir_tabela_comentario(engine)
+   df = validar_lote(ler_csv(csv_path))
    with engine.begin() as conn:
-      for uid in usuarios:
-         conn.execute(text("""
-               INSERT INTO usuario (id_usuario) VALUES (:id_usuario)
-               ON DUPLICATE KEY UPDATE id_usuario = VALUES(id_usuario)
-         """), {"id_usuario": int(uid)})
+      df["id_plataforma"] = mapear_plataformas(df["plataforma"], ler_mapa_plataformas(conn))
+      comentarios = preparar_comentarios(df.dropna(subset=["id_plataforma"]))
+      if comentarios.empty:
+         print("ℹ️ Nenhum comentário no arquivo.")
+         return 0
+      existentes = pd.read_sql(
+         text("SELECT id_usuario, id_conteudo, data_interacao, texto FROM comentario "
+              "WHERE data_interacao >= :inicio AND data_interacao < :fim"),
+         con=conn,
+         params={"inicio": comentarios["data_interacao"].min().to_pydatetime(),
+                 # Limite aberto logo após a maior data (também cobre datas gravadas com frações de segundo)
+                 "fim": (comentarios["data_interacao"].max() + pd.Timedelta(microseconds=1)).to_pydatetime()},
+      )
+      total = len(comentarios)
+      if not existentes.empty:
+         chave = ["id_usuario", "id_conteudo", "data_interacao", "texto"]
+         existentes["data_interacao"] = pd.to_datetime(existentes["data_interacao"])
+         ja_gravados = set(pd.util.hash_pandas_object(existentes[chave].astype(str), index=False))
+         novos = ~pd.util.hash_pandas_object(comentarios[chave].astype(str), index=False).isin(ja_gravados)
+         comentarios = comentarios[novos.to_numpy()]
+      gravados = _inserir_comentarios(conn, comentarios, tamanho_lote)
+   print(f"💬 {gravados} comentários gravados ({total - gravados} já existiam).")
+   return gravados
+
+def carregar_dados(csv_path: str, engine=None, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+   df = validar_lote(ler_csv(csv_path))
+
+   engine = engine or criar_engine_mysql()
+   CargaWatermark.__table__.create(engine, checkfirst=True)
+   VersaoDadosDia.__table__.create(engine, checkfirst=True)
+   garantir_tabela_comentario(engine)
+
+   # Plataformas e usuários
+   with engine.begin() as conn:
+      gravar_plataformas_e_usuarios(conn, df, tamanho_lote)
 
    # Mapear plataforma
-   df_plataformas = pd.read_sql("SELECT id_plataforma, nome FROM plataforma", con=engine)
-   mapa_plataformas = dict(zip(df_plataformas["nome"], df_plataformas["id_plataforma"]))
-   df["id_plataforma"] = df["plataforma"].map(mapa_plataformas)
+   with engine.connect() as conn:
+      mapa_plataformas = ler_mapa_plataformas(conn)
+   df["id_plataforma"] = mapear_plataformas(df["plataforma"], mapa_plataformas)
 
    # Conteúdos
-   conteudos = df[["id_conteudo", "nome_conteudo", "id_plataforma"]].drop_duplicates()
    with engine.begin() as conn:
-      for _, row in conteudos.iterrows():
-         conn.execute(text("""
-               INSERT INTO conteudo (id_conteudo, nome_conteudo, tipo_conteudo, id_plataforma)
-               VALUES (:id_conteudo, :nome_conteudo, 'Vídeo', :id_plataforma)
-               ON DUPLICATE KEY UPDATE nome_conteudo = VALUES(nome_conteudo), id_plataforma = VALUES(id_plataforma)
-         """), {
-               "id_conteudo": int(row["id_conteudo"]),
-               "nome_conteudo": row["nome_conteudo"],
-               "id_plataforma": int(row["id_plataforma"])
-         })
-         
+      gravar_conteudos(conn, df, tamanho_lote)
+
    # relatorios_sql
-   df_relatorios = pd.read_sql("SELECT * FROM relatorios_sql", con=engine)
+   df_relatorios = pd.read_sql("SELECT nome, descricao, query_sql FROM relatorios_sql", con=engine)
    with engine.begin() as conn:
-      for _, row in df_relatorios.iterrows():
-         conn.execute(text("""
-               INSERT INTO relatorios_sql (nome, descricao, query_sql)
-               VALUES (:nome, :descricao, :query_sql)
-               ON DUPLICATE KEY UPDATE descricao = VALUES(descricao), query_sql = VALUES(query_sql)
-         """), {
-               "nome": row["nome"],
-               "descricao": row["descricao"],
-               "query_sql": row["query_sql"]
-         })
-      
+      upsert_em_lotes(
+         conn, "relatorios_sql", df_relatorios.to_dict("records"),
+         chaves=["nome"],
+         atualizar=["descricao", "query_sql"],
+         tamanho_lote=tamanho_lote
+      )
+
    # Preparar dados para inserção na tabela 'interacao'
-   df.rename(columns={"timestamp_interacao": "data_interacao"}, inplace=True)
-   df["data_interacao"] = pd.to_datetime(df["data_interacao"])
-   df_final = df[["id_usuario", "id_conteudo", "id_plataforma", "tipo_interacao", "data_interacao", "watch_duration_seconds"]]
+   df_final = preparar_interacoes(df)
 
    print("🔍 Visualização dos dados a serem inseridos:")
    print(df_final.head())
@@ -75,18 +230,285 @@ def carregar_dados(csv_path: str):
    print("❓ Valores nulos por coluna:")
    print(df_final.isnull().sum())
 
-   # Inserção na tabela interacao
-   df_final.to_sql(name="interacao", con=engine, if_exists="append", index=False)
+   # Inserção na tabela interacao (e no agregado diário, na mesma transação)
+   with engine.begin() as conn:
+      df_final.to_sql(name="interacao", con=conn, if_exists="append", index=False)
+      atualizar_rollups(conn, df_final, tamanho_lote)
+      atualizar_sketches(conn, df_final)
+      comentarios = gravar_comentarios(conn, df, tamanho_lote)
+      incrementar_versao_dados(conn, df_final["data_interacao"])
+      avancar_watermarks(conn, df["plataforma"], df_final["data_interacao"])
    print("✅ Dados inseridos com sucesso na tabela 'interacao'.")
+   print(f"💬 {comentarios} comentários gravados na tabela 'comentario'.")
 
    # Verificação: total de registros
    with engine.connect() as conn:
       result = conn.execute(text("SELECT COUNT(*) FROM interacao"))
       print(f"📈 Total de registros na tabela 'interacao': {result.scalar()}")
 
+def ler_checkpoint(conn, arquivo: str):
+   """Linhas já confirmadas de um arquivo em carga_checkpoint (None se nunca foi carregado)"""
+   return conn.execute(
+      text("SELECT linhas_processadas, concluido FROM carga_checkpoint WHERE arquivo = :arquivo"),
+      {"arquivo": arquivo}
+   ).first()
+
+def gravar_checkpoint(conn, arquivo: str, linhas_processadas: int, concluido: bool = False):
+   """Grava a posição do arquivo; chame na mesma transação das linhas que ela confirma"""
+   upsert_em_lotes(
+      conn, "carga_checkpoint",
+      [{"arquivo": arquivo, "linhas_processadas": linhas_processadas, "concluido": concluido}],
+      chaves=["arquivo"],
+      atualizar=["linhas_processadas", "concluido"],
+      pular_existentes=False
+   )
+
+def carregar_dados_em_lotes(csv_path: str, engine=None, linhas_por_lote: int = LINHAS_POR_LOTE_PADRAO,
+                            tamanho_lote: int = TAMANHO_LOTE_PADRAO, reiniciar: bool = False) -> int:
+   """Carrega o CSV em lotes de `linhas_por_lote` linhas, com uma transação por lote.
+
+   O número de linhas já processadas é gravado em `carga_checkpoint` na mesma
+   transação do lote, então uma carga interrompida recomeça do lote seguinte
+   ao último confirmado, sem duplicar interações. O pico de memória fica
+   limitado pelo tamanho do lote, e não pelo tamanho do arquivo.
+   Retorna a quantidade de interações inseridas nesta execução.
+   """
+   engine = engine or criar_engine_mysql()
+   CargaCheckpoint.__table__.create(engine, checkfirst=True)
+   CargaWatermark.__table__.create(engine, checkfirst=True)
+   VersaoDadosDia.__table__.create(engine, checkfirst=True)
+   garantir_tabela_comentario(engine)
+   arquivo = os.path.abspath(csv_path)
+
+   with engine.connect() as conn:
+      checkpoint = ler_checkpoint(conn, arquivo)
+
+   linhas_processadas = 0
+   if checkpoint and not reiniciar:
+      if checkpoint.concluido:
+         print(f"ℹ️ Arquivo já carregado por completo: {arquivo}")
+         return 0
+      linhas_processadas = int(checkpoint.linhas_processadas)
+      print(f"🔁 Retomando a carga a partir da linha {linhas_processadas + 1}")
+
+   leitor = ler_csv(
+      csv_path,
+      chunksize=linhas_por_lote,
+      # Mantém o cabeçalho (linha 0) e pula as linhas de dados já confirmadas
+      skiprows=range(1, linhas_processadas + 1) if linhas_processadas else None,
+   )
+
+   mapa_plataformas = {}
+   total_inserido = 0
+   for numero_lote, lote in enumerate(leitor, 1):
+      linhas_lidas = len(lote)
+      df = validar_lote(lote)
+
+      with engine.begin() as conn:
+         gravar_plataformas_e_usuarios(conn, df, tamanho_lote)
+
+         # Só relê a tabela de plataformas quando aparece um nome novo
+         if not set(df["plataforma"].unique()) <= mapa_plataformas.keys():
+            mapa_plataformas = ler_mapa_plataformas(conn)
+         df["id_plataforma"] = mapear_plataformas(df["plataforma"], mapa_plataformas)
+
+         gravar_conteudos(conn, df, tamanho_lote)
+
+         df_final = preparar_interacoes(df)
+         df_final.to_sql(name="interacao", con=conn, if_exists="append", index=False,
+                         method="multi", chunksize=tamanho_lote)
+         atualizar_rollups(conn, df_final, tamanho_lote)
+         atualizar_sketches(conn, df_final)
+         gravar_comentarios(conn, df, tamanho_lote)
+         incrementar_versao_dados(conn, df_final["data_interacao"])
+         avancar_watermarks(conn, df["plataforma"], df_final["data_interacao"])
+
+         linhas_processadas += linhas_lidas
+         gravar_checkpoint(conn, arquivo, linhas_processadas)
+
+      total_inserido += len(df_final)
+      print(f"📦 Lote {numero_lote}: {len(df_final)} interações inseridas ({linhas_processadas} linhas processadas)")
+
+   with engine.begin() as conn:
+      gravar_checkpoint(conn, arquivo, linhas_processadas, concluido=True)
+
+   print(f"✅ Carga em lotes concluída: {total_inserido} interações inseridas.")
+   return total_inserido
+
+# Interações atrasadas da carga incremental, comparadas com interacao no próprio banco
+_INTERACAO_ATRASADA = Table(
+   "interacao_atrasada", MetaData(),
+   Column("posicao", BigInteger, primary_key=True),
+   Column("id_usuario", Integer, nullable=False),
+   Column("id_conteudo", Integer, nullable=False),
+   Column("id_plataforma", Integer, nullable=False),
+   Column("tipo_interacao", String(20), nullable=False),
+   Column("data_interacao", DateTime, nullable=False),
+   Column("watch_duration_seconds", Integer, nullable=False),
+   Column("ocorrencia", Integer, nullable=False),
+   prefixes=["TEMPORARY"],
+)
+COLUNAS_COMPARADAS = ["id_usuario", "id_conteudo", "id_plataforma", "tipo_interacao", "data_interacao",
+                      "watch_duration_seconds"]
+
+def _ler_watermarks(conn, fontes: list) -> dict:
+   consulta = text(
+      "SELECT fonte, ultima_data_interacao FROM carga_watermark WHERE fonte IN :fontes"
+   ).bindparams(bindparam("fontes", expanding=True))
+   return {fonte: pd.Timestamp(data) for fonte, data in conn.execute(consulta, {"fontes": fontes})}
+
+def _maiores_datas_gravadas(conn, plataformas: list) -> dict:
+   """Maior data_interacao já gravada em interacao para cada plataforma (por nome)"""
+   consulta = text(
+      "SELECT p.nome, MAX(i.data_interacao) FROM interacao i JOIN plataforma p ON p.id_plataforma = i.id_plataforma "
+      "WHERE p.nome IN :nomes GROUP BY p.nome"
+   ).bindparams(bindparam("nomes", expanding=True))
+   return {nome: pd.Timestamp(data) for nome, data in conn.execute(consulta, {"nomes": plataformas}) if data is not None}
+
+def _ler_marcas_plataformas(conn, plataformas: list) -> dict:
+   """Marca d'água de cada plataforma; as que ainda não têm começam da maior data já gravada"""
+   marcas = _ler_watermarks(conn, plataformas) if plataformas else {}
+   sem_marca = [nome for nome in plataformas if nome not in marcas]
+   if sem_marca:
+      marcas.update(_maiores_datas_gravadas(conn, sem_marca))
+   return marcas
+
+def _avancar(conn, marcas: list):
+   # Cria as marcas que faltam e avança as existentes; a condição impede que voltem atrás
+   upsert_em_lotes(conn, "carga_watermark", marcas, chaves=["fonte"])
+   conn.execute(
+      text("UPDATE carga_watermark SET ultima_data_interacao = :ultima_data_interacao "
+           "WHERE fonte = :fonte AND ultima_data_interacao < :ultima_data_interacao"),
+      marcas,
+   )
+
+def avancar_watermarks(conn, plataformas: pd.Series, datas: pd.Series, fonte: str = None):
+   """Avança as marcas d'água até a maior data gravada, sem nunca retroceder.
+
+   Todas as cargas chamam na transação das inserções, depois delas: cada
+   plataforma é uma fonte, e uma plataforma ainda sem marca começa da maior
+   data já gravada em interacao (inclusive por cargas anteriores a esta marca).
+   `fonte` também avança a marca de uma fonte própria da carga incremental.
+   """
+   maximos = pd.to_datetime(datas).groupby(plataformas.astype("string")).max().dropna()
+   if maximos.empty:
+      return
+   sem_marca = [nome for nome in maximos.index if nome not in _ler_watermarks(conn, list(maximos.index))]
+   gravadas = _maiores_datas_gravadas(conn, sem_marca) if sem_marca else {}
+   _avancar(conn, [{"fonte": nome, "ultima_data_interacao": max(data, gravadas.get(nome, data)).to_pydatetime()}
+                   for nome, data in maximos.items()])
+   if fonte:
+      _avancar(conn, [{"fonte": fonte, "ultima_data_interacao": maximos.max().to_pydatetime()}])
+
+def _remover_ja_carregadas(conn, atrasadas: pd.DataFrame, tamanho_lote: int) -> pd.DataFrame:
+   """Anti-join no banco entre as linhas atrasadas e interacao, contando as repetições.
+
+   As linhas vão para uma tabela temporária e cada uma é procurada em interacao
+   pelo índice de data, sem trazer o intervalo inteiro para a memória. Eventos
+   idênticos repetidos contam: a n-ésima cópia só é descartada se o banco já
+   tiver n cópias iguais.
+   """
+   comparadas = pd.DataFrame({
+      "id_usuario": atrasadas["id_usuario"].astype("int64"),
+      "id_conteudo": atrasadas["id_conteudo"].astype("int64"),
+      "id_plataforma": atrasadas["id_plataforma"].astype("int64"),
+      "tipo_interacao": atrasadas["tipo_interacao"].astype(str),
+      "data_interacao": pd.to_datetime(atrasadas["data_interacao"]),
+      "watch_duration_seconds": atrasadas["watch_duration_seconds"].fillna(0).astype("int64"),
+   }).reset_index(drop=True)
+   comparadas["ocorrencia"] = comparadas.groupby(COLUNAS_COMPARADAS).cumcount()
+   comparadas.insert(0, "posicao", np.arange(len(comparadas)))
+
+   temporaria = "TEMPORARY TABLE" if conn.dialect.name == "mysql" else "TABLE"
+   conn.execute(text(f"DROP {temporaria} IF EXISTS interacao_atrasada"))
+   _INTERACAO_ATRASADA.create(conn)
+   registros = comparadas.to_dict("records")
+   for inicio in range(0, len(registros), tamanho_lote):
+      conn.execute(_INTERACAO_ATRASADA.insert(), registros[inicio:inicio + tamanho_lote])
+   novas = conn.execute(text(
+      "SELECT a.posicao FROM interacao_atrasada a WHERE a.ocorrencia >= ("
+      "SELECT COUNT(*) FROM interacao i WHERE i.data_interacao = a.data_interacao "
+      "AND i.id_usuario = a.id_usuario AND i.id_conteudo = a.id_conteudo AND i.id_plataforma = a.id_plataforma "
+      "AND i.tipo_interacao = a.tipo_interacao AND COALESCE(i.watch_duration_seconds, 0) = a.watch_duration_seconds)"
+   )).scalars().all()
+   _INTERACAO_ATRASADA.drop(conn)
+   return atrasadas.iloc[sorted(novas)]
+
+def carregar_dados_incremental(csv_path: str, engine=None, fonte: str = None,
+                               tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> int:
+   """Insere apenas as interações novas do CSV, podendo ser executada várias vezes.
+
+   Cada plataforma tem uma marca d'água com a maior `data_interacao` já
+   carregada em `carga_watermark`, avançada por todas as cargas (uma
+   plataforma sem marca começa da maior data já gravada); `fonte` acrescenta
+   uma marca própria, usada quando for maior. Linhas posteriores à marca são novas; linhas até a marca
+   (reenviadas ou chegadas com atraso) só entram se ainda não existirem em
+   `interacao` (anti-join no banco, contando as repetições).
+   A validação de `validar_dataframe` é aplicada apenas ao delta.
+   Retorna a quantidade de interações inseridas.
+   """
+   df = ler_csv(csv_path).rename(columns={"timestamp_interacao": "data_interacao"})
+
+   engine = engine or criar_engine_mysql()
+   CargaWatermark.__table__.create(engine, checkfirst=True)
+   VersaoDadosDia.__table__.create(engine, checkfirst=True)
+   garantir_tabela_comentario(engine)
+
+   with engine.begin() as conn:
+      # A marca de cada linha é a da sua plataforma (avançada por todas as cargas) ou,
+      # se for maior, a da fonte informada
+      plataformas = [nome for nome in df["plataforma"].dropna().unique()]
+      marcas = _ler_marcas_plataformas(conn, plataformas)
+      marca = pd.to_datetime(df["plataforma"].astype("string").map(marcas))
+      if fonte:
+         marca_fonte = _ler_watermarks(conn, [fonte]).get(fonte)
+         if marca_fonte is not None:
+            marca = marca.fillna(marca_fonte).clip(lower=marca_fonte)
+      mapa_plataformas = ler_mapa_plataformas(conn)
+
+      novas = df[marca.isna() | (df["data_interacao"] > marca)]
+      atrasadas = validar_lote(df[df["data_interacao"] <= marca])
+
+      # Validação apenas sobre o delta
+      delta = validar_lote(novas)
+      if not atrasadas.empty:
+         atrasadas = atrasadas.assign(id_plataforma=mapear_plataformas(atrasadas["plataforma"], mapa_plataformas))
+         atrasadas = _remover_ja_carregadas(conn, atrasadas.dropna(subset=["id_plataforma"]), tamanho_lote)
+         delta = pd.concat([delta, atrasadas.drop(columns="id_plataforma")], ignore_index=True)
+
+      if delta.empty:
+         print("ℹ️ Nenhuma interação nova para carregar.")
+         return 0
+
+      gravar_plataformas_e_usuarios(conn, delta, tamanho_lote)
+      mapa_plataformas = ler_mapa_plataformas(conn)
+      delta["id_plataforma"] = mapear_plataformas(delta["plataforma"], mapa_plataformas)
+      gravar_conteudos(conn, delta, tamanho_lote)
+
+      df_final = delta[COLUNAS_INTERACAO]
+      df_final.to_sql(name="interacao", con=conn, if_exists="append", index=False,
+                      method="multi", chunksize=tamanho_lote)
+      atualizar_rollups(conn, df_final, tamanho_lote)
+      atualizar_sketches(conn, df_final)
+      gravar_comentarios(conn, delta, tamanho_lote)
+      incrementar_versao_dados(conn, df_final["data_interacao"])
+      avancar_watermarks(conn, delta["plataforma"], delta["data_interacao"], fonte)
+
+   print(f"✅ Carga incremental: {len(df_final)} interações novas inseridas "
+         f"({len(df) - len(df_final)} já carregadas ou inválidas).")
+   return len(df_final)
+
 
 if __name__ == "__main__":
-   csv_path = "interacoes_globo.csv"
+   argumentos = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+   csv_path = argumentos[0] if argumentos else "interacoes_globo.csv"
    print(f"Arquivo CSV existe? {os.path.exists(csv_path)}")
    print(f"Caminho absoluto: {os.path.abspath(csv_path)}")
-   carregar_dados(csv_path)
+   if "--lotes" in sys.argv:
+      carregar_dados_em_lotes(csv_path)
+   elif "--incremental" in sys.argv:
+      carregar_dados_incremental(csv_path)
+   elif "--comentarios" in sys.argv:
+      carregar_comentarios(csv_path)
+   else:
+      carregar_dados(csv_path)
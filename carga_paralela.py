@@ -0,0 +1,132 @@
+# carga_paralela.py
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import pandas as pd
+from conexao_sqlalchemy import criar_engine_mysql, garantir_tabela_comentario, CargaWatermark, VersaoDadosDia
+from carga_dados import (
+   LINHAS_POR_LOTE_PADRAO, ler_csv, validar_lote, mapear_plataformas, gravar_plataformas_e_usuarios,
+   gravar_conteudos, gravar_comentarios, ler_mapa_plataformas, preparar_interacoes, avancar_watermarks
+)
+from upsert_lotes import TAMANHO_LOTE_PADRAO
+from rollups import atualizar_rollups
+from sketches import atualizar_sketches
+from cache_relatorios import incrementar_versao_dados
+
+def listar_arquivos(origem: str) -> list:
+   """Aceita um diretório (todos os .csv dele) ou um padrão glob"""
+   if os.path.isdir(origem):
+      origem = os.path.join(origem, "*.csv")
+   return sorted(glob.glob(origem))
+
+def _ler_e_validar(caminho: str):
+   # Executado nos processos de trabalho: só leitura e validação, sem acesso ao banco
+   inicio = time.perf_counter()
+   df = ler_csv(caminho)
+   linhas_lidas = len(df)
+   df = validar_lote(df)
+   return caminho, df, linhas_lidas, time.perf_counter() - inicio
+
+def _gravar_interacoes(engine, df: pd.DataFrame, tamanho_lote: int) -> float:
+   inicio = time.perf_counter()
+   df_final = preparar_interacoes(df)
+   with engine.begin() as conn:
+      df_final.to_sql(name="interacao", con=conn, if_exists="append", index=False,
+                      method="multi", chunksize=tamanho_lote)
+      atualizar_rollups(conn, df_final, tamanho_lote)
+      atualizar_sketches(conn, df_final)
+      gravar_comentarios(conn, df, tamanho_lote)
+      incrementar_versao_dados(conn, df_final["data_interacao"])
+      avancar_watermarks(conn, df["plataforma"], df_final["data_interacao"])
+   return time.perf_counter() - inicio
+
+def carregar_arquivos_em_paralelo(origem: str, engine=None, processos: int = None, conexoes_escrita: int = 2,
+                                  linhas_por_lote: int = LINHAS_POR_LOTE_PADRAO,
+                                  tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> dict:
+   """Carrega vários CSVs de interação em paralelo.
+
+   A leitura e a validação rodam em um pool de processos. As tabelas de
+   dimensão são gravadas por um único estágio (este processo), então os
+   upserts de plataforma/usuário/conteúdo nunca concorrem entre si. As
+   interações seguem em lotes para `conexoes_escrita` conexões de escrita.
+   """
+   arquivos = listar_arquivos(origem)
+   if not arquivos:
+      print(f"ℹ️ Nenhum arquivo CSV encontrado em: {origem}")
+      return {"arquivos": [], "linhas": 0, "segundos": 0.0, "linhas_por_segundo": 0.0}
+
+   engine = engine or criar_engine_mysql()
+   CargaWatermark.__table__.create(engine, checkfirst=True)
+   VersaoDadosDia.__table__.create(engine, checkfirst=True)
+   garantir_tabela_comentario(engine)
+   inicio_total = time.perf_counter()
+   mapa_plataformas = {}
+   estatisticas = {}
+   escritas = {}
+
+   with ProcessPoolExecutor(max_workers=processos) as leitores, \
+        ThreadPoolExecutor(max_workers=conexoes_escrita) as escritores:
+      pendentes = [leitores.submit(_ler_e_validar, caminho) for caminho in arquivos]
+
+      for futuro in as_completed(pendentes):
+         caminho, df, linhas_lidas, segundos_leitura = futuro.result()
+
+         # Estágio único de resolução das dimensões
+         inicio_dimensoes = time.perf_counter()
+         with engine.begin() as conn:
+            gravar_plataformas_e_usuarios(conn, df, tamanho_lote)
+            if not set(df["plataforma"].unique()) <= mapa_plataformas.keys():
+               mapa_plataformas = ler_mapa_plataformas(conn)
+            df["id_plataforma"] = mapear_plataformas(df["plataforma"], mapa_plataformas)
+            gravar_conteudos(conn, df, tamanho_lote)
+
+         estatisticas[caminho] = {
+            "arquivo": caminho,
+            "linhas_lidas": linhas_lidas,
+            "linhas_inseridas": len(df),
+            "segundos_leitura": segundos_leitura,
+            "segundos_dimensoes": time.perf_counter() - inicio_dimensoes,
+         }
+         escritas[caminho] = [
+            escritores.submit(_gravar_interacoes, engine, df.iloc[inicio:inicio + linhas_por_lote], tamanho_lote)
+            for inicio in range(0, len(df), linhas_por_lote)
+         ]
+
+      for caminho, futuros in escritas.items():
+         estatisticas[caminho]["segundos_escrita"] = sum(futuro.result() for futuro in futuros)
+
+   segundos_total = time.perf_counter() - inicio_total
+
+   print("\n📊 Throughput por arquivo:")
+   for item in estatisticas.values():
+      segundos = item["segundos_leitura"] + item["segundos_dimensoes"] + item["segundos_escrita"]
+      item["linhas_por_segundo"] = item["linhas_inseridas"] / segundos if segundos else 0.0
+      print(f"- {os.path.basename(item['arquivo'])}: {item['linhas_inseridas']} linhas "
+            f"(leitura {item['segundos_leitura']:.2f}s, dimensões {item['segundos_dimensoes']:.2f}s, "
+            f"escrita {item['segundos_escrita']:.2f}s) → {item['linhas_por_segundo']:,.0f} linhas/s")
+
+   total_linhas = sum(item["linhas_inseridas"] for item in estatisticas.values())
+   linhas_por_segundo = total_linhas / segundos_total if segundos_total else 0.0
+   print(f"\n✅ {len(arquivos)} arquivos, {total_linhas} interações em {segundos_total:.2f}s "
+         f"→ {linhas_por_segundo:,.0f} linhas/s")
+
+   return {
+      "arquivos": list(estatisticas.values()),
+      "linhas": total_linhas,
+      "segundos": segundos_total,
+      "linhas_por_segundo": linhas_por_segundo,
+   }
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Carga paralela de vários CSVs de interação")
+   parser.add_argument("origem", help="Diretório ou padrão glob dos arquivos CSV")
+   parser.add_argument("--processos", type=int, default=None, help="Processos de leitura (padrão: núcleos da máquina)")
+   parser.add_argument("--conexoes", type=int, default=2, help="Conexões de escrita na tabela interacao")
+   parser.add_argument("--linhas-por-lote", type=int, default=LINHAS_POR_LOTE_PADRAO)
+   args = parser.parse_args()
+
+   carregar_arquivos_em_paralelo(args.origem, processos=args.processos, conexoes_escrita=args.conexoes,
+                                 linhas_por_lote=args.linhas_por_lote)
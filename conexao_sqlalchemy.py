@@ -1,8 +1,9 @@
 # conexao_sqlalchemy.py
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Enum, Text, CheckConstraint, TIMESTAMP, text
+from sqlalchemy import create_engine, inspect, event, DDL, Column, Integer, BigInteger, Boolean, String, Date, DateTime, ForeignKey, Enum, Text, LargeBinary, CheckConstraint, Index, TIMESTAMP, text
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.ext.declarative import declarative_base
 import os
+import threading
 from dotenv import load_dotenv
 import logging
 
@@ -49,20 +50,152 @@ class Interacao(Base):
 
    __table_args__ = (
       CheckConstraint('watch_duration_seconds >= 0', name='check_watch_duration_positive'),
+      # Os relatórios leem interacao_diaria; aqui só o índice de data, usado pelas consultas por
+      # intervalo (tendências por hora, carga incremental). Cada índice de interacao precisa de
+      # uma consulta que o use em indices.CONSULTAS_INDICES; cada um pesa em toda inserção.
+      Index('ix_interacao_data', 'data_interacao'),
    )
 
    usuario = relationship('Usuario', back_populates='interacoes')
    conteudo = relationship('Conteudo', back_populates='interacoes')
    plataforma = relationship('Plataforma', back_populates='interacoes')
 
+class InteracaoDiaria(Base):
+   # Agregado diário de interacao, mantido pelas cargas (ver rollups.py)
+   __tablename__ = 'interacao_diaria'
+   dia = Column(Date, primary_key=True)
+   id_conteudo = Column(Integer, ForeignKey('conteudo.id_conteudo'), primary_key=True)
+   id_plataforma = Column(Integer, ForeignKey('plataforma.id_plataforma'), primary_key=True)
+   tipo_interacao = Column(Enum('view', 'like', 'share', 'comment'), primary_key=True)
+   total_interacoes = Column(BigInteger, nullable=False, default=0)
+   soma_watch_seconds = Column(BigInteger, nullable=False, default=0)
+   qtd_watch = Column(BigInteger, nullable=False, default=0)
+
+   __table_args__ = (
+      # Índices de cobertura: cada relatório de consultas é respondido só pelo índice
+      Index('ix_diaria_tipo_conteudo', 'tipo_interacao', 'id_conteudo', 'total_interacoes'),
+      Index('ix_diaria_tipo_plataforma', 'tipo_interacao', 'id_plataforma', 'id_conteudo', 'total_interacoes'),
+      Index('ix_diaria_conteudo', 'id_conteudo', 'soma_watch_seconds', 'total_interacoes'),
+      Index('ix_diaria_plataforma', 'id_plataforma', 'tipo_interacao', 'total_interacoes', 'soma_watch_seconds', 'qtd_watch'),
+   )
+
+class Comentario(Base):
+   # Texto das interações do tipo comment, com índice de texto completo (ver busca_comentarios.py)
+   __tablename__ = 'comentario'
+   id_comentario = Column(Integer, primary_key=True, autoincrement=True)
+   id_usuario = Column(Integer, ForeignKey('usuario.id_usuario'), nullable=False)
+   id_conteudo = Column(Integer, ForeignKey('conteudo.id_conteudo'), nullable=False)
+   id_plataforma = Column(Integer, ForeignKey('plataforma.id_plataforma'), nullable=False)
+   data_interacao = Column(DateTime, nullable=False)
+   texto = Column(Text, nullable=False)
+
+   __table_args__ = (
+      Index('ix_comentario_conteudo', 'id_conteudo', 'data_interacao'),
+      Index('ix_comentario_plataforma', 'id_plataforma', 'data_interacao'),
+   )
+
+# Índice de texto completo de comentario: FULLTEXT no MySQL; no SQLite, uma tabela FTS5
+# que indexa comentario.texto (sem duplicar o texto), mantida por triggers
+DDL_TEXTO_COMPLETO = {
+   "mysql": ["ALTER TABLE comentario ADD FULLTEXT INDEX ft_comentario_texto (texto)"],
+   "sqlite": [
+      "CREATE VIRTUAL TABLE IF NOT EXISTS comentario_fts USING fts5("
+      "texto, content='comentario', content_rowid='id_comentario', tokenize='unicode61 remove_diacritics 2')",
+      "CREATE TRIGGER IF NOT EXISTS comentario_fts_ai AFTER INSERT ON comentario BEGIN "
+      "INSERT INTO comentario_fts(rowid, texto) VALUES (new.id_comentario, new.texto); END",
+      "CREATE TRIGGER IF NOT EXISTS comentario_fts_ad AFTER DELETE ON comentario BEGIN "
+      "INSERT INTO comentario_fts(comentario_fts, rowid, texto) VALUES ('delete', old.id_comentario, old.texto); END",
+      "CREATE TRIGGER IF NOT EXISTS comentario_fts_au AFTER UPDATE OF texto ON comentario BEGIN "
+      "INSERT INTO comentario_fts(comentario_fts, rowid, texto) VALUES ('delete', old.id_comentario, old.texto); "
+      "INSERT INTO comentario_fts(rowid, texto) VALUES (new.id_comentario, new.texto); END",
+   ],
+}
+for _dialeto, _comandos in DDL_TEXTO_COMPLETO.items():
+   for _comando in _comandos:
+      event.listen(Comentario.__table__, "after_create", DDL(_comando).execute_if(dialect=_dialeto))
+event.listen(Comentario.__table__, "before_drop", DDL("DROP TABLE IF EXISTS comentario_fts").execute_if(dialect="sqlite"))
+
+# Consulta que confirma o índice de texto completo já criado em cada banco
+SQL_TEM_TEXTO_COMPLETO = {
+   "mysql": "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+            "AND table_name = 'comentario' AND index_name = 'ft_comentario_texto' LIMIT 1",
+   "sqlite": "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'comentario_fts'",
+}
+
+def garantir_tabela_comentario(engine):
+   """Cria comentario pelo modelo (com o índice de texto completo) ou repara o índice que faltar.
+
+   Chamada pelas cargas antes de gravar comentários: uma tabela comentario
+   criada sem o modelo (por exemplo, por um to_sql antigo) não tem o FULLTEXT
+   nem a tabela FTS5 e as triggers, e a busca não encontraria nada.
+   """
+   Comentario.__table__.create(engine, checkfirst=True)
+   dialeto = engine.dialect.name
+   if dialeto not in DDL_TEXTO_COMPLETO:
+      return
+   with engine.begin() as conn:
+      if conn.execute(text(SQL_TEM_TEXTO_COMPLETO[dialeto])).first() is not None:
+         return
+      print("⚠️ comentario sem índice de texto completo: criando e indexando os comentários existentes...")
+      for comando in DDL_TEXTO_COMPLETO[dialeto]:
+         conn.execute(text(comando))
+      if dialeto == "sqlite":
+         conn.execute(text("INSERT INTO comentario_fts(comentario_fts) VALUES ('rebuild')"))
+
+class SketchDiario(Base):
+   # Sketches de usuários por (dia, conteúdo, plataforma), gravados pelas cargas e mesclados
+   # na consulta (ver sketches.py). id_conteudo = 0 reúne todos os conteúdos da plataforma.
+   # Cada lote de carga acrescenta uma linha por chave; `python sketches.py compactar` junta as linhas.
+   __tablename__ = 'sketch_diario'
+   id_sketch = Column(Integer, primary_key=True, autoincrement=True)
+   dia = Column(Date, nullable=False)
+   id_conteudo = Column(Integer, nullable=False)
+   id_plataforma = Column(Integer, nullable=False)
+   total_interacoes = Column(BigInteger, nullable=False)
+   hll = Column(LargeBinary, nullable=False)
+   top_usuarios = Column(LargeBinary, nullable=False)
+
+   __table_args__ = (
+      Index('ix_sketch_plataforma_dia', 'id_plataforma', 'dia', 'id_conteudo'),
+      Index('ix_sketch_conteudo_dia', 'id_conteudo', 'dia'),
+   )
+
+class VersaoDados(Base):
+   # Linha única (id = 1) incrementada a cada carga; invalida o cache de relatórios
+   __tablename__ = 'versao_dados'
+   id = Column(Integer, primary_key=True)
+   versao = Column(BigInteger, nullable=False, default=0)
+   atualizado_em = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'))
+
+class VersaoDadosDia(Base):
+   # Última versao_dados que gravou cada dia; o cache de tendências só relê a partir do menor dia alterado
+   __tablename__ = 'versao_dados_dia'
+   dia = Column(Date, primary_key=True)
+   versao = Column(BigInteger, nullable=False)
+
 class RelatoriosSQL(Base):
     __tablename__ = 'relatorios_sql'
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(100), nullable=False, unique=True)
     descricao = Column(Text)
     query_sql = Column(Text, nullable=False)
+    # Parâmetros aceitos pelo relatório, separados por vírgula (ver registro_relatorios.py)
+    parametros = Column(String(255))
     criado_em = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'))
 
+class CargaCheckpoint(Base):
+   __tablename__ = 'carga_checkpoint'
+   arquivo = Column(String(500), primary_key=True)
+   linhas_processadas = Column(BigInteger, nullable=False, default=0)
+   concluido = Column(Boolean, nullable=False, default=False)
+   atualizado_em = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'))
+
+class CargaWatermark(Base):
+   __tablename__ = 'carga_watermark'
+   fonte = Column(String(200), primary_key=True)
+   ultima_data_interacao = Column(DateTime, nullable=False)
+   atualizado_em = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'))
+
 def criar_database_if_not_exists(usuario, senha, host, nome_banco):
    url_sem_banco = f"mysql+mysqlconnector://{usuario}:{senha}@{host}/"
    engine = create_engine(url_sem_banco)
@@ -70,32 +203,92 @@ def criar_database_if_not_exists(usuario, senha, host, nome_banco):
       conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {nome_banco}"))
    engine.dispose()
 
-def criar_engine_mysql(usuario=None, senha=None, host=None, banco=None):
+# Configuração do pool de conexões (QueuePool), ajustável pelo .env
+CONFIG_POOL = {
+   "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+   "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+   "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+   "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+   "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+# Engines já criadas no processo, uma por URL (e opções)
+_engines = {}
+_engines_lock = threading.Lock()
+_bancos_inicializados = set()
+
+def montar_url_mysql(usuario=None, senha=None, host=None, banco=None):
    usuario = usuario or os.getenv("DB_USER")
    senha = senha or os.getenv("DB_PASS")
    host = host or os.getenv("DB_HOST", "localhost")
    banco = banco or os.getenv("DB_NAME", "globo_tech")
+   return f"mysql+mysqlconnector://{usuario}:{senha}@{host}/{banco}"
 
-   criar_database_if_not_exists(usuario, senha, host, banco)
+def obter_engine(url: str, echo: bool = None, **opcoes_pool):
+   """Retorna a engine do processo para a URL, criando-a (com pool) só na primeira chamada"""
+   echo = os.getenv("DB_ECHO", "0") == "1" if echo is None else echo
+   chave = (url, echo, tuple(sorted(opcoes_pool.items())))
+   with _engines_lock:
+      engine = _engines.get(chave)
+      if engine is None:
+         # SQLite (usado em testes e benchmarks) não usa QueuePool
+         opcoes = {} if url.startswith("sqlite") else {**CONFIG_POOL, **opcoes_pool}
+         engine = create_engine(url, echo=echo, **opcoes)
+         _engines[chave] = engine
+   return engine
 
-   url = f"mysql+mysqlconnector://{usuario}:{senha}@{host}/{banco}"
-   engine = create_engine(url, echo=True)
-   
-   # Verifica se a tabela de relatórios existe e está populada
-   with engine.connect() as conn:
-      tabela_existe = conn.execute(text(
-         "SELECT COUNT(*) FROM information_schema.tables "
-         "WHERE table_schema = :banco AND table_name = 'relatorios_sql'"
-      ), {"banco": banco}).scalar()
-      
-      if tabela_existe:
-         registros = conn.execute(text("SELECT COUNT(*) FROM relatorios_sql")).scalar()
-         if registros == 0:
-               print("⚠️ Tabela relatorios_sql existe mas está vazia. Execute inserir_relatorios.py")
-
-   # Cria as tabelas automaticamente
+def descartar_engines():
+   """Fecha os pools de todas as engines criadas no processo"""
+   with _engines_lock:
+      for engine in _engines.values():
+         engine.dispose()
+      _engines.clear()
+
+def criar_engine_mysql(usuario=None, senha=None, host=None, banco=None, **opcoes_pool):
+   # Não cria banco nem tabelas: isso é feito uma única vez por `python bootstrap.py`
+   return obter_engine(montar_url_mysql(usuario, senha, host, banco), **opcoes_pool)
+
+def bootstrap_banco(engine=None, usuario=None, senha=None, host=None, banco=None):
+   """Cria o banco e as tabelas e avisa se relatorios_sql está vazia (uma vez por processo)"""
+   criar_banco = engine is None
+   if criar_banco:
+      usuario = usuario or os.getenv("DB_USER")
+      senha = senha or os.getenv("DB_PASS")
+      host = host or os.getenv("DB_HOST", "localhost")
+      banco = banco or os.getenv("DB_NAME", "globo_tech")
+      engine = criar_engine_mysql(usuario, senha, host, banco)
+
+   chave = engine.url.render_as_string(hide_password=False)
+   if chave in _bancos_inicializados:
+      return engine
+
+   if criar_banco:
+      criar_database_if_not_exists(usuario, senha, host, banco)
+
+   # Cria as tabelas (e índices) que ainda não existem
    Base.metadata.create_all(engine)
+   garantir_tabela_comentario(engine)
+
+   # Bancos criados antes de relatorios_sql.parametros existir
+   if "parametros" not in {coluna["name"] for coluna in inspect(engine).get_columns("relatorios_sql")}:
+      with engine.begin() as conn:
+         conn.execute(text("ALTER TABLE relatorios_sql ADD COLUMN parametros VARCHAR(255)"))
+
+   # Verifica se a tabela de relatórios está populada
+   with engine.connect() as conn:
+      registros = conn.execute(text("SELECT COUNT(*) FROM relatorios_sql")).scalar()
+      if registros == 0:
+         print("⚠️ Tabela relatorios_sql existe mas está vazia. Execute inserir_relatorios.py")
 
+      # Bancos carregados antes de interacao_diaria existir: os relatórios leem só o agregado
+      rollup_vazio = conn.execute(text("SELECT 1 FROM interacao_diaria LIMIT 1")).first() is None
+      com_interacoes = conn.execute(text("SELECT 1 FROM interacao LIMIT 1")).first() is not None
+   if rollup_vazio and com_interacoes:
+      from rollups import reconstruir_rollups  # import local: rollups importa este módulo
+      print("⚠️ interacao_diaria está vazia e interacao não: reconstruindo o agregado diário...")
+      reconstruir_rollups(engine)
+
+   _bancos_inicializados.add(chave)
    return engine
 
 def criar_sessao(engine):
@@ -108,26 +301,31 @@ def carregar_csv_para_mysql(caminho_csv, tabela_destino, engine):
    print(f"Dados inseridos na tabela '{tabela_destino}' com sucesso.")
 
 # Dicionário com consultas SQL para relatórios
+# As consultas sobre interações leem o agregado diário interacao_diaria (mantido pelas
+# cargas) em vez de varrer interacao; os resultados são os mesmos enquanto o rollup
+# estiver consistente, o que pode ser conferido com `python rollups.py verificar`.
 consultas = {
    "ranking_conteudos_consumidos": """
       SELECT 
          c.id_conteudo, 
          c.nome_conteudo, 
          c.tipo_conteudo, 
-         SEC_TO_TIME(SUM(i.watch_duration_seconds)) AS total_consumo
+         SEC_TO_TIME(SUM(r.soma_watch_seconds)) AS total_consumo,
+         SUM(r.soma_watch_seconds) AS soma_watch_seconds
       FROM conteudo c
-      JOIN interacao i ON c.id_conteudo = i.id_conteudo
+      JOIN interacao_diaria r ON c.id_conteudo = r.id_conteudo
+      WHERE 1 = 1 /* filtros */
       GROUP BY c.id_conteudo, c.nome_conteudo, c.tipo_conteudo
-      ORDER BY SUM(i.watch_duration_seconds) DESC
+      ORDER BY soma_watch_seconds DESC
       LIMIT 10;
    """,
    "plataforma_maior_engajamento": """
       SELECT 
          p.nome, 
-         COUNT(*) AS total_engajamento
-      FROM interacao i
-      JOIN plataforma p ON i.id_plataforma = p.id_plataforma
-      WHERE i.tipo_interacao IN ('like', 'share', 'comment')
+         CAST(SUM(r.total_interacoes) AS SIGNED) AS total_engajamento
+      FROM interacao_diaria r
+      JOIN plataforma p ON r.id_plataforma = p.id_plataforma
+      WHERE r.tipo_interacao IN ('like', 'share', 'comment') /* filtros */
       GROUP BY p.nome
       ORDER BY total_engajamento DESC
       LIMIT 10;
@@ -135,14 +333,14 @@ consultas = {
    "total_de_engajamentos_por_plataforma": """
       SELECT
          p.nome AS nome_plataforma,
-         COUNT(*) AS total_engajamento,
-         SUM(CASE WHEN i.tipo_interacao = 'like' THEN 1 ELSE 0 END) AS total_like,
-         SUM(CASE WHEN i.tipo_interacao = 'comment' THEN 1 ELSE 0 END) AS total_comment,
-         SUM(CASE WHEN i.tipo_interacao = 'share' THEN 1 ELSE 0 END) AS total_share,
-         SUM(CASE WHEN i.tipo_interacao = 'view' THEN 1 ELSE 0 END) AS total_view
-      FROM interacao i
-      JOIN plataforma p ON i.id_plataforma = p.id_plataforma
-      WHERE i.tipo_interacao IN ('like', 'comment', 'share', 'view')
+         CAST(SUM(r.total_interacoes) AS SIGNED) AS total_engajamento,
+         SUM(CASE WHEN r.tipo_interacao = 'like' THEN r.total_interacoes ELSE 0 END) AS total_like,
+         SUM(CASE WHEN r.tipo_interacao = 'comment' THEN r.total_interacoes ELSE 0 END) AS total_comment,
+         SUM(CASE WHEN r.tipo_interacao = 'share' THEN r.total_interacoes ELSE 0 END) AS total_share,
+         SUM(CASE WHEN r.tipo_interacao = 'view' THEN r.total_interacoes ELSE 0 END) AS total_view
+      FROM interacao_diaria r
+      JOIN plataforma p ON r.id_plataforma = p.id_plataforma
+      WHERE r.tipo_interacao IN ('like', 'comment', 'share', 'view') /* filtros */
       GROUP BY p.nome
       ORDER BY total_engajamento DESC;
    """,
@@ -150,10 +348,10 @@ consultas = {
       SELECT 
          c.id_conteudo, 
          c.nome_conteudo, 
-         COUNT(*) AS total_comentarios
-      FROM interacao i
-      JOIN conteudo c ON i.id_conteudo = c.id_conteudo
-      WHERE i.tipo_interacao = 'comment'
+         CAST(SUM(r.total_interacoes) AS SIGNED) AS total_comentarios
+      FROM interacao_diaria r
+      JOIN conteudo c ON r.id_conteudo = c.id_conteudo
+      WHERE r.tipo_interacao = 'comment' /* filtros */
       GROUP BY c.id_conteudo, c.nome_conteudo
       ORDER BY total_comentarios DESC
       LIMIT 10;
@@ -161,18 +359,20 @@ consultas = {
    "interacoes_por_tipo_conteudo": """
       SELECT 
          c.tipo_conteudo, 
-         COUNT(*) AS total_interacoes
+         CAST(SUM(r.total_interacoes) AS SIGNED) AS total_interacoes
       FROM conteudo c
-      JOIN interacao i ON c.id_conteudo = i.id_conteudo
+      JOIN interacao_diaria r ON c.id_conteudo = r.id_conteudo
+      WHERE 1 = 1 /* filtros */
       GROUP BY c.tipo_conteudo
       ORDER BY total_interacoes DESC;
    """,
    "tempo_medio_por_plataforma": """
       SELECT 
          p.nome, 
-         SEC_TO_TIME(AVG(i.watch_duration_seconds)) AS tempo_medio
-      FROM interacao i
-      JOIN plataforma p ON i.id_plataforma = p.id_plataforma
+         SEC_TO_TIME(SUM(r.soma_watch_seconds) / SUM(r.qtd_watch)) AS tempo_medio
+      FROM interacao_diaria r
+      JOIN plataforma p ON r.id_plataforma = p.id_plataforma
+      WHERE 1 = 1 /* filtros */
       GROUP BY p.nome
       ORDER BY tempo_medio DESC;
    """,
@@ -180,10 +380,10 @@ consultas = {
       SELECT 
          c.id_conteudo, 
          c.nome_conteudo, 
-         COUNT(*) AS quantidade_comentarios
+         CAST(SUM(r.total_interacoes) AS SIGNED) AS quantidade_comentarios
       FROM conteudo c
-      JOIN interacao i ON c.id_conteudo = i.id_conteudo
-      WHERE i.tipo_interacao = 'comment'
+      JOIN interacao_diaria r ON c.id_conteudo = r.id_conteudo
+      WHERE r.tipo_interacao = 'comment' /* filtros */
       GROUP BY c.id_conteudo, c.nome_conteudo
       ORDER BY quantidade_comentarios DESC;
    """,
@@ -191,11 +391,11 @@ consultas = {
       SELECT 
          p.nome AS plataforma, 
          c.nome_conteudo, 
-         COUNT(i.id_interacao) AS total_assistidos
-      FROM interacao i
-      JOIN conteudo c ON i.id_conteudo = c.id_conteudo
-      JOIN plataforma p ON i.id_plataforma = p.id_plataforma
-      WHERE i.tipo_interacao = 'view'
+         CAST(SUM(r.total_interacoes) AS SIGNED) AS total_assistidos
+      FROM interacao_diaria r
+      JOIN conteudo c ON r.id_conteudo = c.id_conteudo
+      JOIN plataforma p ON r.id_plataforma = p.id_plataforma
+      WHERE r.tipo_interacao = 'view' /* filtros */
       GROUP BY p.nome, c.nome_conteudo
       ORDER BY total_assistidos DESC
       LIMIT 10;
@@ -210,46 +410,27 @@ consultas = {
       ORDER BY criado_em DESC;
    """
 }
+# Parâmetros que cada relatório aceita (filtros aplicados em interacao_diaria e LIMIT)
+PERIODO_E_PLATAFORMA = ["data_inicio", "data_fim", "plataforma", "limite"]
+parametros_relatorios = {
+   "ranking_conteudos_consumidos": PERIODO_E_PLATAFORMA + ["tipo_interacao"],
+   "plataforma_maior_engajamento": PERIODO_E_PLATAFORMA + ["tipo_interacao"],
+   "total_de_engajamentos_por_plataforma": PERIODO_E_PLATAFORMA,
+   "conteudos_mais_comentados": PERIODO_E_PLATAFORMA,
+   "interacoes_por_tipo_conteudo": PERIODO_E_PLATAFORMA + ["tipo_interacao"],
+   "tempo_medio_por_plataforma": PERIODO_E_PLATAFORMA,
+   "comentarios_por_conteudo": PERIODO_E_PLATAFORMA,
+   "conteudos_mais_assistidos_por_plataforma": PERIODO_E_PLATAFORMA,
+   "relatorios_sql": ["limite"],
+}
+# Valores aceitos quando o SQL do relatório já restringe o parâmetro (qualquer outro daria sempre vazio)
+valores_parametros = {
+   "plataforma_maior_engajamento": {"tipo_interacao": ("like", "share", "comment")},
+}
 
-# Exemplo de uso
+
+# Exemplo de uso: executa todo o catálogo em paralelo (ver lote_relatorios.py)
 if __name__ == "__main__":
-   engine_mysql = criar_engine_mysql("root", "sua_senha")
-
-   nome_relatorio = "conteudos_mais_comentados"
-   df_resultado = executar_relatorio_sql(consultas[nome_relatorio], engine_mysql, nome_csv=f"data/{nome_relatorio}.csv")
-   print(f"Relatório '{nome_relatorio}' executado e salvo como {nome_relatorio}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_plataforma = "plataforma_maior_engajamento"
-   df_plataforma = executar_relatorio_sql(consultas[relatorio_plataforma], engine_mysql, nome_csv=f"{relatorio_plataforma}.csv")
-   print(f"Relatório '{relatorio_plataforma}' executado e salvo como {relatorio_plataforma}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_ranking_conteudos_consumidos = "ranking_conteudos_consumidos"
-   df_ranking_conteudos_consumidos = executar_relatorio_sql(consultas[relatorio_ranking_conteudos_consumidos], engine_mysql, nome_csv=f"{relatorio_ranking_conteudos_consumidos}.csv")
-   print(f"Relatório '{relatorio_ranking_conteudos_consumidos}' executado e salvo como {relatorio_ranking_conteudos_consumidos}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_interacoes_por_tipo_conteudo = "interacoes_por_tipo_conteudo"
-   df_interacoes_por_tipo_conteudo = executar_relatorio_sql(consultas[relatorio_interacoes_por_tipo_conteudo], engine_mysql, nome_csv=f"{relatorio_interacoes_por_tipo_conteudo}.csv")
-   print(f"Relatório '{relatorio_interacoes_por_tipo_conteudo}' executado e salvo como {relatorio_interacoes_por_tipo_conteudo}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_tempo_medio_por_plataforma = "tempo_medio_por_plataforma"
-   df_tempo_medio_por_plataforma = executar_relatorio_sql(consultas[relatorio_tempo_medio_por_plataforma], engine_mysql, nome_csv=f"{relatorio_tempo_medio_por_plataforma}.csv")
-   print(f"Relatório '{relatorio_tempo_medio_por_plataforma}' executado e salvo como {relatorio_tempo_medio_por_plataforma}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_comentarios_por_conteudo = "comentarios_por_conteudo"
-   df_comentarios_por_conteudo = executar_relatorio_sql(consultas[relatorio_comentarios_por_conteudo], engine_mysql, nome_csv=f"{relatorio_comentarios_por_conteudo}.csv")
-   print(f"Relatório '{relatorio_comentarios_por_conteudo}' executado e salvo como {relatorio_comentarios_por_conteudo}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_conteudos_mais_assistidos_por_plataforma = "conteudos_mais_assistidos_por_plataforma"
-   df_conteudos_mais_assistidos_por_plataforma = executar_relatorio_sql(consultas[relatorio_conteudos_mais_assistidos_por_plataforma], engine_mysql, nome_csv=f"{relatorio_conteudos_mais_assistidos_por_plataforma}.csv")
-   print(f"Relatório '{relatorio_conteudos_mais_assistidos_por_plataforma}' executado e salvo como {relatorio_conteudos_mais_assistidos_por_plataforma}.csv")
-   print("------------------------------------------------------------\n")
-
-   relatorio_total_engajamentos_por_plataforma = "total_de_engajamentos_por_plataforma"
-   df_total_engajamentos_por_plataforma = executar_relatorio_sql(consultas[relatorio_total_engajamentos_por_plataforma], engine_mysql, nome_csv=f"{relatorio_total_engajamentos_por_plataforma}.csv")
-   print(f"Relatório '{relatorio_total_engajamentos_por_plataforma}' executado e salvo como {relatorio_total_engajamentos_por_plataforma}.csv")
\ No newline at end of file
+   from lote_relatorios import executar_relatorios_em_lote
+
+   executar_relatorios_em_lote(engine=criar_engine_mysql(), diretorio_saida="data")
@@ -0,0 +1,137 @@
+# exportacao.py
+import os
+import time
+import pandas as pd
+from pandas.io.common import get_handle
+
+FORMATOS = {
+   ".csv": "csv",
+   ".parquet": "parquet",
+   ".feather": "feather",
+   ".arrow": "feather",
+}
+
+# Compressão padrão de cada formato (no CSV, deduzida da extensão: .csv.gz, .csv.zst...)
+COMPRESSAO_PADRAO = {"csv": "infer", "parquet": "snappy", "feather": "lz4"}
+
+LINHAS_POR_LOTE_EXPORTACAO = 50_000
+
+def detectar_formato(caminho: str, formato: str = None) -> str:
+   if formato:
+      return formato
+   base, extensao = os.path.splitext(caminho.lower())
+   if extensao in (".gz", ".bz2", ".zip", ".xz", ".zst") and base.endswith(".csv"):
+      return "csv"
+   if extensao not in FORMATOS:
+      raise ValueError(f"Formato não suportado: '{extensao}'. Use {', '.join(sorted(FORMATOS))}")
+   return FORMATOS[extensao]
+
+def _importar_pyarrow():
+   try:
+      import pyarrow
+      import pyarrow.parquet
+      import pyarrow.ipc
+   except ImportError as e:
+      raise ImportError("Exportar em Parquet/Feather requer o pacote pyarrow (pip install pyarrow)") from e
+   return pyarrow
+
+class EscritorStreaming:
+   """Grava lotes de DataFrame em sequência no mesmo arquivo (CSV, Parquet ou Arrow IPC)"""
+
+   def __init__(self, caminho: str, formato: str, compressao: str = None):
+      self.caminho = caminho
+      self.formato = formato
+      self.compressao = compressao if compressao is not None else COMPRESSAO_PADRAO[formato]
+      self.schema = None
+      self._escritor = None
+      self._arquivo = None
+      self.linhas = 0
+
+   def escrever(self, df: pd.DataFrame):
+      if self.formato == "csv":
+         # Um único handle comprimido para todos os lotes: anexar com mode="a" criaria
+         # um membro por lote no .zip (e um fluxo por lote nos demais formatos). O .zip
+         # é montado em memória pelo pandas até fechar; para arquivos grandes prefira .csv.gz
+         if self._arquivo is None:
+            self._arquivo = get_handle(self.caminho, "w", compression=self.compressao, is_text=True)
+         df.to_csv(self._arquivo.handle, index=False, header=self.linhas == 0)
+      else:
+         pa = _importar_pyarrow()
+         if self.schema is None:
+            self.schema = pa.Table.from_pandas(df, preserve_index=False).schema
+            if self.formato == "parquet":
+               self._escritor = pa.parquet.ParquetWriter(self.caminho, self.schema, compression=self.compressao or "none")
+            else:
+               self._arquivo = pa.OSFile(self.caminho, "wb")
+               compressao = None if self.compressao in ("none", "uncompressed") else self.compressao
+               opcoes = pa.ipc.IpcWriteOptions(compression=compressao)
+               self._escritor = pa.ipc.new_file(self._arquivo, self.schema, options=opcoes)
+         # Todos os lotes seguem o schema do primeiro
+         tabela = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+         self._escritor.write_table(tabela)
+      self.linhas += len(df)
+
+   def fechar(self):
+      if self._escritor is not None:
+         self._escritor.close()
+      if self._arquivo is not None:
+         self._arquivo.close()
+
+def salvar_resultado(df: pd.DataFrame, caminho: str, formato: str = None, compressao: str = None):
+   """Salva um DataFrame já materializado no formato indicado pela extensão do arquivo"""
+   formato = detectar_formato(caminho, formato)
+   os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+   escritor = EscritorStreaming(caminho, formato, compressao)
+   escritor.escrever(df)
+   escritor.fechar()
+
+def exportar_relatorio(query_sql, engine, caminho: str, formato: str = None, compressao: str = None,
+                       linhas_por_lote: int = LINHAS_POR_LOTE_EXPORTACAO, parametros: dict = None) -> dict:
+   """Executa a consulta com cursor do lado do servidor e grava o resultado em lotes.
+
+   Nenhum DataFrame com o resultado inteiro é montado: cada lote de
+   `linhas_por_lote` linhas vai direto para o arquivo. Retorna linhas,
+   tempo e tamanho do arquivo gerado. `parametros` traz os valores da
+   instrução preparada por registro_relatorios.
+   """
+   formato = detectar_formato(caminho, formato)
+   os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+   escritor = EscritorStreaming(caminho, formato, compressao)
+
+   inicio = time.perf_counter()
+   with engine.connect() as conn:
+      conn = conn.execution_options(stream_results=True, max_row_buffer=linhas_por_lote)
+      try:
+         for lote in pd.read_sql(query_sql, con=conn, params=parametros, chunksize=linhas_por_lote):
+            # Mesma correção aplicada em relatorios.ler_relatorio
+            if 'criado_em_formatado' in lote.columns:
+               lote['criado_em_formatado'] = lote['criado_em_formatado'].str.replace('%%', '%', regex=False)
+            escritor.escrever(lote)
+      finally:
+         escritor.fechar()
+
+   return {
+      "arquivo": caminho,
+      "formato": formato,
+      "compressao": escritor.compressao,
+      "linhas": escritor.linhas,
+      "segundos": time.perf_counter() - inicio,
+      "bytes": os.path.getsize(caminho) if os.path.exists(caminho) else 0,
+   }
+
+
+if __name__ == "__main__":
+   import argparse
+   from conexao_sqlalchemy import criar_engine_mysql, consultas
+
+   parser = argparse.ArgumentParser(description="Exporta um relatório em lotes, direto do cursor do servidor")
+   parser.add_argument("relatorio", choices=sorted(consultas))
+   parser.add_argument("arquivo", help="Destino; o formato segue a extensão (.csv, .csv.gz, .parquet, .feather)")
+   parser.add_argument("--compressao", default=None, help="Ex.: snappy, zstd, gzip (Parquet); lz4, zstd (Feather)")
+   parser.add_argument("--linhas-por-lote", type=int, default=LINHAS_POR_LOTE_EXPORTACAO)
+   args = parser.parse_args()
+
+   resultado = exportar_relatorio(consultas[args.relatorio], criar_engine_mysql(), args.arquivo,
+                                  compressao=args.compressao, linhas_por_lote=args.linhas_por_lote)
+   print(f"✅ {resultado['linhas']} linhas em {resultado['segundos']:.2f}s → {resultado['arquivo']} "
+         f"({resultado['bytes'] / 1024:.1f} KiB)")
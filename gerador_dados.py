@@ -0,0 +1,149 @@
+# gerador_dados.py
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from exportacao import EscritorStreaming, detectar_formato
+
+# Plataformas do CSV de exemplo; acima disso os nomes são gerados
+PLATAFORMAS_EXEMPLO = [
+   "TV Globo", "Globoplay", "G1", "GE Globo", "Sportv Play", "Multishow", "GNT Play",
+   "Viva", "Canal Brasil", "Premiere", "App Cartola", "Receitas Gshow", "Spotify",
+]
+
+MIX_PADRAO = {"view_start": 0.62, "like": 0.18, "comment": 0.12, "share": 0.08}
+
+PALAVRAS_COMENTARIO = [
+   "adorei", "episódio", "muito", "bom", "ótimo", "final", "capítulo", "gol", "jogo", "ruim",
+   "demais", "quero", "mais", "assistindo", "agora", "melhor", "novela", "elenco", "receita", "top",
+]
+
+LINHAS_POR_BLOCO_PADRAO = 100_000
+
+def _pesos_zipf(quantidade: int, expoente: float) -> np.ndarray:
+   pesos = 1.0 / np.arange(1, quantidade + 1) ** expoente
+   return pesos / pesos.sum()
+
+def _comentarios(rng, quantidade: int, comprimento_min: int, comprimento_max: int) -> np.ndarray:
+   """Textos com comprimento (em caracteres) uniforme entre os limites, montados com o vocabulário fixo"""
+   comprimentos = rng.integers(comprimento_min, comprimento_max + 1, quantidade)
+   palavras = np.array(PALAVRAS_COMENTARIO)
+   # Palavras suficientes para o maior comentário; depois corta no comprimento sorteado
+   por_texto = max(1, comprimento_max // 3 + 1)
+   sorteio = palavras[rng.integers(0, len(palavras), (quantidade, por_texto))]
+   return np.array([" ".join(linha)[:tamanho].strip() for linha, tamanho in zip(sorteio, comprimentos)], dtype=object)
+
+def gerar_interacoes(linhas: int, semente: int = 42, usuarios: int = 100_000, conteudos: int = 2_000,
+                     plataformas: int = 13, zipf_conteudos: float = 1.1, zipf_usuarios: float = 0.8,
+                     mix: dict = None, comentario_min: int = 5, comentario_max: int = 140,
+                     inicio: str = "2024-10-20", dias: int = 30, taxa_invalidas: float = 0.0,
+                     linhas_por_bloco: int = LINHAS_POR_BLOCO_PADRAO):
+   """Gera interações sintéticas em blocos de DataFrame, no mesmo layout do CSV de exemplo.
+
+   A popularidade de conteúdos e usuários segue uma Zipf (poucos itens
+   concentram a maior parte das interações). Cada conteúdo tem uma plataforma
+   de origem, usada em 80% das suas interações. As datas crescem ao longo do
+   fluxo, como numa coleta contínua. `taxa_invalidas` insere linhas que
+   validar_dataframe descarta (duração negativa ou usuário ausente).
+   O resultado é determinístico para a mesma semente e o mesmo `linhas_por_bloco`.
+   """
+   mix = mix or MIX_PADRAO
+   tipos = np.array(list(mix))
+   prob_tipos = np.array(list(mix.values()), dtype=float)
+   prob_tipos /= prob_tipos.sum()
+
+   rng_catalogo = np.random.default_rng([semente, 0])
+   nomes_plataforma = np.array(
+      PLATAFORMAS_EXEMPLO[:plataformas] + [f"Plataforma {i}" for i in range(len(PLATAFORMAS_EXEMPLO) + 1, plataformas + 1)],
+      dtype=object
+   )
+   nomes_conteudo = np.array([f"Conteúdo {i}" for i in range(1, conteudos + 1)], dtype=object)
+   plataforma_origem = rng_catalogo.integers(0, plataformas, conteudos)
+   # Duração típica de cada conteúdo (5 min a 2 h), limite das visualizações
+   duracao_conteudo = rng_catalogo.integers(300, 7_200, conteudos)
+   prob_conteudos = _pesos_zipf(conteudos, zipf_conteudos)
+   prob_usuarios = _pesos_zipf(usuarios, zipf_usuarios)
+   # A posição no ranking de popularidade não acompanha o id
+   ids_usuario = rng_catalogo.permutation(usuarios) + 1
+
+   inicio = pd.Timestamp(inicio)
+   segundos_por_linha = dias * 86_400 / max(linhas, 1)
+
+   for numero_bloco, primeira_linha in enumerate(range(0, linhas, linhas_por_bloco), 1):
+      rng = np.random.default_rng([semente, numero_bloco])
+      quantidade = min(linhas_por_bloco, linhas - primeira_linha)
+
+      conteudo = rng.choice(conteudos, quantidade, p=prob_conteudos)
+      outra_plataforma = rng.random(quantidade) >= 0.8
+      plataforma = np.where(outra_plataforma, rng.integers(0, plataformas, quantidade), plataforma_origem[conteudo])
+      tipo = tipos[rng.choice(len(tipos), quantidade, p=prob_tipos)]
+
+      visualizacao = np.isin(tipo, ["view_start", "view"])
+      assistido = np.minimum(rng.lognormal(6.5, 1.0, quantidade), duracao_conteudo[conteudo]).astype(np.int64)
+      watch = np.where(visualizacao, assistido, 0)
+
+      comentario = np.full(quantidade, None, dtype=object)
+      e_comentario = tipo == "comment"
+      comentario[e_comentario] = _comentarios(rng, int(e_comentario.sum()), comentario_min, comentario_max)
+
+      posicao = primeira_linha + np.arange(quantidade) + rng.random(quantidade)
+      timestamp = inicio + pd.to_timedelta(np.floor(posicao * segundos_por_linha), unit="s")
+
+      bloco = pd.DataFrame({
+         "id_conteudo": conteudo + 1,
+         "nome_conteudo": nomes_conteudo[conteudo],
+         "id_usuario": pd.array(ids_usuario[rng.choice(usuarios, quantidade, p=prob_usuarios)], dtype="Int64"),
+         "timestamp_interacao": timestamp,
+         "plataforma": nomes_plataforma[plataforma],
+         "tipo_interacao": tipo,
+         "watch_duration_seconds": watch,
+         "comment_text": pd.array(comentario, dtype="string"),
+      })
+
+      if taxa_invalidas:
+         invalida = rng.random(quantidade) < taxa_invalidas
+         sem_usuario = invalida & (rng.random(quantidade) < 0.5)
+         bloco.loc[invalida & ~sem_usuario, "watch_duration_seconds"] = -1
+         bloco.loc[sem_usuario, "id_usuario"] = pd.NA
+
+      yield bloco
+
+def salvar_interacoes(caminho: str, linhas: int, formato: str = None, compressao: str = None, **opcoes) -> dict:
+   """Grava as interações de gerar_interacoes bloco a bloco (CSV, Parquet ou Feather, pela extensão)"""
+   formato = detectar_formato(caminho, formato)
+   escritor = EscritorStreaming(caminho, formato, compressao)
+   inicio = time.perf_counter()
+   try:
+      for bloco in gerar_interacoes(linhas, **opcoes):
+         escritor.escrever(bloco)
+   finally:
+      escritor.fechar()
+   return {"arquivo": caminho, "formato": formato, "linhas": escritor.linhas, "segundos": time.perf_counter() - inicio}
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Gera interações sintéticas (determinísticas pela semente)")
+   parser.add_argument("arquivo", help="Destino; o formato segue a extensão (.csv, .csv.gz, .parquet, .feather)")
+   parser.add_argument("linhas", type=float, help="Quantidade de interações (aceita 1e6)")
+   parser.add_argument("--semente", type=int, default=42)
+   parser.add_argument("--usuarios", type=int, default=100_000)
+   parser.add_argument("--conteudos", type=int, default=2_000)
+   parser.add_argument("--plataformas", type=int, default=13)
+   parser.add_argument("--zipf", type=float, default=1.1, help="Expoente da popularidade dos conteúdos")
+   parser.add_argument("--mix", default=None, help="Proporção dos tipos, ex.: view_start=0.7,like=0.2,comment=0.1")
+   parser.add_argument("--comentario", default="5:140", help="Comprimento mínimo:máximo dos comentários")
+   parser.add_argument("--dias", type=int, default=30)
+   parser.add_argument("--invalidas", type=float, default=0.0, help="Fração de linhas inválidas")
+   args = parser.parse_args()
+
+   mix = None
+   if args.mix:
+      mix = {tipo: float(peso) for tipo, peso in (item.split("=") for item in args.mix.split(","))}
+   comentario_min, comentario_max = (int(valor) for valor in args.comentario.split(":"))
+
+   resultado = salvar_interacoes(
+      args.arquivo, int(args.linhas), semente=args.semente, usuarios=args.usuarios, conteudos=args.conteudos,
+      plataformas=args.plataformas, zipf_conteudos=args.zipf, mix=mix, comentario_min=comentario_min,
+      comentario_max=comentario_max, dias=args.dias, taxa_invalidas=args.invalidas
+   )
+   print(f"✅ {resultado['linhas']:,} interações em {resultado['segundos']:.2f}s → {resultado['arquivo']}")
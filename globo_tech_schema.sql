@@ -39,7 +39,88 @@ CREATE TABLE IF NOT EXISTS interacao (
 
     FOREIGN KEY (id_usuario) REFERENCES usuario(id_usuario), -- Chave estrangeira para usuário
     FOREIGN KEY (id_conteudo) REFERENCES conteudo(id_conteudo), -- Chave estrangeira para conteúdo
-    FOREIGN KEY (id_plataforma) REFERENCES plataforma(id_plataforma) -- Chave estrangeira para plataforma
+    FOREIGN KEY (id_plataforma) REFERENCES plataforma(id_plataforma), -- Chave estrangeira para plataforma
+
+    INDEX ix_interacao_data (data_interacao) -- Carga incremental e intervalos de datas
+);
+
+-- 6. Agregado diário de interações (rollup mantido pelas cargas)
+CREATE TABLE IF NOT EXISTS interacao_diaria (
+    dia DATE NOT NULL, -- Dia da interação (DATE(data_interacao))
+    id_conteudo INT NOT NULL,
+    id_plataforma INT NOT NULL,
+    tipo_interacao ENUM('view', 'like', 'share', 'comment') NOT NULL,
+    total_interacoes BIGINT NOT NULL DEFAULT 0, -- COUNT(*)
+    soma_watch_seconds BIGINT NOT NULL DEFAULT 0, -- SUM(watch_duration_seconds)
+    qtd_watch BIGINT NOT NULL DEFAULT 0, -- COUNT(watch_duration_seconds), usado no AVG
+    PRIMARY KEY (dia, id_conteudo, id_plataforma, tipo_interacao),
+    FOREIGN KEY (id_conteudo) REFERENCES conteudo(id_conteudo),
+    FOREIGN KEY (id_plataforma) REFERENCES plataforma(id_plataforma),
+
+    -- Índices de cobertura para os relatórios (a consulta é respondida só pelo índice)
+    INDEX ix_diaria_tipo_conteudo (tipo_interacao, id_conteudo, total_interacoes),
+    INDEX ix_diaria_tipo_plataforma (tipo_interacao, id_plataforma, id_conteudo, total_interacoes),
+    INDEX ix_diaria_conteudo (id_conteudo, soma_watch_seconds, total_interacoes),
+    INDEX ix_diaria_plataforma (id_plataforma, tipo_interacao, total_interacoes, soma_watch_seconds, qtd_watch)
+);
+
+-- 7. Controle da carga em lotes (retomada após falha)
+CREATE TABLE IF NOT EXISTS carga_checkpoint (
+    arquivo VARCHAR(500) PRIMARY KEY, -- Caminho absoluto do CSV carregado
+    linhas_processadas BIGINT NOT NULL DEFAULT 0, -- Linhas do CSV já gravadas (inclui as descartadas na validação)
+    concluido BOOLEAN NOT NULL DEFAULT FALSE, -- Indica se o arquivo foi carregado até o fim
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 8. Marca d'água da carga incremental (maior data_interacao carregada por fonte)
+CREATE TABLE IF NOT EXISTS carga_watermark (
+    fonte VARCHAR(200) PRIMARY KEY, -- Origem dos dados (por padrão, o nome da plataforma)
+    ultima_data_interacao DATETIME NOT NULL, -- Maior data_interacao já gravada para a fonte
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 9. Versão dos dados (incrementada a cada carga, invalida o cache de relatórios)
+CREATE TABLE IF NOT EXISTS versao_dados (
+    id INT PRIMARY KEY, -- Sempre 1
+    versao BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Última versão que gravou cada dia (o cache de tendências relê só a partir do menor dia alterado)
+CREATE TABLE IF NOT EXISTS versao_dados_dia (
+    dia DATE PRIMARY KEY, -- DATE(data_interacao); 1000-01-01 marca uma carga que vale para todos os dias
+    versao BIGINT NOT NULL
+);
+
+-- 10. Texto dos comentários (interações do tipo comment), com busca por texto completo
+CREATE TABLE IF NOT EXISTS comentario (
+    id_comentario INT AUTO_INCREMENT PRIMARY KEY,
+    id_usuario INT NOT NULL,
+    id_conteudo INT NOT NULL,
+    id_plataforma INT NOT NULL,
+    data_interacao DATETIME NOT NULL, -- Mesma data da interação de origem
+    texto TEXT NOT NULL, -- comment_text do CSV
+    FOREIGN KEY (id_usuario) REFERENCES usuario(id_usuario),
+    FOREIGN KEY (id_conteudo) REFERENCES conteudo(id_conteudo),
+    FOREIGN KEY (id_plataforma) REFERENCES plataforma(id_plataforma),
+
+    INDEX ix_comentario_conteudo (id_conteudo, data_interacao), -- Busca restrita a um conteúdo
+    INDEX ix_comentario_plataforma (id_plataforma, data_interacao), -- Busca restrita a uma plataforma
+    FULLTEXT INDEX ft_comentario_texto (texto) -- MATCH ... AGAINST em busca_comentarios.py
+);
+
+-- 11. Sketches de usuários únicos (HyperLogLog) e mais engajados (Misra-Gries) por dia
+CREATE TABLE IF NOT EXISTS sketch_diario (
+    id_sketch INT AUTO_INCREMENT PRIMARY KEY,
+    dia DATE NOT NULL,
+    id_conteudo INT NOT NULL, -- 0 = todos os conteúdos da plataforma
+    id_plataforma INT NOT NULL,
+    total_interacoes BIGINT NOT NULL, -- Interações resumidas na linha (limite de erro do top de usuários)
+    hll BLOB NOT NULL, -- Registradores HyperLogLog (zlib)
+    top_usuarios BLOB NOT NULL, -- Contadores Misra-Gries: id_usuario e contagem (zlib)
+
+    INDEX ix_sketch_plataforma_dia (id_plataforma, dia, id_conteudo),
+    INDEX ix_sketch_conteudo_dia (id_conteudo, dia)
 );
 
 -- ==========================
@@ -48,18 +129,19 @@ CREATE TABLE IF NOT EXISTS interacao (
 
 -- 1. Ranking de conteúdos mais consumidos (por tempo total)
 -- SUM: soma total do tempo assistido
--- SEC_TO_TIME: converte segundos para HH:MM:SS
+-- SEC_TO_TIME: converte segundos para HH:MM:SS (só para exibição; TIME satura em 838:59:59)
 -- JOIN: une conteúdo e interações
 -- GROUP BY: agrupa por conteúdo
 SELECT
     c.id_conteudo,
     c.nome_conteudo,
     c.tipo_conteudo,
-    SEC_TO_TIME(SUM(i.watch_duration_seconds)) AS total_consumo
+    SEC_TO_TIME(SUM(i.watch_duration_seconds)) AS total_consumo,
+    SUM(i.watch_duration_seconds) AS soma_watch_seconds
 FROM conteudo c
 JOIN interacao i ON c.id_conteudo = i.id_conteudo
 GROUP BY c.id_conteudo, c.nome_conteudo, c.tipo_conteudo
-ORDER BY SUM(i.watch_duration_seconds) DESC
+ORDER BY soma_watch_seconds DESC
 LIMIT 10;
 
 -- 2. Plataforma com maior engajamento (like, share, comment)
@@ -147,6 +229,7 @@ CREATE TABLE IF NOT EXISTS relatorios_sql (
     nome VARCHAR(100) NOT NULL UNIQUE,
     descricao TEXT,
     query_sql TEXT NOT NULL,
+    parametros VARCHAR(255),
     criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -242,5 +325,6 @@ CREATE TABLE IF NOT EXISTS relatorios_sql (
     nome VARCHAR(100) NOT NULL UNIQUE,
     descricao TEXT,
     query_sql TEXT NOT NULL,
+    parametros VARCHAR(255),
     criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
\ No newline at end of file
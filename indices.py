@@ -0,0 +1,184 @@
+# indices.py
+import argparse
+import re
+import sys
+import pandas as pd
+from sqlalchemy import text, inspect
+from conexao_sqlalchemy import criar_engine_mysql, Interacao, InteracaoDiaria
+from relatorios import listar_relatorios
+from cache_relatorios import normalizar_sql
+
+# Tabelas em que uma varredura completa no plano de execução é considerada regressão
+TABELAS_GRANDES = {"interacao", "interacao_diaria"}
+
+# Consulta que justifica cada índice de interacao: `explain` falha se o índice não for usado por ela
+# (nem por um relatório). Cada índice a mais é mantido em toda inserção, inclusive na ingestão contínua.
+CONSULTAS_INDICES = {
+   "ix_interacao_data": (
+      "tendências por hora e carga incremental (intervalo de data_interacao)",
+      "SELECT COUNT(*), SUM(watch_duration_seconds) FROM interacao "
+      "WHERE data_interacao >= '2024-10-01' AND data_interacao < '2024-10-02'",
+   ),
+}
+
+# Índices que já existiram e nenhuma consulta usa (os relatórios leem interacao_diaria)
+INDICES_REMOVIDOS = {
+   "interacao": ["ix_interacao_tipo_conteudo", "ix_interacao_tipo_plataforma",
+                 "ix_interacao_conteudo_watch", "ix_interacao_plataforma_watch"],
+}
+
+def criar_indices(engine):
+   """Cria em um banco já existente os índices declarados nos modelos (create_all só cria em tabelas novas)
+   e remove os que saíram deles"""
+   for tabela, nomes in INDICES_REMOVIDOS.items():
+      existentes = {indice["name"] for indice in inspect(engine).get_indexes(tabela)}
+      for nome in nomes:
+         if nome in existentes:
+            with engine.begin() as conn:
+               conn.execute(text(f"DROP INDEX {nome} ON {tabela}" if engine.dialect.name == "mysql"
+                                 else f"DROP INDEX {nome}"))
+            print(f"🗑️ Índice {nome} removido de {tabela}")
+   for modelo in (Interacao, InteracaoDiaria):
+      for indice in sorted(modelo.__table__.indexes, key=lambda i: i.name):
+         indice.create(engine, checkfirst=True)
+         print(f"✅ Índice {indice.name} em {modelo.__tablename__}")
+
+def _mapa_aliases(query_sql: str) -> dict:
+   aliases = {}
+   for tabela, alias in re.findall(r"(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", query_sql, flags=re.IGNORECASE):
+      aliases[tabela] = tabela
+      if alias and alias.upper() not in {"JOIN", "WHERE", "GROUP", "ORDER", "LIMIT", "ON", "INNER", "LEFT"}:
+         aliases[alias] = tabela
+   return aliases
+
+def _plano_mysql(conn, query_sql: str, aliases: dict) -> list:
+   plano = []
+   for linha in conn.execute(text("EXPLAIN " + query_sql)).mappings():
+      tabela = aliases.get(linha["table"], linha["table"])
+      plano.append({
+         "tabela": tabela,
+         "acesso": linha["type"],
+         "indice": linha["key"],
+         "linhas_estimadas": linha["rows"],
+         "varredura_completa": linha["type"] == "ALL",
+         "varredura_indice": linha["type"] == "index",
+      })
+   return plano
+
+def _plano_sqlite(conn, query_sql: str, aliases: dict) -> list:
+   plano = []
+   for linha in conn.execute(text("EXPLAIN QUERY PLAN " + query_sql)):
+      detalhe = linha[-1]
+      partes = detalhe.split()
+      if partes[0] not in ("SCAN", "SEARCH"):
+         continue
+      usa_indice = "INDEX" in detalhe or "PRIMARY KEY" in detalhe
+      plano.append({
+         "tabela": aliases.get(partes[1], partes[1]),
+         "acesso": detalhe,
+         "indice": detalhe.split("INDEX ")[-1].split()[0] if "INDEX " in detalhe else None,
+         "linhas_estimadas": None,
+         "varredura_completa": partes[0] == "SCAN" and not usa_indice,
+         "varredura_indice": partes[0] == "SCAN" and usa_indice,
+      })
+   return plano
+
+def explicar_relatorios(engine, tabelas_grandes: set = TABELAS_GRANDES) -> pd.DataFrame:
+   """Executa EXPLAIN em cada relatório registrado e aponta varreduras completas.
+
+   Também explica as consultas de CONSULTAS_INDICES e confere se cada índice de
+   interacao aparece em algum plano. Retorna um DataFrame com uma linha por tabela
+   de cada plano; a coluna `alerta` marca varreduras completas (sem índice) em
+   `tabelas_grandes` e índices de interacao que nenhuma consulta usa.
+   """
+   consultas = sorted(listar_relatorios(engine).items()) + \
+               [(f"índice {indice}: {descricao}", query_sql) for indice, (descricao, query_sql) in CONSULTAS_INDICES.items()]
+   linhas = []
+   with engine.connect() as conn:
+      planejar = _plano_mysql if engine.dialect.name == "mysql" else _plano_sqlite
+      for nome, query_sql in consultas:
+         query_sql = normalizar_sql(query_sql)
+         try:
+            plano = planejar(conn, query_sql, _mapa_aliases(query_sql))
+         except Exception as e:
+            linhas.append({"relatorio": nome, "tabela": None, "acesso": f"erro: {e}", "alerta": False})
+            continue
+         for passo in plano:
+            passo["alerta"] = passo["varredura_completa"] and passo["tabela"] in tabelas_grandes
+            linhas.append({"relatorio": nome, **passo})
+
+   usados = {linha.get("indice") for linha in linhas}
+   for indice in sorted(Interacao.__table__.indexes, key=lambda i: i.name):
+      if indice.name not in usados:
+         acesso = "índice que nenhuma consulta usa" if indice.name in CONSULTAS_INDICES \
+            else "índice sem consulta em CONSULTAS_INDICES"
+         linhas.append({"relatorio": indice.name, "tabela": "interacao", "acesso": acesso, "alerta": True})
+
+   resultado = pd.DataFrame(linhas)
+   alertas = resultado[resultado["alerta"]] if not resultado.empty else resultado
+   if alertas.empty:
+      print(f"✅ Nenhuma varredura completa em {', '.join(sorted(tabelas_grandes))}.")
+   else:
+      print(f"❌ {len(alertas)} varredura(s) completa(s) ou índice(s) sem uso encontrado(s):")
+      for _, alerta in alertas.iterrows():
+         print(f"- {alerta['relatorio']}: {alerta['tabela']} ({alerta['acesso']})")
+   return resultado
+
+def gerar_ddl_particionamento(engine, meses_futuros: int = 12) -> list:
+   """Gera o DDL (MySQL) para particionar interacao por mês de data_interacao.
+
+   O InnoDB não aceita chaves estrangeiras em tabelas particionadas e exige a
+   coluna de particionamento em toda chave única, então o DDL remove as FKs
+   de interacao e inclui data_interacao na chave primária.
+   """
+   with engine.connect() as conn:
+      inicio, fim = conn.execute(text("SELECT MIN(data_interacao), MAX(data_interacao) FROM interacao")).one()
+      fks = [linha[0] for linha in conn.execute(text(
+         "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+         "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'interacao' AND CONSTRAINT_TYPE = 'FOREIGN KEY'"
+      ))]
+
+   hoje = pd.Timestamp.today()
+   inicio = pd.Timestamp(inicio or hoje).to_period("M")
+   fim = pd.Timestamp(fim or hoje).to_period("M") + meses_futuros
+
+   particoes = []
+   for mes in pd.period_range(inicio, fim, freq="M"):
+      limite = (mes + 1).start_time.strftime("%Y-%m-%d")
+      particoes.append(f"PARTITION p{mes.strftime('%Y%m')} VALUES LESS THAN ('{limite}')")
+   particoes.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+
+   ddl = [f"ALTER TABLE interacao DROP FOREIGN KEY {fk}" for fk in fks]
+   ddl.append("ALTER TABLE interacao DROP PRIMARY KEY, ADD PRIMARY KEY (id_interacao, data_interacao)")
+   ddl.append(
+      "ALTER TABLE interacao PARTITION BY RANGE COLUMNS(data_interacao) (\n   "
+      + ",\n   ".join(particoes) + "\n)"
+   )
+   return ddl
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Índices e desenho físico do banco globo_tech")
+   subcomandos = parser.add_subparsers(dest="comando", required=True)
+   subcomandos.add_parser("criar", help="Cria os índices dos modelos em um banco existente")
+   subcomandos.add_parser("explain", help="Executa EXPLAIN nos relatórios e aponta varreduras completas")
+   particionar = subcomandos.add_parser("particionar", help="Gera o DDL de particionamento mensal de interacao")
+   particionar.add_argument("--meses-futuros", type=int, default=12)
+   particionar.add_argument("--executar", action="store_true", help="Aplica o DDL em vez de apenas exibi-lo")
+   args = parser.parse_args()
+
+   engine = criar_engine_mysql()
+   if args.comando == "criar":
+      criar_indices(engine)
+   elif args.comando == "explain":
+      resultado = explicar_relatorios(engine)
+      sys.exit(1 if not resultado.empty and resultado["alerta"].any() else 0)
+   elif args.comando == "particionar":
+      ddl = gerar_ddl_particionamento(engine, args.meses_futuros)
+      for comando in ddl:
+         print(comando + ";\n")
+      if args.executar:
+         with engine.begin() as conn:
+            for comando in ddl:
+               conn.execute(text(comando))
+         print("✅ interacao particionada por mês.")
@@ -0,0 +1,567 @@
+# ingestao_continua.py
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, DataError
+from conexao_sqlalchemy import criar_engine_mysql, garantir_tabela_comentario, CargaCheckpoint, CargaWatermark, VersaoDadosDia
+from carga_dados import (
+   DTYPES_CSV, ler_csv, validar_lote, ler_mapa_plataformas, mapear_plataformas,
+   gravar_conteudos, gravar_comentarios, preparar_interacoes, ler_checkpoint, gravar_checkpoint,
+   avancar_watermarks, para_int32
+)
+from upsert_lotes import upsert_em_lotes, TAMANHO_LOTE_PADRAO
+from rollups import atualizar_rollups
+from sketches import atualizar_sketches, compactar_sketches
+from cache_relatorios import incrementar_versao_dados
+
+# Um micro-lote é gravado quando junta MAX_EVENTOS eventos ou quando o mais antigo
+# espera MAX_ESPERA segundos, o que vier primeiro
+MAX_EVENTOS_PADRAO = int(os.getenv("INGESTAO_MAX_EVENTOS", "5000"))
+MAX_ESPERA_PADRAO = float(os.getenv("INGESTAO_MAX_ESPERA", "1.0"))
+# Eventos aceitos e ainda não gravados; com a fila cheia, os produtores param de ler (backpressure)
+CAPACIDADE_PADRAO = int(os.getenv("INGESTAO_CAPACIDADE", "50000"))
+EVENTOS_POR_PEDACO = 1000
+INTERVALO_SPOOL = 0.5
+INTERVALO_METRICAS_PADRAO = 10.0
+INTERVALO_COMPACTACAO_PADRAO = 600.0
+ESPERA_MAXIMA_NOVA_TENTATIVA = 30.0
+TENTATIVAS_NO_ENCERRAMENTO = 3
+# Depois destas tentativas com erro do banco, o micro-lote vai para rejeitados/ e a ingestão segue
+TENTATIVAS_GRAVACAO_PADRAO = int(os.getenv("INGESTAO_TENTATIVAS", "10"))
+LATENCIAS_GUARDADAS = 100_000
+EXTENSOES_SPOOL = (".csv", ".jsonl")
+
+def normalizar_eventos(df: pd.DataFrame) -> pd.DataFrame:
+   """Eventos de JSON ou CSV com os tipos de DTYPES_CSV.
+
+   Valores que não convertem (inclusive inteiros fora dos 32 bits das colunas)
+   viram nulos (e a validação descarta a linha);
+   linhas sem data também são descartadas. Tipos de interação desconhecidos
+   seguem como texto para validar_lote, que os descarta e informa.
+   """
+   df = df.reindex(columns=list(dict.fromkeys(list(df.columns) + list(DTYPES_CSV) + ["timestamp_interacao"])))
+   colunas = {}
+   for coluna, tipo in DTYPES_CSV.items():
+      if tipo == "Int32":
+         colunas[coluna] = para_int32(df[coluna])
+      elif isinstance(tipo, pd.CategoricalDtype) or tipo == "category":
+         colunas[coluna] = df[coluna].astype("string").astype("category")
+      else:
+         colunas[coluna] = df[coluna].astype(tipo)
+   colunas["timestamp_interacao"] = pd.to_datetime(df["timestamp_interacao"], errors="coerce")
+   df = df.assign(**colunas)
+   return df[df["timestamp_interacao"].notna()]
+
+def _texto(valor):
+   return valor if isinstance(valor, str) else None
+
+def chave_checkpoint(caminho: str) -> str:
+   """Chave do arquivo do spool em carga_checkpoint: caminho, mtime e tamanho, para um arquivo
+   novo com o mesmo nome não herdar a posição de um anterior"""
+   info = os.stat(caminho)
+   return f"{caminho}|{info.st_mtime_ns}|{info.st_size}"
+
+class CacheDimensoes:
+   """Plataformas, usuários e conteúdos já gravados, mantidos em memória pelo serviço.
+
+   Cada micro-lote grava só as dimensões que ainda não estão no cache, sem reler
+   a tabela plataforma. As novidades só entram no cache depois do commit do lote,
+   então um lote desfeito não deixa o cache apontando para linhas inexistentes.
+   """
+
+   def __init__(self, engine):
+      with engine.connect() as conn:
+         self.plataformas = ler_mapa_plataformas(conn)
+         conteudos = pd.read_sql("SELECT id_conteudo, nome_conteudo, id_plataforma FROM conteudo", con=conn)
+      self.conteudos = {int(id_conteudo): (_texto(nome), int(id_plataforma))
+                        for id_conteudo, nome, id_plataforma in conteudos.itertuples(index=False)}
+      # Começa vazio: a tabela usuario pode ser grande e o upsert já ignora os existentes
+      self.usuarios = set()
+
+   def gravar(self, conn, df: pd.DataFrame, tamanho_lote: int) -> dict:
+      """Grava as dimensões novas do lote e preenche df['id_plataforma']; devolve o que confirmar()"""
+      novas_plataformas = [nome for nome in df["plataforma"].unique() if nome not in self.plataformas]
+      plataformas = {}
+      if novas_plataformas:
+         upsert_em_lotes(conn, "plataforma", [{"nome": nome} for nome in novas_plataformas], chaves=["nome"],
+                         tamanho_lote=tamanho_lote)
+         consulta = text("SELECT id_plataforma, nome FROM plataforma WHERE nome IN :nomes") \
+            .bindparams(bindparam("nomes", expanding=True))
+         plataformas = {nome: id_plataforma for id_plataforma, nome in conn.execute(consulta, {"nomes": novas_plataformas})}
+      df["id_plataforma"] = mapear_plataformas(df["plataforma"], {**self.plataformas, **plataformas})
+
+      usuarios = [int(uid) for uid in df["id_usuario"].unique() if int(uid) not in self.usuarios]
+      upsert_em_lotes(conn, "usuario", [{"id_usuario": uid} for uid in usuarios], chaves=["id_usuario"],
+                      tamanho_lote=tamanho_lote)
+
+      conteudos = df[["id_conteudo", "nome_conteudo", "id_plataforma"]].drop_duplicates(subset=["id_conteudo"], keep="last")
+      conteudos = conteudos.astype({"id_conteudo": int, "id_plataforma": int})
+      alterados = [self.conteudos.get(id_conteudo) != (_texto(nome), id_plataforma)
+                   for id_conteudo, nome, id_plataforma in conteudos.itertuples(index=False)]
+      conteudos = conteudos[alterados]
+      if not conteudos.empty:
+         gravar_conteudos(conn, conteudos, tamanho_lote)
+      return {"plataformas": plataformas, "usuarios": usuarios, "conteudos": conteudos}
+
+   def confirmar(self, novidades: dict):
+      self.plataformas.update(novidades["plataformas"])
+      self.usuarios.update(novidades["usuarios"])
+      for id_conteudo, nome, id_plataforma in novidades["conteudos"].itertuples(index=False):
+         self.conteudos[id_conteudo] = (_texto(nome), id_plataforma)
+
+class _ReceptorEventos(socketserver.BaseRequestHandler):
+   """Uma conexão do socket: um evento JSON por linha, agrupados em pedaços para a fila"""
+
+   def handle(self):
+      servico = self.server.servico
+      self.request.settimeout(0.2)
+      buffer, eventos, origens = b"", [], []
+      while True:
+         try:
+            dados = self.request.recv(65536)
+         except socket.timeout:
+            dados = None
+         if dados:
+            buffer += dados
+            *linhas, buffer = buffer.split(b"\n")
+            agora = time.time()
+            for linha in linhas:
+               if not linha.strip():
+                  continue
+               try:
+                  evento = json.loads(linha)
+               except ValueError:
+                  servico.contar("descartados")
+                  continue
+               if not isinstance(evento, dict):
+                  servico.contar("descartados")
+                  continue
+               try:
+                  origem = float(evento.pop("enviado_em", None) or agora)
+               except (TypeError, ValueError):
+                  origem = agora
+               eventos.append(evento)
+               origens.append(origem)
+         # Envia o que juntou quando o pedaço enche, quando a conexão fica ociosa ou ao encerrar
+         if eventos and (len(eventos) >= EVENTOS_POR_PEDACO or not dados):
+            servico.enfileirar(pd.DataFrame(eventos), np.array(origens))
+            eventos, origens = [], []
+         if dados == b"" or (dados is None and servico.parando.is_set()):
+            return
+
+class _ServidorEventos(socketserver.ThreadingTCPServer):
+   allow_reuse_address = True
+   daemon_threads = False
+
+class ServicoIngestao:
+   """Ingestão contínua de interações em micro-lotes.
+
+   Os eventos chegam por um diretório de spool (arquivos .csv ou .jsonl, no layout
+   do CSV de interações, gravados com outro nome e renomeados ao final) e/ou por
+   um socket TCP local (um objeto JSON por linha, com `enviado_em` opcional em
+   segundos Unix). Passam pela mesma validação das cargas (validar_lote) e são
+   gravados em `interacao`, nos agregados, nos sketches e em `comentario` numa
+   transação por micro-lote, limitado por tamanho e por tempo.
+
+   A fila entre produtores e gravação tem capacidade fixa: com ela cheia, a leitura
+   do spool e do socket para (e o TCP segura os clientes) até a gravação alcançar.
+   A posição de cada arquivo do spool é gravada em carga_checkpoint no mesmo
+   commit (o último micro-lote do arquivo já o marca como concluído), então um
+   reinício continua do ponto confirmado; eventos do socket ainda
+   não gravados se perdem numa queda (use o spool quando isso importa).
+   """
+
+   def __init__(self, engine=None, diretorio_spool: str = None, porta: int = None, host: str = "127.0.0.1",
+                max_eventos: int = MAX_EVENTOS_PADRAO, max_espera: float = MAX_ESPERA_PADRAO,
+                capacidade: int = CAPACIDADE_PADRAO, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                intervalo_metricas: float = INTERVALO_METRICAS_PADRAO,
+                intervalo_compactacao: float = INTERVALO_COMPACTACAO_PADRAO,
+                tentativas_gravacao: int = TENTATIVAS_GRAVACAO_PADRAO, diretorio_rejeitados: str = None):
+      self.engine = engine or criar_engine_mysql()
+      self.diretorio_spool = diretorio_spool
+      self.porta = porta
+      self.host = host
+      self.max_eventos = max_eventos
+      self.max_espera = max_espera
+      self.tamanho_lote = tamanho_lote
+      self.intervalo_metricas = intervalo_metricas
+      self.intervalo_compactacao = intervalo_compactacao
+      self.tentativas_gravacao = tentativas_gravacao
+      self.diretorio_rejeitados = diretorio_rejeitados or os.path.join(diretorio_spool or ".", "rejeitados")
+      self.parando = threading.Event()
+      self.endereco = None
+      self._fila = queue.Queue(maxsize=max(1, capacidade // EVENTOS_POR_PEDACO))
+      self._produtores = []
+      self._servidor = None
+      self._arquivos_em_andamento = set()
+      self._trava = threading.Lock()
+      self._contadores = {"recebidos": 0, "gravados": 0, "descartados": 0, "perdidos": 0, "lotes": 0, "rejeitados": 0,
+                          "falhas_compactacao": 0}
+      self._segundos = {"escrita": 0.0, "fila_cheia": 0.0}
+      self._latencias = deque(maxlen=LATENCIAS_GUARDADAS)
+      self._inicio = None
+
+   # --- produtores ---
+
+   def contar(self, contador: str, quantidade: int = 1):
+      with self._trava:
+         self._contadores[contador] += quantidade
+
+   def enfileirar(self, df: pd.DataFrame, origens: np.ndarray, arquivo: str = None, linhas_ate: int = None,
+                  ultimo: bool = False, checkpoint: str = None):
+      """Coloca um pedaço de eventos na fila, esperando enquanto ela estiver cheia (backpressure).
+
+      `origens` tem o instante (segundos Unix) em que cada evento foi produzido,
+      base da latência evento → consultável.
+      """
+      pedaco = {"df": df, "origens": origens, "chegada": time.monotonic(), "arquivo": arquivo,
+                "linhas_ate": linhas_ate, "ultimo": ultimo, "checkpoint": checkpoint or arquivo}
+      inicio = time.perf_counter()
+      self._fila.put(pedaco)
+      with self._trava:
+         self._contadores["recebidos"] += len(df)
+         self._segundos["fila_cheia"] += time.perf_counter() - inicio
+
+   def _ler_arquivo(self, caminho: str):
+      """Enfileira um arquivo do spool em pedaços, a partir da última linha confirmada"""
+      chave = chave_checkpoint(caminho)
+      with self.engine.connect() as conn:
+         checkpoint = ler_checkpoint(conn, chave)
+      if checkpoint and checkpoint.concluido:
+         # Gravado por completo, mas a execução anterior parou antes de mover o arquivo
+         self._concluir_arquivo(caminho, chave)
+         return
+      confirmadas = int(checkpoint.linhas_processadas) if checkpoint else 0
+      origem = os.path.getmtime(caminho)
+
+      if caminho.endswith(".csv"):
+         leitor = ler_csv(caminho, chunksize=EVENTOS_POR_PEDACO,
+                          skiprows=range(1, confirmadas + 1) if confirmadas else None)
+         pular = 0
+      else:
+         leitor = pd.read_json(caminho, lines=True, chunksize=EVENTOS_POR_PEDACO, dtype=False, convert_dates=False)
+         pular = confirmadas
+
+      linhas, anterior = confirmadas, None
+      try:
+         for pedaco in leitor:
+            if pular:
+               descartar, pular = min(pular, len(pedaco)), max(0, pular - len(pedaco))
+               pedaco = pedaco.iloc[descartar:]
+               if pedaco.empty:
+                  continue
+            # Segura um pedaço para marcar o último do arquivo
+            if anterior is not None:
+               linhas += len(anterior)
+               self.enfileirar(anterior, np.full(len(anterior), origem), caminho, linhas, checkpoint=chave)
+            anterior = pedaco
+            if self.parando.is_set():
+               # Encerrando no meio do arquivo: o restante fica para o próximo início
+               self.enfileirar(anterior, np.full(len(anterior), origem), caminho, linhas + len(anterior),
+                               checkpoint=chave)
+               return
+      finally:
+         leitor.close()
+      anterior = anterior if anterior is not None else pd.DataFrame()
+      self.enfileirar(anterior, np.full(len(anterior), origem), caminho, linhas + len(anterior), ultimo=True,
+                      checkpoint=chave)
+
+   def _vigiar_spool(self):
+      processados = os.path.join(self.diretorio_spool, "processados")
+      os.makedirs(processados, exist_ok=True)
+      while not self.parando.is_set():
+         with self._trava:
+            em_andamento = set(self._arquivos_em_andamento)
+         arquivos = sorted(
+            (os.path.join(self.diretorio_spool, nome) for nome in os.listdir(self.diretorio_spool)
+             if nome.endswith(EXTENSOES_SPOOL) and not nome.startswith(".")),
+            key=os.path.getmtime,
+         )
+         novos = [os.path.abspath(caminho) for caminho in arquivos if os.path.abspath(caminho) not in em_andamento]
+         for caminho in novos:
+            if self.parando.is_set():
+               break
+            with self._trava:
+               self._arquivos_em_andamento.add(caminho)
+            try:
+               self._ler_arquivo(caminho)
+            except Exception as e:
+               print(f"❌ Não foi possível ler {caminho} (será relido no próximo início): {e}")
+         if not novos:
+            self.parando.wait(INTERVALO_SPOOL)
+
+   def _servir_socket(self):
+      with self._servidor:
+         threading.Thread(target=self._servidor.serve_forever, kwargs={"poll_interval": 0.2}, daemon=True).start()
+         self.parando.wait()
+         self._servidor.shutdown()
+      # Ao sair do with, server_close espera as conexões abertas enfileirarem o que já leram
+
+   def iniciar(self):
+      """Cria as tabelas de controle e inicia os produtores (spool e/ou socket)"""
+      CargaCheckpoint.__table__.create(self.engine, checkfirst=True)
+      CargaWatermark.__table__.create(self.engine, checkfirst=True)
+      VersaoDadosDia.__table__.create(self.engine, checkfirst=True)
+      garantir_tabela_comentario(self.engine)
+      self.dimensoes = CacheDimensoes(self.engine)
+      self._inicio = time.monotonic()
+      if self.diretorio_spool:
+         os.makedirs(self.diretorio_spool, exist_ok=True)
+         self._produtores.append(threading.Thread(target=self._vigiar_spool, name="spool"))
+      if self.porta is not None:
+         self._servidor = _ServidorEventos((self.host, self.porta), _ReceptorEventos)
+         self._servidor.servico = self
+         self.endereco = self._servidor.server_address
+         self._produtores.append(threading.Thread(target=self._servir_socket, name="socket"))
+      for produtor in self._produtores:
+         produtor.start()
+      origens = ([f"spool {self.diretorio_spool}"] if self.diretorio_spool else []) + \
+                ([f"socket {self.endereco[0]}:{self.endereco[1]}"] if self.endereco else [])
+      print(f"🔁 Ingestão contínua iniciada ({', '.join(origens) or 'só enfileirar()'}); "
+            f"micro-lotes de até {self.max_eventos} eventos ou {self.max_espera}s.")
+
+   def parar(self, *_):
+      """Encerramento gracioso: os produtores param de ler e a fila é gravada antes de sair"""
+      if not self.parando.is_set():
+         print("⏹️ Encerrando: gravando os eventos pendentes...")
+      self.parando.set()
+
+   # --- gravação ---
+
+   def _preparar(self, pedacos: list) -> tuple:
+      """Normaliza e valida o micro-lote: feito uma vez, antes das tentativas de gravação"""
+      df = pd.concat([pedaco["df"] for pedaco in pedacos], ignore_index=True)
+      origens = np.concatenate([pedaco["origens"] for pedaco in pedacos])
+      df = validar_lote(normalizar_eventos(df.assign(_origem=origens)))
+      return df.drop(columns="_origem"), df["_origem"].to_numpy(dtype=float)
+
+   def _gravar(self, pedacos: list, df: pd.DataFrame, origens: np.ndarray) -> int:
+      inicio = time.perf_counter()
+      with self.engine.begin() as conn:
+         novidades = self.dimensoes.gravar(conn, df, self.tamanho_lote) if not df.empty else None
+         if not df.empty:
+            df_final = preparar_interacoes(df)
+            df_final.to_sql(name="interacao", con=conn, if_exists="append", index=False,
+                            method="multi", chunksize=self.tamanho_lote)
+            atualizar_rollups(conn, df_final, self.tamanho_lote)
+            atualizar_sketches(conn, df_final)
+            gravar_comentarios(conn, df, self.tamanho_lote)
+            incrementar_versao_dados(conn, df_final["data_interacao"])
+            avancar_watermarks(conn, df["plataforma"], df_final["data_interacao"])
+         self._gravar_posicoes(conn, pedacos)
+      # Commit feito: a partir daqui os eventos já aparecem nas consultas
+      agora = time.time()
+      if novidades:
+         self.dimensoes.confirmar(novidades)
+
+      with self._trava:
+         self._contadores["gravados"] += len(df)
+         self._contadores["descartados"] += sum(len(p["df"]) for p in pedacos) - len(df)
+         self._contadores["lotes"] += 1
+         self._segundos["escrita"] += time.perf_counter() - inicio
+         self._latencias.extend(agora - origens)
+      return len(df)
+
+   def _rejeitar(self, pedacos: list, motivo: str):
+      """Tira de circulação um micro-lote que não pode ser gravado.
+
+      Os eventos recebidos vão para um .jsonl em `diretorio_rejeitados` (para
+      conferência e reenvio pelo spool) e a posição dos arquivos do spool avança,
+      então nem a fila nem um reinício voltam a esbarrar neles.
+      """
+      eventos = pd.concat([pedaco["df"] for pedaco in pedacos], ignore_index=True)
+      os.makedirs(self.diretorio_rejeitados, exist_ok=True)
+      numero = len(os.listdir(self.diretorio_rejeitados)) + 1
+      destino = os.path.join(self.diretorio_rejeitados, f"lote_{time.strftime('%Y%m%d_%H%M%S')}_{numero:04d}.jsonl")
+      eventos.to_json(destino, orient="records", lines=True, date_format="iso", force_ascii=False)
+      self.contar("rejeitados", len(eventos))
+      print(f"❌ Micro-lote rejeitado ({motivo}): {len(eventos)} eventos salvos em {destino}")
+
+      try:
+         with self.engine.begin() as conn:
+            self._gravar_posicoes(conn, pedacos)
+      except SQLAlchemyError as e:
+         print(f"⚠️ Posição do spool não gravada ({e}); os eventos podem ser rejeitados de novo após um reinício")
+
+   @staticmethod
+   def _gravar_posicoes(conn, pedacos: list):
+      """Grava a posição de cada arquivo do spool no micro-lote (o último pedaço de cada um vale).
+
+      O arquivo que termina aqui já fica concluído nesta transação: se a execução
+      parar antes de movê-lo para processados/, o próximo início só o move.
+      """
+      posicoes = {}
+      for pedaco in pedacos:
+         if pedaco["arquivo"]:
+            posicoes[pedaco["checkpoint"]] = (pedaco["linhas_ate"], pedaco["ultimo"])
+      for chave, (linhas, concluido) in posicoes.items():
+         gravar_checkpoint(conn, chave, linhas, concluido=concluido)
+
+   def _concluir_arquivo(self, caminho: str, chave: str):
+      destino = os.path.join(os.path.dirname(caminho), "processados", os.path.basename(caminho))
+      os.replace(caminho, destino)
+      # Só limpeza: a chave inclui mtime e tamanho, então um arquivo novo com o mesmo nome começa do zero
+      with self.engine.begin() as conn:
+         conn.execute(text("DELETE FROM carga_checkpoint WHERE arquivo = :arquivo"), {"arquivo": chave})
+      with self._trava:
+         self._arquivos_em_andamento.discard(caminho)
+      print(f"📦 {os.path.basename(caminho)} gravado e movido para processados/")
+
+   def _descarregar(self, pedacos: list):
+      """Grava um micro-lote, tentando de novo com espera crescente só em erros do banco.
+
+      Eventos que não passam na normalização e erros de dados do banco não se
+      resolvem com novas tentativas: o micro-lote vai direto para rejeitados/.
+      Falhas do banco (conexão, travas) são repetidas até `tentativas_gravacao`
+      vezes, com a fila segurando os produtores, antes de rejeitar o micro-lote.
+      """
+      try:
+         df, origens = self._preparar(pedacos)
+      except Exception as e:
+         self._rejeitar(pedacos, f"eventos inválidos: {e}")
+         self._concluir_arquivos(pedacos)
+         return
+
+      tentativa = 0
+      while True:
+         try:
+            self._gravar(pedacos, df, origens)
+            break
+         except (IntegrityError, DataError) as e:
+            self._rejeitar(pedacos, f"dados recusados pelo banco: {e.orig}")
+            break
+         except SQLAlchemyError as e:
+            tentativa += 1
+            if self.parando.is_set() and tentativa >= TENTATIVAS_NO_ENCERRAMENTO:
+               perdidos = sum(len(p["df"]) for p in pedacos if not p["arquivo"])
+               self.contar("perdidos", perdidos)
+               print(f"❌ Micro-lote não gravado no encerramento ({e}); {perdidos} eventos do socket perdidos, "
+                     "os arquivos do spool serão relidos no próximo início.")
+               return
+            if tentativa >= self.tentativas_gravacao:
+               self._rejeitar(pedacos, f"{tentativa} tentativas sem sucesso: {e}")
+               break
+            espera = min(2 ** (tentativa - 1), ESPERA_MAXIMA_NOVA_TENTATIVA)
+            print(f"❌ Falha ao gravar o micro-lote ({e}); nova tentativa em {espera}s")
+            time.sleep(espera)
+         except Exception as e:
+            self._rejeitar(pedacos, f"erro ao gravar: {e!r}")
+            break
+      self._concluir_arquivos(pedacos)
+
+   def _concluir_arquivos(self, pedacos: list):
+      for pedaco in pedacos:
+         if pedaco["ultimo"]:
+            self._concluir_arquivo(pedaco["arquivo"], pedaco["checkpoint"])
+
+   def _compactar(self) -> float:
+      """Compacta sketch_diario e retorna a espera até a próxima vez; uma falha só adia a compactação"""
+      try:
+         compactar_sketches(self.engine)
+         return self.intervalo_compactacao
+      except Exception as e:
+         self.contar("falhas_compactacao")
+         espera = min(self.intervalo_compactacao, ESPERA_MAXIMA_NOVA_TENTATIVA)
+         print(f"❌ Falha ao compactar sketch_diario ({e}); a ingestão continua, nova tentativa em {espera:.0f}s")
+         return espera
+
+   def executar(self):
+      """Laço de gravação: junta pedaços da fila em micro-lotes até o encerramento"""
+      if self._inicio is None:
+         self.iniciar()
+      pedacos, eventos = [], 0
+      proximas_metricas = time.monotonic() + self.intervalo_metricas
+      proxima_compactacao = time.monotonic() + self.intervalo_compactacao
+      ultimas = (time.monotonic(), 0)
+      while True:
+         espera = self.max_espera - (time.monotonic() - pedacos[0]["chegada"]) if pedacos else self.max_espera
+         try:
+            pedaco = self._fila.get(timeout=max(0.0, min(espera, 0.2)))
+            pedacos.append(pedaco)
+            eventos += len(pedaco["df"])
+            # Com a gravação atrasada, o que já está na fila entra no mesmo micro-lote (até o limite)
+            while eventos < self.max_eventos:
+               pedaco = self._fila.get_nowait()
+               pedacos.append(pedaco)
+               eventos += len(pedaco["df"])
+         except queue.Empty:
+            pass
+
+         encerrando = self.parando.is_set() and not any(p.is_alive() for p in self._produtores) and self._fila.empty()
+         vencido = pedacos and time.monotonic() - pedacos[0]["chegada"] >= self.max_espera
+         if pedacos and (eventos >= self.max_eventos or vencido or encerrando):
+            self._descarregar(pedacos)
+            pedacos, eventos = [], 0
+
+         agora = time.monotonic()
+         if agora >= proxima_compactacao and not self.parando.is_set():
+            proxima_compactacao = agora + self._compactar()
+         if agora >= proximas_metricas:
+            gravados = self._contadores["gravados"]
+            taxa = (gravados - ultimas[1]) / (agora - ultimas[0])
+            self._imprimir_metricas(f"{taxa:,.0f} eventos/s nos últimos {agora - ultimas[0]:.0f}s")
+            ultimas, proximas_metricas = (agora, gravados), agora + self.intervalo_metricas
+         if encerrando and not pedacos:
+            break
+
+      for produtor in self._produtores:
+         produtor.join()
+      self._imprimir_metricas("encerrado")
+      return self.metricas()
+
+   # --- métricas ---
+
+   def metricas(self) -> dict:
+      """Contadores, eventos/s sustentados desde o início e latência evento → consultável (s)"""
+      with self._trava:
+         resultado = {**self._contadores,
+                      "segundos_escrita": self._segundos["escrita"],
+                      "segundos_fila_cheia": self._segundos["fila_cheia"]}
+         latencias = np.fromiter(self._latencias, dtype=float)
+      decorrido = time.monotonic() - self._inicio if self._inicio else 0.0
+      resultado["segundos"] = decorrido
+      resultado["eventos_por_segundo"] = resultado["gravados"] / decorrido if decorrido else 0.0
+      resultado["fila_pedacos"] = self._fila.qsize()
+      for nome, percentil in (("latencia_p50", 50), ("latencia_p95", 95), ("latencia_max", 100)):
+         resultado[nome] = float(np.percentile(latencias, percentil)) if len(latencias) else None
+      return resultado
+
+   def _imprimir_metricas(self, titulo: str):
+      m = self.metricas()
+      latencia = (f"latência p50 {m['latencia_p50'] * 1000:.0f} ms, p95 {m['latencia_p95'] * 1000:.0f} ms"
+                  if m["latencia_p50"] is not None else "sem eventos gravados")
+      print(f"📊 [{titulo}] {m['gravados']:,} gravados em {m['lotes']} micro-lotes "
+            f"({m['eventos_por_segundo']:,.0f}/s no total), {latencia}, "
+            f"{m['descartados']} descartados, {m['rejeitados']} rejeitados, fila {m['fila_pedacos']}/{self._fila.maxsize} pedaços, "
+            f"{m['segundos_fila_cheia']:.1f}s de espera por fila cheia")
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Serviço de ingestão contínua de interações em micro-lotes")
+   parser.add_argument("--spool", help="Diretório vigiado (arquivos .csv ou .jsonl)")
+   parser.add_argument("--porta", type=int, help="Porta TCP local para eventos JSON (um por linha)")
+   parser.add_argument("--host", default="127.0.0.1")
+   parser.add_argument("--max-eventos", type=int, default=MAX_EVENTOS_PADRAO, help="Tamanho máximo do micro-lote")
+   parser.add_argument("--max-espera", type=float, default=MAX_ESPERA_PADRAO, help="Espera máxima do micro-lote (s)")
+   parser.add_argument("--capacidade", type=int, default=CAPACIDADE_PADRAO, help="Eventos aceitos e ainda não gravados")
+   parser.add_argument("--intervalo-metricas", type=float, default=INTERVALO_METRICAS_PADRAO)
+   args = parser.parse_args()
+   if not args.spool and args.porta is None:
+      parser.error("informe --spool e/ou --porta")
+
+   servico = ServicoIngestao(diretorio_spool=args.spool, porta=args.porta, host=args.host,
+                             max_eventos=args.max_eventos, max_espera=args.max_espera,
+                             capacidade=args.capacidade, intervalo_metricas=args.intervalo_metricas)
+   signal.signal(signal.SIGINT, servico.parar)
+   signal.signal(signal.SIGTERM, servico.parar)
+   servico.executar()
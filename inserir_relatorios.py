@@ -1,6 +1,7 @@
-from conexao_sqlalchemy import criar_engine_mysql, consultas, RelatoriosSQL
+from conexao_sqlalchemy import bootstrap_banco, consultas, parametros_relatorios, RelatoriosSQL
 from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
+from cache_relatorios import incrementar_versao_dados
 from dotenv import load_dotenv
 import os
 import sys
@@ -19,10 +20,12 @@ def verificar_e_inserir_relatorios(engine):
                novo_relatorio = RelatoriosSQL(
                   nome=nome,
                   descricao=nome.replace('_', ' ').capitalize(),
-                  query_sql=query.strip()
+                  query_sql=query.strip(),
+                  parametros=",".join(parametros_relatorios.get(nome, []))
                )
                session.add(novo_relatorio)
          
+         incrementar_versao_dados(session.connection(), datas=[])
          session.commit()
          print(f"✅ {len(consultas)} relatórios inseridos com sucesso.")
       else:
@@ -32,9 +35,11 @@ def verificar_e_inserir_relatorios(engine):
          for nome, query in consultas.items():
                session.query(RelatoriosSQL).filter_by(nome=nome).update({
                   "query_sql": query.strip(),
-                  "descricao": nome.replace('_', ' ').capitalize()
+                  "descricao": nome.replace('_', ' ').capitalize(),
+                  "parametros": ",".join(parametros_relatorios.get(nome, []))
                })
          
+         incrementar_versao_dados(session.connection(), datas=[])
          session.commit()
          print("✅ Consultas atualizadas com sucesso.")
          
@@ -54,7 +59,7 @@ if __name__ == "__main__":
    DB_NAME = os.getenv("DB_NAME", "globo_tech")
    
    try:
-      engine = criar_engine_mysql(DB_USER, DB_PASS, DB_HOST, DB_NAME)
+      engine = bootstrap_banco(usuario=DB_USER, senha=DB_PASS, host=DB_HOST, banco=DB_NAME)
       verificar_e_inserir_relatorios(engine)
       
       # Verificação final
@@ -0,0 +1,177 @@
+# instrumentacao.py
+import collections
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import event
+
+# Consultas acima deste tempo são registradas como lentas, com o EXPLAIN capturado
+LIMITE_LENTA_MS = float(os.getenv("DB_LIMITE_LENTA_MS", "1000"))
+# Se definido, cada medição também é acrescentada a este arquivo JSON lines
+ARQUIVO_METRICAS = os.getenv("DB_METRICAS_JSONL") or None
+
+logger = logging.getLogger("globo_tech.consultas")
+
+# Medição do relatório em andamento na thread/tarefa atual (e o registro de destino)
+_medicao_atual = contextvars.ContextVar("medicao_atual", default=None)
+
+class RegistroConsultas:
+   """Registro em memória das medições de relatórios, compartilhado entre threads"""
+
+   def __init__(self, limite_lenta_ms: float = LIMITE_LENTA_MS, arquivo_jsonl: str = ARQUIVO_METRICAS,
+                max_medicoes: int = 10_000):
+      self.limite_lenta_ms = limite_lenta_ms
+      self.arquivo_jsonl = arquivo_jsonl
+      self._medicoes = collections.deque(maxlen=max_medicoes)
+      self._lock = threading.Lock()
+
+   def registrar(self, medicao: dict):
+      with self._lock:
+         self._medicoes.append(medicao)
+         if self.arquivo_jsonl:
+            with open(self.arquivo_jsonl, "a", encoding="utf-8") as arquivo:
+               arquivo.write(json.dumps(medicao, ensure_ascii=False, default=str) + "\n")
+
+   def medicoes(self, relatorio: str = None) -> list:
+      with self._lock:
+         return [m for m in self._medicoes if relatorio is None or m["relatorio"] == relatorio]
+
+   def resumo(self) -> pd.DataFrame:
+      return resumir(self.medicoes())
+
+   def exportar_jsonl(self, caminho: str) -> int:
+      medicoes = self.medicoes()
+      with open(caminho, "a", encoding="utf-8") as arquivo:
+         for medicao in medicoes:
+            arquivo.write(json.dumps(medicao, ensure_ascii=False, default=str) + "\n")
+      return len(medicoes)
+
+   def limpar(self):
+      with self._lock:
+         self._medicoes.clear()
+
+registro_padrao = RegistroConsultas()
+
+def resumir(medicoes: list) -> pd.DataFrame:
+   """Latência (total e no banco), linhas e lentidão por relatório"""
+   if not medicoes:
+      return pd.DataFrame()
+   df = pd.DataFrame(medicoes)
+   df["total_ms"] = df["segundos_total"] * 1000
+   df["banco_ms"] = df["segundos_execucao"] * 1000
+   df["lenta"] = df["consultas_lentas"].map(bool)
+   return df.groupby("relatorio").agg(
+      execucoes=("total_ms", "size"),
+      p50_ms=("total_ms", "median"),
+      p95_ms=("total_ms", lambda v: v.quantile(0.95)),
+      max_ms=("total_ms", "max"),
+      banco_p50_ms=("banco_ms", "median"),
+      linhas=("linhas", "max"),
+      acertos_cache=("cache", "sum"),
+      lentas=("lenta", "sum"),
+      erros=("erro", "count"),
+   ).sort_values("p95_ms", ascending=False).reset_index()
+
+def _antes_execucao(conn, cursor, statement, parameters, context, executemany):
+   # O início fica no contexto da instrução: se ela falhar, é descartado junto com ele,
+   # sem deixar sobras na conexão (que volta ao pool e é reutilizada)
+   if context is not None:
+      context._instrumentacao_inicio = time.perf_counter()
+
+def _depois_execucao(conn, cursor, statement, parameters, context, executemany):
+   inicio = getattr(context, "_instrumentacao_inicio", None)
+   atual = _medicao_atual.get()
+   if atual is None or inicio is None:
+      return
+   medicao, registro = atual
+   milissegundos = (time.perf_counter() - inicio) * 1000
+   medicao["segundos_execucao"] += milissegundos / 1000
+   medicao["consultas"] += 1
+   if milissegundos >= registro.limite_lenta_ms and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+      medicao["consultas_lentas"].append({"sql": statement, "parametros": parameters, "ms": milissegundos})
+
+def instrumentar_engine(engine):
+   """Liga os eventos de medição na engine (idempotente)"""
+   if not event.contains(engine, "before_cursor_execute", _antes_execucao):
+      event.listen(engine, "before_cursor_execute", _antes_execucao)
+      event.listen(engine, "after_cursor_execute", _depois_execucao)
+   return engine
+
+def _explicar(engine, sql: str, parametros) -> list:
+   prefixo = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+   try:
+      with engine.connect() as conn:
+         return [dict(linha._mapping) for linha in conn.exec_driver_sql(prefixo + sql, parametros or ())]
+   except Exception as e:
+      return [{"erro": str(e)}]
+
+@contextmanager
+def medir_relatorio(nome: str, engine=None, registro: RegistroConsultas = None):
+   """Mede um relatório: tempo no banco, linhas, montagem do DataFrame e gravação do arquivo.
+
+   As consultas executadas dentro do bloco (na mesma thread) são somadas na
+   medição por eventos da engine. Blocos aninhados reaproveitam a medição
+   externa, então `executar_relatorio_sql` e `ler_relatorio` geram uma só.
+   Consultas lentas têm o EXPLAIN capturado ao final, em outra conexão.
+   """
+   atual = _medicao_atual.get()
+   if atual is not None:
+      yield atual[0]
+      return
+
+   registro = registro or registro_padrao
+   if engine is not None:
+      instrumentar_engine(engine)
+   medicao = {
+      "relatorio": nome,
+      "inicio": datetime.now().isoformat(timespec="milliseconds"),
+      "banco": engine.dialect.name if engine is not None else None,
+      "segundos_total": 0.0,
+      "segundos_execucao": 0.0,
+      "segundos_dataframe": None,
+      "segundos_escrita": None,
+      "consultas": 0,
+      "linhas": None,
+      "bytes_resultado": None,
+      "cache": False,
+      "consultas_lentas": [],
+      "erro": None,
+   }
+   token = _medicao_atual.set((medicao, registro))
+   inicio = time.perf_counter()
+   try:
+      yield medicao
+   except Exception as e:
+      medicao["erro"] = str(e)
+      raise
+   finally:
+      _medicao_atual.reset(token)
+      medicao["segundos_total"] = time.perf_counter() - inicio
+      for lenta in medicao["consultas_lentas"]:
+         if engine is not None:
+            lenta["explain"] = _explicar(engine, lenta["sql"], lenta["parametros"])
+         logger.warning("Consulta lenta em %s: %.0f ms", nome, lenta["ms"])
+      registro.registrar(medicao)
+
+def registrar_resultado(medicao: dict, df: pd.DataFrame, inicio_leitura: float):
+   """Completa a medição com o tamanho do resultado e o tempo gasto fora do banco (fetch + DataFrame)"""
+   medicao["linhas"] = len(df)
+   # Estimativa dos bytes trazidos: tamanho do resultado já em memória
+   medicao["bytes_resultado"] = int(df.memory_usage(deep=True).sum())
+   medicao["segundos_dataframe"] = max(0.0, time.perf_counter() - inicio_leitura - medicao["segundos_execucao"])
+
+
+if __name__ == "__main__":
+   # Resumo por relatório de um arquivo de medições (DB_METRICAS_JSONL)
+   caminho = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_METRICAS or "metricas_consultas.jsonl"
+   with open(caminho, encoding="utf-8") as arquivo:
+      medicoes = [json.loads(linha) for linha in arquivo if linha.strip()]
+   print(f"📊 {len(medicoes)} medições em {caminho}\n")
+   print(resumir(medicoes).to_string(index=False, float_format=lambda v: f"{v:.1f}"))
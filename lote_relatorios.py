@@ -0,0 +1,111 @@
+# lote_relatorios.py
+import argparse
+import os
+import sys
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from conexao_sqlalchemy import criar_engine_mysql, CONFIG_POOL
+from relatorios import ler_relatorio
+from exportacao import salvar_resultado
+from instrumentacao import medir_relatorio
+from registro_relatorios import obter_registro
+from sketches import RELATORIOS_SKETCH, parametros_sketch
+
+def _executar(nome: str, consultar, engine, diretorio_saida: str, formato: str) -> dict:
+   inicio = time.perf_counter()
+   with medir_relatorio(nome, engine) as medicao:
+      df = consultar()
+      segundos_consulta = time.perf_counter() - inicio
+
+      arquivo = None
+      if diretorio_saida:
+         arquivo = os.path.join(diretorio_saida, f"{nome}.{formato}")
+         salvar_resultado(df, arquivo)
+         medicao["segundos_escrita"] = time.perf_counter() - inicio - segundos_consulta
+
+   return {
+      "relatorio": nome,
+      "status": "ok",
+      "linhas": len(df),
+      "segundos_consulta": segundos_consulta,
+      "segundos_total": time.perf_counter() - inicio,
+      "arquivo": arquivo,
+   }
+
+def executar_relatorios_em_lote(nomes: list = None, engine=None, max_paralelo: int = 4,
+                                diretorio_saida: str = "relatorios", catalogo_banco: bool = False,
+                                usar_cache: bool = True, formato: str = "csv", parametros: dict = None) -> list:
+   """Executa vários relatórios em paralelo, sobre o pool de conexões compartilhado.
+
+   Sem `nomes`, executa o catálogo inteiro do registro (`consultas`, ou também os
+   relatórios de relatorios_sql com `catalogo_banco=True`) e os relatórios
+   aproximados de sketches.RELATORIOS_SKETCH. Cada resultado é salvo assim
+   que fica pronto; a falha de um relatório não interrompe os demais.
+   `parametros` (período, plataforma, tipo_interacao, limite) vale para todos:
+   cada relatório recebe só os que declara no registro_relatorios.
+   Retorna uma lista com status, linhas e latência de cada relatório.
+   """
+   engine = engine or criar_engine_mysql()
+   registro = obter_registro(engine, usar_banco=catalogo_banco)
+   nomes = nomes or registro.nomes() + sorted(RELATORIOS_SKETCH)
+
+   # Mais threads que conexões só deixaria threads esperando o pool
+   max_paralelo = max(1, min(max_paralelo, CONFIG_POOL["pool_size"] + CONFIG_POOL["max_overflow"]))
+
+   resultados = []
+   inicio = time.perf_counter()
+   with ThreadPoolExecutor(max_workers=max_paralelo) as executor:
+      futuros = {}
+      for nome in nomes:
+         try:
+            if nome in RELATORIOS_SKETCH:
+               consultar = partial(RELATORIOS_SKETCH[nome], engine, **parametros_sketch(parametros))
+            else:
+               instrucao, valores = registro.preparar_aceitos(nome, **(parametros or {}))
+               consultar = partial(ler_relatorio, instrucao, engine, usar_cache=usar_cache, parametros=valores)
+         except (KeyError, ValueError) as e:
+            erro = e.args[0] if isinstance(e, KeyError) else str(e)
+            resultados.append({"relatorio": nome, "status": "erro", "erro": erro})
+            print(f"❌ {nome}: {erro}")
+            continue
+         futuros[executor.submit(_executar, nome, consultar, engine, diretorio_saida, formato)] = nome
+
+      for futuro in as_completed(futuros):
+         nome = futuros[futuro]
+         try:
+            resultado = futuro.result()
+            print(f"✅ {nome}: {resultado['linhas']} linhas em {resultado['segundos_consulta'] * 1000:.0f} ms"
+                  + (f" → {resultado['arquivo']}" if resultado["arquivo"] else ""))
+         except Exception as e:
+            resultado = {"relatorio": nome, "status": "erro", "erro": str(e)}
+            print(f"❌ {nome}: {e}")
+         resultados.append(resultado)
+
+   total = time.perf_counter() - inicio
+   soma = sum(r.get("segundos_total", 0) for r in resultados)
+   falhas = sum(r["status"] != "ok" for r in resultados)
+   print(f"\n📊 {len(resultados)} relatórios em {total:.2f}s (soma das latências {soma:.2f}s, {falhas} com erro)")
+   return resultados
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Executa relatórios em paralelo e salva os resultados")
+   parser.add_argument("nomes", nargs="*", help="Relatórios a executar (padrão: todo o catálogo)")
+   parser.add_argument("--paralelo", type=int, default=4, help="Máximo de relatórios simultâneos")
+   parser.add_argument("--saida", default="relatorios", help="Diretório dos arquivos gerados")
+   parser.add_argument("--catalogo-banco", action="store_true", help="Inclui os relatórios cadastrados em relatorios_sql")
+   parser.add_argument("--formato", choices=["csv", "parquet", "feather"], default="csv")
+   parser.add_argument("--sem-cache", action="store_true")
+   parser.add_argument("--data-inicio", help="Filtra a partir deste dia (AAAA-MM-DD)")
+   parser.add_argument("--data-fim", help="Filtra até este dia, inclusive (AAAA-MM-DD)")
+   parser.add_argument("--plataforma", help="Nome da plataforma")
+   parser.add_argument("--tipo", dest="tipo_interacao", choices=["view", "like", "share", "comment"])
+   parser.add_argument("--limite", type=int, help="Máximo de linhas de cada relatório")
+   args = parser.parse_args()
+
+   parametros = {p: getattr(args, p) for p in ("data_inicio", "data_fim", "plataforma", "tipo_interacao", "limite")}
+   resultados = executar_relatorios_em_lote(args.nomes, max_paralelo=args.paralelo, diretorio_saida=args.saida,
+                                            catalogo_banco=args.catalogo_banco, usar_cache=not args.sem_cache,
+                                            formato=args.formato, parametros=parametros)
+   sys.exit(1 if any(r["status"] != "ok" for r in resultados) else 0)
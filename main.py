@@ -1,65 +1,129 @@
 import sys
 import os
+import time
 import pandas as pd
-from conexao_sqlalchemy import criar_engine_mysql, consultas
-from relatorios import executar_relatorio_sql
+from conexao_sqlalchemy import criar_engine_mysql
+from paginacao import PaginadorRelatorio
+from exportacao import exportar_relatorio
+from registro_relatorios import obter_registro
+
+# Texto exibido ao pedir cada parâmetro do relatório
+PERGUNTAS_PARAMETROS = {
+   "data_inicio": "Data inicial (AAAA-MM-DD)",
+   "data_fim": "Data final (AAAA-MM-DD)",
+   "plataforma": "Plataforma",
+   "tipo_interacao": "Tipo de interação (view/like/share/comment)",
+   "limite": "Máximo de linhas",
+}
 
 def limpar_tela():
    """Limpa a tela do console"""
    os.system('cls' if os.name == 'nt' else 'clear')
 
-def mostrar_menu():
+def mostrar_menu(relatorios: list):
    limpar_tela()
    print("\n=== SISTEMA DE RELATÓRIOS ===")
    print("\nEscolha um relatório:\n")
    
-   # Lista ordenada alfabeticamente
-   relatorios = sorted(consultas.keys())
-   
    for idx, relatorio in enumerate(relatorios, 1):
       print(f"{idx}. {relatorio.replace('_', ' ').title()}")
    
    print("\n0. Sair")
 
-def obter_escolha():
+def obter_escolha(total: int):
    while True:
       escolha = input("\nDigite o número do relatório: ")
       
       if escolha == '0':
          return 0
          
-      if escolha.isdigit() and 1 <= int(escolha) <= len(consultas):
+      if escolha.isdigit() and 1 <= int(escolha) <= total:
          return int(escolha)
          
       print("❌ Opção inválida. Tente novamente.")
 
+def pedir_parametros(nome_relatorio: str, registro) -> tuple:
+   """Pergunta os parâmetros que o relatório aceita (Enter deixa sem filtro) e prepara a consulta"""
+   while True:
+      parametros = {}
+      for parametro in registro.definicao(nome_relatorio)["parametros"]:
+         parametros[parametro] = input(f"{PERGUNTAS_PARAMETROS.get(parametro, parametro)} [todos]: ").strip()
+      try:
+         return registro.preparar(nome_relatorio, **parametros)
+      except ValueError as e:
+         print(f"❌ {e}")
+
+def salvar_relatorio(nome_relatorio: str, engine, instrucao, valores: dict):
+   """Só aqui o resultado inteiro é lido, direto do cursor para o arquivo"""
+   formato = input("Formato (csv/parquet/feather) [csv]: ").strip().lower() or "csv"
+   if formato not in ("csv", "parquet", "feather"):
+      print("❌ Formato inválido. Salvando em CSV.")
+      formato = "csv"
+   caminho = f"relatorios/{nome_relatorio}.{formato}"
+   resultado = exportar_relatorio(instrucao, engine, caminho, parametros=valores)
+   print(f"\n✅ Relatório salvo em: {caminho} ({resultado['linhas']} linhas em {resultado['segundos']:.2f}s)")
+
+def navegar_relatorio(nome_relatorio: str, engine, registro):
+   """Mostra o relatório página a página; a navegação busca cada página no banco"""
+   instrucao, valores = pedir_parametros(nome_relatorio, registro)
+   paginador = PaginadorRelatorio(instrucao, engine, nome=nome_relatorio, parametros=valores)
+   inicio = time.perf_counter()
+   df = paginador.primeira()
+   print(f"⏱️ Primeira página em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+   try:
+      while True:
+         if df.empty:
+            print("ℹ️ A consulta não retornou resultados.")
+            return
+
+         print(f"\n🔍 Página {paginador.numero_pagina + 1} ({len(df)} linhas):")
+         print(df.to_string(index=False))
+
+         opcoes = {}
+         if paginador.tem_proxima:
+            opcoes["p"] = "próxima"
+         if paginador.numero_pagina > 0:
+            opcoes["a"] = "anterior"
+         opcoes["s"] = "salvar"
+         opcoes["v"] = "voltar"
+         escolha = input("\n" + "  ".join(f"[{tecla}] {nome}" for tecla, nome in opcoes.items()) + ": ").strip().lower()
+
+         if escolha == "p" and "p" in opcoes:
+            df = paginador.proxima()
+         elif escolha == "a" and "a" in opcoes:
+            df = paginador.anterior()
+         elif escolha == "s":
+            salvar_relatorio(nome_relatorio, engine, instrucao, valores)
+         elif escolha == "v":
+            return
+         else:
+            print("❌ Opção inválida.")
+   finally:
+      paginador.fechar()
+
 def main():
    try:
       engine = criar_engine_mysql()
+      registro = obter_registro(engine)
+      relatorios = registro.nomes()
+      pd.set_option('display.max_columns', None)
+      pd.set_option('display.width', 1000)
+      pd.set_option('display.colheader_justify', 'left')
       
       while True:
-         mostrar_menu()
-         escolha = obter_escolha()
+         mostrar_menu(relatorios)
+         escolha = obter_escolha(len(relatorios))
          
          if escolha == 0:
                print("\n✅ Programa encerrado com sucesso!")
                sys.exit(0)
                
-         nome_relatorio = sorted(consultas.keys())[escolha-1]
+         nome_relatorio = relatorios[escolha-1]
          limpar_tela()
          print(f"\n📊 RELATÓRIO: {nome_relatorio.replace('_', ' ').title()}\n")
          
-         # Executa o relatório
-         df = executar_relatorio_sql(consultas[nome_relatorio], engine)
-         
-         if not df.empty:
-               # Pergunta sobre salvamento
-               salvar = input("\nDeseja salvar o relatório? (s/n): ").lower()
-               if salvar == 's':
-                  os.makedirs("relatorios", exist_ok=True)
-                  caminho = f"relatorios/{nome_relatorio}.csv"
-                  df.to_csv(caminho, index=False)
-                  print(f"\n✅ Relatório salvo em: {caminho}")
+         navegar_relatorio(nome_relatorio, engine, registro)
          
          input("\nPressione Enter para continuar...")
          
@@ -0,0 +1,308 @@
+# motor_colunar.py
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from conexao_sqlalchemy import criar_engine_mysql, consultas
+
+# Mesma ordem do ENUM de interacao.tipo_interacao
+TIPOS_INTERACAO = ["view", "like", "share", "comment"]
+TIPOS_ENGAJAMENTO = ["like", "share", "comment"]
+
+LINHAS_POR_LOTE_SNAPSHOT = 1_000_000
+COLUNAS_SNAPSHOT = ["id_conteudo", "id_plataforma", "tipo_codigo", "watch", "watch_valido"]
+
+class SnapshotColunar:
+   """Cópia colunar (NumPy) de interacao, conteudo e plataforma.
+
+   `tipo_interacao` fica codificado como int8 (índice em TIPOS_INTERACAO) e os
+   nomes de plataforma/conteúdo ficam só nas tabelas de dimensão, então cada
+   interação ocupa 18 bytes: id_conteudo, id_plataforma, código do tipo,
+   duração e a máscara de duração nula.
+   """
+
+   def __init__(self, id_conteudo, id_plataforma, tipo_codigo, watch, watch_valido,
+                conteudos: pd.DataFrame, plataformas: pd.DataFrame):
+      self.id_conteudo = np.asarray(id_conteudo, dtype=np.int32)
+      self.id_plataforma = np.asarray(id_plataforma, dtype=np.int32)
+      self.tipo_codigo = np.asarray(tipo_codigo, dtype=np.int8)
+      self.watch = np.asarray(watch, dtype=np.int64)
+      self.watch_valido = np.asarray(watch_valido, dtype=bool)
+      self.conteudos = conteudos.sort_values("id_conteudo").reset_index(drop=True)
+      self.plataformas = plataformas.sort_values("id_plataforma").reset_index(drop=True)
+
+   def __len__(self):
+      return len(self.id_conteudo)
+
+   @classmethod
+   def do_banco(cls, engine, linhas_por_lote: int = LINHAS_POR_LOTE_SNAPSHOT):
+      """Lê as três tabelas em lotes (cursor do lado do servidor) e monta o snapshot"""
+      partes = {"id_conteudo": [], "id_plataforma": [], "tipo_codigo": [], "watch": [], "watch_valido": []}
+      with engine.connect() as conn:
+         conteudos = pd.read_sql(text("SELECT id_conteudo, nome_conteudo, tipo_conteudo FROM conteudo"), con=conn)
+         plataformas = pd.read_sql(text("SELECT id_plataforma, nome FROM plataforma"), con=conn)
+         conn = conn.execution_options(stream_results=True, max_row_buffer=linhas_por_lote)
+         for lote in pd.read_sql(
+            text("SELECT id_conteudo, id_plataforma, tipo_interacao, watch_duration_seconds FROM interacao"),
+            con=conn, chunksize=linhas_por_lote
+         ):
+            partes["id_conteudo"].append(lote["id_conteudo"].to_numpy(np.int32))
+            partes["id_plataforma"].append(lote["id_plataforma"].to_numpy(np.int32))
+            partes["tipo_codigo"].append(
+               pd.Categorical(lote["tipo_interacao"], categories=TIPOS_INTERACAO).codes.astype(np.int8)
+            )
+            watch = lote["watch_duration_seconds"]
+            partes["watch_valido"].append(watch.notna().to_numpy())
+            partes["watch"].append(watch.fillna(0).to_numpy(np.int64))
+
+      arrays = {
+         nome: np.concatenate(valores) if valores else np.array([], dtype=np.int64)
+         for nome, valores in partes.items()
+      }
+      return cls(**arrays, conteudos=conteudos, plataformas=plataformas)
+
+   def salvar(self, diretorio: str):
+      """Uma coluna por arquivo .npy (um .npz é um zip e não pode ser mapeado na memória)"""
+      os.makedirs(diretorio, exist_ok=True)
+      for nome in COLUNAS_SNAPSHOT:
+         np.save(os.path.join(diretorio, f"{nome}.npy"), getattr(self, nome))
+      self.conteudos.to_parquet(os.path.join(diretorio, "conteudo.parquet"), index=False)
+      self.plataformas.to_parquet(os.path.join(diretorio, "plataforma.parquet"), index=False)
+
+   @classmethod
+   def carregar(cls, diretorio: str, mmap: bool = True):
+      """Carrega um snapshot salvo; com `mmap`, as colunas ficam mapeadas do disco"""
+      return cls(
+         **{nome: np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode="r" if mmap else None)
+            for nome in COLUNAS_SNAPSHOT},
+         conteudos=pd.read_parquet(os.path.join(diretorio, "conteudo.parquet")),
+         plataformas=pd.read_parquet(os.path.join(diretorio, "plataforma.parquet")),
+      )
+
+def calcular_cubo(snapshot: SnapshotColunar) -> pd.DataFrame:
+   """Uma única passada sobre interacao: contagem, soma e quantidade de duração por (conteúdo, plataforma, tipo).
+
+   Todos os relatórios são derivados deste cubo, que tem uma linha por combinação
+   que ocorre (no máximo conteúdos × plataformas × 4), independentemente do
+   volume de interações.
+   """
+   ids_conteudo = snapshot.conteudos["id_conteudo"].to_numpy()
+   ids_plataforma = snapshot.plataformas["id_plataforma"].to_numpy()
+   n_conteudos, n_plataformas, n_tipos = len(ids_conteudo), len(ids_plataforma), len(TIPOS_INTERACAO)
+
+   # Posição densa de cada id; interações sem conteúdo/plataforma cadastrados ficam fora (como no JOIN)
+   pos_conteudo = np.searchsorted(ids_conteudo, snapshot.id_conteudo)
+   pos_plataforma = np.searchsorted(ids_plataforma, snapshot.id_plataforma)
+   valido = (
+      (pos_conteudo < n_conteudos) & (pos_plataforma < n_plataformas) & (snapshot.tipo_codigo >= 0)
+   )
+   valido[valido] &= ids_conteudo[pos_conteudo[valido]] == snapshot.id_conteudo[valido]
+   valido[valido] &= ids_plataforma[pos_plataforma[valido]] == snapshot.id_plataforma[valido]
+
+   chave = (pos_conteudo[valido].astype(np.int64) * n_plataformas + pos_plataforma[valido]) * n_tipos \
+      + snapshot.tipo_codigo[valido]
+   # Só as células que ocorrem: o cubo denso (conteúdos × plataformas × tipos) cresce com o
+   # catálogo mesmo quando quase todo vazio
+   celulas, grupo = np.unique(chave, return_inverse=True)
+   watch_valido = snapshot.watch_valido[valido]
+
+   total = np.bincount(grupo, minlength=len(celulas))
+   # Pesos em float64 são exatos até 2**53 segundos somados por célula
+   soma_watch = np.bincount(grupo, weights=np.where(watch_valido, snapshot.watch[valido], 0),
+                            minlength=len(celulas)).astype(np.int64)
+   qtd_watch = np.bincount(grupo, weights=watch_valido, minlength=len(celulas)).astype(np.int64)
+
+   pos_c, resto = np.divmod(celulas, n_plataformas * n_tipos)
+   pos_p, tipo = np.divmod(resto, n_tipos)
+
+   cubo = pd.DataFrame({
+      "id_conteudo": ids_conteudo[pos_c],
+      "nome_conteudo": snapshot.conteudos["nome_conteudo"].to_numpy()[pos_c],
+      "tipo_conteudo": snapshot.conteudos["tipo_conteudo"].to_numpy()[pos_c],
+      "id_plataforma": ids_plataforma[pos_p],
+      "nome_plataforma": snapshot.plataformas["nome"].to_numpy()[pos_p],
+      "tipo_interacao": np.array(TIPOS_INTERACAO)[tipo],
+      "total": total,
+      "soma_watch": soma_watch,
+      "qtd_watch": qtd_watch,
+   })
+   return cubo
+
+def _sec_to_time(segundos: pd.Series) -> pd.Series:
+   return pd.to_timedelta(segundos.astype("float64"), unit="s")
+
+def _ordenar(df: pd.DataFrame, coluna: str, limite: int = None) -> pd.DataFrame:
+   df = df.sort_values(coluna, ascending=False, kind="stable", na_position="last")
+   return (df.head(limite) if limite else df).reset_index(drop=True)
+
+def _ranking_conteudos_consumidos(cubo):
+   df = cubo.groupby(["id_conteudo", "nome_conteudo", "tipo_conteudo"], as_index=False, dropna=False)["soma_watch"].sum()
+   df = _ordenar(df, "soma_watch", 10)
+   df["total_consumo"] = _sec_to_time(df["soma_watch"])
+   df["soma_watch_seconds"] = df.pop("soma_watch")
+   return df
+
+def _plataforma_maior_engajamento(cubo):
+   df = cubo[cubo["tipo_interacao"].isin(TIPOS_ENGAJAMENTO)]
+   df = df.groupby("nome_plataforma", as_index=False)["total"].sum()
+   df.columns = ["nome", "total_engajamento"]
+   return _ordenar(df, "total_engajamento", 10)
+
+def _total_de_engajamentos_por_plataforma(cubo):
+   por_tipo = cubo.pivot_table(index="nome_plataforma", columns="tipo_interacao", values="total",
+                               aggfunc="sum", fill_value=0)
+   por_tipo = por_tipo.reindex(columns=TIPOS_INTERACAO, fill_value=0)
+   df = pd.DataFrame({
+      "nome_plataforma": por_tipo.index,
+      "total_engajamento": por_tipo.sum(axis=1).to_numpy(),
+      "total_like": por_tipo["like"].to_numpy(),
+      "total_comment": por_tipo["comment"].to_numpy(),
+      "total_share": por_tipo["share"].to_numpy(),
+      "total_view": por_tipo["view"].to_numpy(),
+   })
+   return _ordenar(df, "total_engajamento")
+
+def _contagem_por_conteudo(cubo, tipo: str, coluna: str, limite: int = None):
+   df = cubo[cubo["tipo_interacao"] == tipo]
+   df = df.groupby(["id_conteudo", "nome_conteudo"], as_index=False, dropna=False)["total"].sum()
+   df.columns = ["id_conteudo", "nome_conteudo", coluna]
+   return _ordenar(df, coluna, limite)
+
+def _interacoes_por_tipo_conteudo(cubo):
+   df = cubo.groupby("tipo_conteudo", as_index=False)["total"].sum()
+   df.columns = ["tipo_conteudo", "total_interacoes"]
+   return _ordenar(df, "total_interacoes")
+
+def _tempo_medio_por_plataforma(cubo):
+   df = cubo.groupby("nome_plataforma", as_index=False)[["soma_watch", "qtd_watch"]].sum()
+   # AVG do MySQL sobre INT devolve DECIMAL com 4 casas
+   media = (df["soma_watch"] / df["qtd_watch"].where(df["qtd_watch"] > 0)).round(4)
+   df = pd.DataFrame({"nome": df["nome_plataforma"], "tempo_medio": media})
+   df = _ordenar(df, "tempo_medio")
+   df["tempo_medio"] = _sec_to_time(df["tempo_medio"])
+   return df
+
+def _conteudos_mais_assistidos_por_plataforma(cubo):
+   df = cubo[cubo["tipo_interacao"] == "view"]
+   df = df.groupby(["nome_plataforma", "nome_conteudo"], as_index=False)["total"].sum()
+   df.columns = ["plataforma", "nome_conteudo", "total_assistidos"]
+   return _ordenar(df, "total_assistidos", 10)
+
+# Relatórios de `consultas` calculados a partir do cubo
+RELATORIOS_COLUNARES = {
+   "ranking_conteudos_consumidos": _ranking_conteudos_consumidos,
+   "plataforma_maior_engajamento": _plataforma_maior_engajamento,
+   "total_de_engajamentos_por_plataforma": _total_de_engajamentos_por_plataforma,
+   "conteudos_mais_comentados": lambda cubo: _contagem_por_conteudo(cubo, "comment", "total_comentarios", 10),
+   "interacoes_por_tipo_conteudo": _interacoes_por_tipo_conteudo,
+   "tempo_medio_por_plataforma": _tempo_medio_por_plataforma,
+   "comentarios_por_conteudo": lambda cubo: _contagem_por_conteudo(cubo, "comment", "quantidade_comentarios"),
+   "conteudos_mais_assistidos_por_plataforma": _conteudos_mais_assistidos_por_plataforma,
+}
+
+def executar_relatorios_colunar(snapshot: SnapshotColunar, nomes: list = None) -> dict:
+   """Calcula os relatórios pedidos (padrão: todos os suportados) com uma única varredura de interacao"""
+   nomes = nomes or list(RELATORIOS_COLUNARES)
+   nao_suportados = [nome for nome in nomes if nome not in RELATORIOS_COLUNARES]
+   if nao_suportados:
+      raise ValueError(f"Relatórios sem implementação colunar: {', '.join(nao_suportados)}")
+   cubo = calcular_cubo(snapshot)
+   return {nome: RELATORIOS_COLUNARES[nome](cubo) for nome in nomes}
+
+# Coluna do ORDER BY (sempre DESC) e LIMIT de cada consulta, para comparar na ordem do SQL
+ORDENACAO_SQL = {
+   "ranking_conteudos_consumidos": ("soma_watch_seconds", 10),
+   "plataforma_maior_engajamento": ("total_engajamento", 10),
+   "total_de_engajamentos_por_plataforma": ("total_engajamento", None),
+   "conteudos_mais_comentados": ("total_comentarios", 10),
+   "interacoes_por_tipo_conteudo": ("total_interacoes", None),
+   "tempo_medio_por_plataforma": ("tempo_medio", None),
+   "comentarios_por_conteudo": ("quantidade_comentarios", None),
+   "conteudos_mais_assistidos_por_plataforma": ("total_assistidos", 10),
+}
+
+def _normalizar_para_comparacao(df: pd.DataFrame) -> pd.DataFrame:
+   df = df.reset_index(drop=True)
+   for coluna in df.columns:
+      texto = df[coluna].dropna()
+      if texto.map(type).eq(str).all() and len(texto) and texto.str.fullmatch(r"-?\d+:\d{2}:\d{2}(\.\d+)?").all():
+         # TIME devolvido como texto (SEC_TO_TIME no SQLite) → timedelta
+         df[coluna] = pd.to_timedelta(df[coluna])
+      if pd.api.types.is_timedelta64_dtype(df[coluna]):
+         df[coluna] = df[coluna].dt.total_seconds().round(4)
+      elif df[coluna].dtype == object and len(df) and not isinstance(df[coluna].dropna().iloc[0], str):
+         # Decimal (SUM/AVG do MySQL) → número
+         df[coluna] = pd.to_numeric(df[coluna])
+      # Somas e contagens inteiras comparadas como inteiros (o SQL pode devolvê-las como float ou Decimal)
+      numeros = df[coluna]
+      if pd.api.types.is_float_dtype(numeros) and numeros.notna().all() and (numeros == numeros.round()).all():
+         df[coluna] = numeros.astype("int64")
+   return df
+
+def _grupos_empate(ordem: pd.Series) -> pd.Series:
+   """Número do grupo de linhas consecutivas com o mesmo valor de ordenação (nulos empatam entre si)"""
+   anterior = ordem.shift()
+   muda = (ordem != anterior) & ~(ordem.isna() & anterior.isna())
+   return muda.cumsum()
+
+def comparar_resultados(colunar: pd.DataFrame, sql: pd.DataFrame, coluna_ordem: str, limite: int = None):
+   """Falha (AssertionError) se os resultados não forem iguais na ordem do ORDER BY.
+
+   Os valores de `coluna_ordem` precisam vir na mesma sequência; só dentro de um
+   grupo empatado as linhas podem trocar de posição (o banco não garante a ordem
+   delas). No último grupo de um resultado cortado pelo LIMIT, quais linhas
+   empatadas entram é arbitrário, então ali só a coluna de ordenação é comparada.
+   """
+   colunar, sql = _normalizar_para_comparacao(colunar), _normalizar_para_comparacao(sql)
+   pd.testing.assert_series_equal(colunar[coluna_ordem], sql[coluna_ordem], check_dtype=False, check_exact=True)
+
+   grupos = _grupos_empate(sql[coluna_ordem])
+   manter = grupos < grupos.max() if limite and len(sql) == limite and len(sql) else grupos >= 0
+   colunas = list(sql.columns)
+   lados = []
+   for df in (colunar, sql):
+      df = df.assign(_grupo=grupos.to_numpy())[manter.to_numpy()]
+      lados.append(df.sort_values(["_grupo"] + colunas, kind="stable").reset_index(drop=True))
+   pd.testing.assert_frame_equal(lados[0], lados[1], check_dtype=False, check_exact=True)
+
+def comparar_com_sql(snapshot: SnapshotColunar, engine, nomes: list = None) -> dict:
+   """Compara cada relatório colunar com o resultado da consulta SQL correspondente.
+
+   Valores exatos e a mesma ordem do ORDER BY; só linhas empatadas (inclusive
+   no corte do LIMIT) podem vir em outra ordem, como o MySQL as devolve.
+   """
+   resultados = executar_relatorios_colunar(snapshot, nomes)
+   divergencias = {}
+   for nome, df_colunar in resultados.items():
+      df_sql = pd.read_sql(consultas[nome], con=engine)
+      try:
+         comparar_resultados(df_colunar, df_sql, *ORDENACAO_SQL[nome])
+         print(f"✅ {nome}: idêntico ({len(df_sql)} linhas)")
+      except AssertionError as e:
+         divergencias[nome] = str(e)
+         print(f"❌ {nome}: diverge do SQL\n{e}")
+   return divergencias
+
+if __name__ == "__main__":
+   comando = sys.argv[1] if len(sys.argv) > 1 else "executar"
+   diretorio = sys.argv[2] if len(sys.argv) > 2 else "snapshot_colunar"
+   engine = criar_engine_mysql()
+
+   if comando == "snapshot":
+      inicio = time.perf_counter()
+      snapshot = SnapshotColunar.do_banco(engine)
+      snapshot.salvar(diretorio)
+      print(f"✅ Snapshot com {len(snapshot)} interações salvo em {diretorio} ({time.perf_counter() - inicio:.2f}s)")
+   elif comando == "executar":
+      snapshot = SnapshotColunar.carregar(diretorio)
+      inicio = time.perf_counter()
+      for nome, df in executar_relatorios_colunar(snapshot).items():
+         print(f"\n📊 {nome}\n{df.head(5).to_string(index=False)}")
+      print(f"\n⏱️ {len(RELATORIOS_COLUNARES)} relatórios em {time.perf_counter() - inicio:.3f}s")
+   elif comando == "comparar":
+      sys.exit(1 if comparar_com_sql(SnapshotColunar.carregar(diretorio), engine) else 0)
+   else:
+      print("Uso: python motor_colunar.py [snapshot|executar|comparar] [diretorio]")
+      sys.exit(2)
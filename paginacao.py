@@ -0,0 +1,150 @@
+# paginacao.py
+import time
+import pandas as pd
+from sqlalchemy import text
+from cache_relatorios import normalizar_sql
+from instrumentacao import medir_relatorio, registrar_resultado
+
+TAMANHO_PAGINA_PADRAO = 20
+
+# Colunas de ordenação de cada relatório (todas DESC), terminando numa combinação única.
+# A página seguinte começa depois da última linha vista (keyset), sem OFFSET.
+# Chaves sempre numéricas: total_consumo é TIME e satura em 838:59:59 no MySQL.
+CHAVES_PAGINACAO = {
+   "ranking_conteudos_consumidos": ["soma_watch_seconds", "id_conteudo"],
+   "plataforma_maior_engajamento": ["total_engajamento", "nome"],
+   "total_de_engajamentos_por_plataforma": ["total_engajamento", "nome_plataforma"],
+   "conteudos_mais_comentados": ["total_comentarios", "id_conteudo"],
+   "interacoes_por_tipo_conteudo": ["total_interacoes", "tipo_conteudo"],
+   "tempo_medio_por_plataforma": ["tempo_medio", "nome"],
+   "comentarios_por_conteudo": ["quantidade_comentarios", "id_conteudo"],
+   "conteudos_mais_assistidos_por_plataforma": ["total_assistidos", "plataforma", "nome_conteudo"],
+   "relatorios_sql": ["criado_em", "id"],
+}
+
+def _para_parametro(valor):
+   if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+      return None
+   if isinstance(valor, pd.Timestamp):
+      return valor.to_pydatetime()
+   if isinstance(valor, pd.Timedelta):
+      return valor.to_pytimedelta()
+   return valor.item() if hasattr(valor, "item") else valor
+
+def _condicao_apos(colunas: list, valores: list) -> tuple:
+   """WHERE que seleciona as linhas posteriores a `valores` na ordem DESC de `colunas` (nulos por último)"""
+   alternativas = []
+   parametros = {}
+   for i, coluna in enumerate(colunas):
+      iguais = []
+      for j, anterior in enumerate(colunas[:i]):
+         if valores[j] is None:
+            iguais.append(f"{anterior} IS NULL")
+         else:
+            iguais.append(f"{anterior} = :k{j}")
+      if valores[i] is None:
+         # Depois de um nulo só vêm outros nulos, já cobertos pelas colunas seguintes
+         continue
+      alternativas.append(" AND ".join(iguais + [f"({coluna} < :k{i} OR {coluna} IS NULL)"]))
+   for j, valor in enumerate(valores):
+      if valor is not None:
+         parametros[f"k{j}"] = valor
+   return " OR ".join(f"({alternativa})" for alternativa in alternativas) or "1 = 0", parametros
+
+class PaginadorRelatorio:
+   """Navega pelo resultado de um relatório uma página por vez.
+
+   Com chaves de ordenação (CHAVES_PAGINACAO), cada página é uma consulta
+   própria com LIMIT, começando após a última linha da página anterior: o
+   tempo até a primeira linha não depende do tamanho do resultado. Para voltar,
+   guarda apenas a chave inicial de cada página já visitada.
+   Sem chaves, lê por cursor do lado do servidor, só para frente, e guarda as
+   páginas já lidas para permitir voltar.
+   """
+
+   def __init__(self, query_sql, engine, nome: str = None, chaves: list = None,
+                tamanho_pagina: int = TAMANHO_PAGINA_PADRAO, parametros: dict = None):
+      # Aceita também a instrução preparada por registro_relatorios, com os valores em `parametros`
+      self.query_sql = normalizar_sql(str(query_sql))
+      self.parametros = dict(parametros or {})
+      self.engine = engine
+      self.nome = nome or "consulta_avulsa"
+      self.chaves = chaves if chaves is not None else CHAVES_PAGINACAO.get(nome)
+      self.tamanho_pagina = tamanho_pagina
+      self.numero_pagina = 0
+      self.tem_proxima = False
+      self._inicios = [None]
+      self._paginas = []
+      self._conexao = None
+      self._cursor = None
+      self._colunas = []
+      self._sobra = []
+
+   def _ler_keyset(self, inicio) -> pd.DataFrame:
+      ordem = ", ".join(f"{coluna} DESC" for coluna in self.chaves)
+      sql = f"SELECT * FROM ({self.query_sql}) AS relatorio"
+      parametros = {**self.parametros, "limite_pagina": self.tamanho_pagina + 1}
+      if inicio is not None:
+         condicao, valores = _condicao_apos(self.chaves, inicio)
+         sql += f" WHERE {condicao}"
+         parametros.update(valores)
+      sql += f" ORDER BY {ordem} LIMIT :limite_pagina"
+
+      with medir_relatorio(self.nome, self.engine) as medicao:
+         inicio_leitura = time.perf_counter()
+         with self.engine.connect() as conn:
+            df = pd.read_sql(text(sql), con=conn, params=parametros)
+         registrar_resultado(medicao, df, inicio_leitura)
+
+      # Uma linha a mais só para saber se existe próxima página
+      self.tem_proxima = len(df) > self.tamanho_pagina
+      return df.head(self.tamanho_pagina)
+
+   def _ler_cursor(self) -> pd.DataFrame:
+      if self._cursor is None:
+         self._conexao = self.engine.connect().execution_options(stream_results=True)
+         self._cursor = self._conexao.execute(text(self.query_sql), self.parametros)
+         self._colunas = list(self._cursor.keys())
+      # Lê uma linha além da página; ela fica guardada para a página seguinte
+      linhas = self._sobra + self._cursor.fetchmany(self.tamanho_pagina + 1 - len(self._sobra))
+      self._sobra = linhas[self.tamanho_pagina:]
+      if not self._sobra:
+         self.fechar()
+      return pd.DataFrame(linhas[:self.tamanho_pagina], columns=self._colunas)
+
+   def _pagina(self, numero: int) -> pd.DataFrame:
+      if self.chaves:
+         df = self._ler_keyset(self._inicios[numero])
+         if self.tem_proxima and len(self._inicios) == numero + 1:
+            ultima = df.iloc[-1]
+            self._inicios.append([_para_parametro(ultima[coluna]) for coluna in self.chaves])
+      else:
+         if numero == len(self._paginas):
+            self._paginas.append(self._ler_cursor())
+         df = self._paginas[numero]
+         self.tem_proxima = numero + 1 < len(self._paginas) or self._cursor is not None
+
+      self.numero_pagina = numero
+      if 'criado_em_formatado' in df.columns:
+         df['criado_em_formatado'] = df['criado_em_formatado'].str.replace('%%', '%', regex=False)
+      return df
+
+   def primeira(self) -> pd.DataFrame:
+      return self._pagina(0)
+
+   def proxima(self) -> pd.DataFrame:
+      if not self.tem_proxima:
+         raise IndexError("Não há próxima página")
+      return self._pagina(self.numero_pagina + 1)
+
+   def anterior(self) -> pd.DataFrame:
+      if self.numero_pagina == 0:
+         raise IndexError("Já está na primeira página")
+      return self._pagina(self.numero_pagina - 1)
+
+   def fechar(self):
+      if self._conexao is not None:
+         self._cursor.close()
+         self._conexao.close()
+      self._conexao = None
+      self._cursor = None
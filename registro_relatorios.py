@@ -0,0 +1,148 @@
+# registro_relatorios.py
+import re
+import threading
+import pandas as pd
+from sqlalchemy import text, bindparam, Date, Integer, String
+from conexao_sqlalchemy import consultas, parametros_relatorios, valores_parametros
+
+# Filtros sobre interacao_diaria (alias r) inseridos no marcador /* filtros */ das consultas.
+# Todos usam colunas indexadas: dia (início da chave primária), id_plataforma e tipo_interacao.
+FILTROS = {
+   "data_inicio": ("r.dia >= :data_inicio", Date),
+   "data_fim": ("r.dia <= :data_fim", Date),
+   "plataforma": ("r.id_plataforma = (SELECT id_plataforma FROM plataforma WHERE nome = :plataforma)", String),
+   "tipo_interacao": ("r.tipo_interacao = :tipo_interacao", String),
+}
+PARAMETROS_SUPORTADOS = list(FILTROS) + ["limite"]
+TIPOS_INTERACAO = ("view", "like", "share", "comment")
+MARCADOR_FILTROS = "/* filtros */"
+
+_LIMIT_FINAL = re.compile(r"\bLIMIT\s+\d+\s*;?\s*$", flags=re.IGNORECASE)
+
+def _converter(parametro: str, valor):
+   if parametro in ("data_inicio", "data_fim"):
+      return pd.Timestamp(valor).date()
+   if parametro == "limite":
+      limite = int(valor)
+      if limite < 1:
+         raise ValueError("O limite deve ser positivo")
+      return limite
+   if parametro == "tipo_interacao" and valor not in TIPOS_INTERACAO:
+      raise ValueError(f"tipo_interacao inválido: '{valor}'. Use {', '.join(TIPOS_INTERACAO)}")
+   return str(valor)
+
+def _ler_parametros(texto) -> list:
+   return [p.strip() for p in (texto or "").split(",") if p.strip()]
+
+class RegistroRelatorios:
+   """Catálogo de relatórios carregado uma vez de relatorios_sql, com consultas parametrizadas.
+
+   Cada relatório declara os parâmetros que aceita (coluna `parametros`, ou
+   `parametros_relatorios` para os de `consultas`). `preparar` monta o SQL só
+   com os filtros informados, no marcador /* filtros */, e guarda o `text()`
+   com os bindparams tipados por combinação de parâmetros: chamadas seguintes
+   reaproveitam a instrução (e o cache de compilação do SQLAlchemy).
+   """
+
+   def __init__(self, engine, usar_banco: bool = True):
+      self.engine = engine
+      self.usar_banco = usar_banco
+      self._definicoes = None
+      self._instrucoes = {}
+      self._lock = threading.Lock()
+
+   def _ler_banco(self) -> list:
+      try:
+         with self.engine.connect() as conn:
+            return list(conn.execute(text("SELECT nome, descricao, query_sql, parametros FROM relatorios_sql")))
+      except Exception as e:
+         print(f"⚠️ Não foi possível ler relatorios_sql: {e}")
+         return []
+
+   def carregar(self) -> dict:
+      """Definições por nome: `consultas` mais relatorios_sql (o banco prevalece)"""
+      with self._lock:
+         if self._definicoes is None:
+            definicoes = {
+               nome: {"nome": nome, "descricao": nome.replace("_", " ").capitalize(), "query_sql": query_sql,
+                      "parametros": list(parametros_relatorios.get(nome, [])),
+                      "valores": valores_parametros.get(nome, {})}
+               for nome, query_sql in consultas.items()
+            }
+            for nome, descricao, query_sql, parametros in (self._ler_banco() if self.usar_banco else []):
+               declarados = _ler_parametros(parametros) or list(parametros_relatorios.get(nome, []))
+               definicoes[nome] = {"nome": nome, "descricao": descricao, "query_sql": query_sql,
+                                   "parametros": declarados, "valores": valores_parametros.get(nome, {})}
+            self._definicoes = definicoes
+         return self._definicoes
+
+   def recarregar(self) -> dict:
+      with self._lock:
+         self._definicoes = None
+         self._instrucoes.clear()
+      return self.carregar()
+
+   def nomes(self) -> list:
+      return sorted(self.carregar())
+
+   def definicao(self, nome: str) -> dict:
+      definicoes = self.carregar()
+      if nome not in definicoes:
+         raise KeyError(f"Relatório não encontrado: {nome}")
+      return definicoes[nome]
+
+   def _montar(self, definicao: dict, informados: tuple):
+      query_sql = definicao["query_sql"].strip().rstrip(";").rstrip()
+      filtros = [FILTROS[p][0] for p in informados if p in FILTROS]
+      if filtros:
+         if MARCADOR_FILTROS not in query_sql:
+            raise ValueError(f"O relatório '{definicao['nome']}' não tem o marcador {MARCADOR_FILTROS} "
+                             "(atualize relatorios_sql com inserir_relatorios.py)")
+         query_sql = query_sql.replace(MARCADOR_FILTROS, "AND " + " AND ".join(filtros))
+      if "limite" in informados:
+         if _LIMIT_FINAL.search(query_sql):
+            query_sql = _LIMIT_FINAL.sub("LIMIT :limite", query_sql)
+         else:
+            query_sql += "\nLIMIT :limite"
+      tipos = {**{p: tipo for p, (_, tipo) in FILTROS.items()}, "limite": Integer}
+      return text(query_sql).bindparams(*(bindparam(p, type_=tipos[p]) for p in informados))
+
+   def preparar(self, nome: str, **parametros) -> tuple:
+      """Retorna (instrução text(), valores) para o relatório; parâmetros vazios são ignorados"""
+      definicao = self.definicao(nome)
+      valores = {p: v for p, v in parametros.items() if v is not None and v != ""}
+      nao_aceitos = set(valores) - set(definicao["parametros"])
+      if nao_aceitos:
+         raise ValueError(f"O relatório '{nome}' não aceita: {', '.join(sorted(nao_aceitos))} "
+                          f"(aceita: {', '.join(definicao['parametros']) or 'nenhum'})")
+      valores = {p: _converter(p, v) for p, v in valores.items()}
+      for parametro, permitidos in definicao["valores"].items():
+         if parametro in valores and valores[parametro] not in permitidos:
+            raise ValueError(f"O relatório '{nome}' só aceita {parametro} em: {', '.join(permitidos)} "
+                             f"(recebido: '{valores[parametro]}')")
+
+      chave = (nome, tuple(sorted(valores)))
+      with self._lock:
+         instrucao = self._instrucoes.get(chave)
+      if instrucao is None:
+         instrucao = self._montar(definicao, chave[1])
+         with self._lock:
+            self._instrucoes[chave] = instrucao
+      return instrucao, valores
+
+   def preparar_aceitos(self, nome: str, **parametros) -> tuple:
+      """Como `preparar`, mas descarta os parâmetros que o relatório não declara (execução em lote)"""
+      aceitos = set(self.definicao(nome)["parametros"])
+      return self.preparar(nome, **{p: v for p, v in parametros.items() if p in aceitos})
+
+# Um registro por engine no processo
+_registros = {}
+_registros_lock = threading.Lock()
+
+def obter_registro(engine, usar_banco: bool = True) -> RegistroRelatorios:
+   chave = (engine.url.render_as_string(hide_password=False), usar_banco)
+   with _registros_lock:
+      registro = _registros.get(chave)
+      if registro is None:
+         registro = _registros[chave] = RegistroRelatorios(engine, usar_banco)
+   return registro
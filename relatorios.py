@@ -1,34 +1,113 @@
 # relatorios.py
 import pandas as pd
+import json
 import os
+import time
+from sqlalchemy import text
+from conexao_sqlalchemy import consultas
+from cache_relatorios import cache_padrao, ler_versao_dados, normalizar_sql
+from exportacao import salvar_resultado
+from instrumentacao import medir_relatorio, registrar_resultado
 
-def executar_relatorio_sql(query_sql: str, engine, nome_csv: str = None, exibir_linhas: int = 5) -> pd.DataFrame:
+def _nome_relatorio(query_sql) -> str:
+   normalizada = normalizar_sql(str(query_sql))
+   for nome, sql in consultas.items():
+      if normalizar_sql(sql) == normalizada:
+         return nome
+   return "consulta_avulsa"
+
+def _ler(query_sql, engine, parametros: dict = None) -> pd.DataFrame:
+   if parametros is None:
+      return pd.read_sql(query_sql, con=engine)
+   with engine.connect() as conn:
+      return pd.read_sql(query_sql, con=conn, params=parametros)
+
+def _ler_com_cache(query_sql, engine, cache, medicao: dict, parametros: dict = None) -> pd.DataFrame:
+   try:
+      with engine.connect() as conn:
+         versao = ler_versao_dados(conn)
+   except Exception:
+      # Banco sem a tabela versao_dados: não há como invalidar, então não usa cache
+      return _ler(query_sql, engine, parametros)
+
+   chave_sql = str(query_sql)
+   if parametros:
+      # Valores diferentes do mesmo relatório parametrizado são entradas diferentes
+      chave_sql += "|" + json.dumps(parametros, sort_keys=True, default=str)
+   chave = cache.chave(chave_sql, engine, versao)
+   df = cache.obter(chave)
+   medicao["cache"] = df is not None
+   if df is None:
+      df = _ler(query_sql, engine, parametros)
+      cache.guardar(chave, df)
+   return df
+
+def ler_relatorio(query_sql, engine, usar_cache: bool = True, cache=None, nome: str = None,
+                  parametros: dict = None) -> pd.DataFrame:
+   """Executa a consulta (ou lê do cache) sem imprimir nada; erros são propagados.
+
+   `query_sql` pode ser o SQL em texto ou uma instrução preparada por
+   registro_relatorios, com os valores em `parametros`.
+   Cada chamada é medida em instrumentacao.registro_padrao, sob `nome` (por
+   padrão, o nome do relatório em `consultas` com o mesmo SQL).
+   """
+   with medir_relatorio(nome or _nome_relatorio(query_sql), engine) as medicao:
+      inicio = time.perf_counter()
+      if usar_cache:
+         df = _ler_com_cache(query_sql, engine, cache or cache_padrao, medicao, parametros)
+      else:
+         df = _ler(query_sql, engine, parametros)
+      registrar_resultado(medicao, df, inicio)
+
+   # Corrige a formatação da data se existir
+   if 'criado_em_formatado' in df.columns:
+      df['criado_em_formatado'] = df['criado_em_formatado'].str.replace('%%', '%', regex=False)
+   return df
+
+def listar_relatorios(engine) -> dict:
+   """Relatórios de `consultas` mais os cadastrados em relatorios_sql (o banco prevalece)"""
+   relatorios = dict(consultas)
+   try:
+      with engine.connect() as conn:
+         for nome, query_sql in conn.execute(text("SELECT nome, query_sql FROM relatorios_sql")):
+            relatorios[nome] = query_sql
+   except Exception as e:
+      print(f"⚠️ Não foi possível ler relatorios_sql: {e}")
+   return relatorios
+
+def executar_relatorio_sql(query_sql, engine, nome_csv: str = None, exibir_linhas: int = 5,
+                           usar_cache: bool = True, limpar_cache: bool = False, cache=None,
+                           nome: str = None, parametros: dict = None) -> pd.DataFrame:
    try:
       # Configurações do pandas para melhor visualização
       pd.set_option('display.max_columns', None)
       pd.set_option('display.width', 1000)
       pd.set_option('display.colheader_justify', 'left')
       
-      df = pd.read_sql(query_sql, con=engine)
-      
-      if df.empty:
-         print("ℹ️ A consulta não retornou resultados.")
-         return df
+      cache = cache or cache_padrao
+      if limpar_cache:
+         cache.limpar()
+
+      # Uma única medição para a leitura e a gravação do arquivo
+      with medir_relatorio(nome or _nome_relatorio(query_sql), engine) as medicao:
+         df = ler_relatorio(query_sql, engine, usar_cache=usar_cache, cache=cache, parametros=parametros)
          
-      # Corrige a formatação da data se existir
-      if 'criado_em_formatado' in df.columns:
-         df['criado_em_formatado'] = df['criado_em_formatado'].str.replace('%%', '%', regex=False)
+         if df.empty:
+            print("ℹ️ A consulta não retornou resultados.")
+            return df
+            
+         print(f"\n🔍 Resultados ({len(df)} linhas):")
+         print(df.head(exibir_linhas).to_string(index=False))
          
-      print(f"\n🔍 Resultados ({len(df)} linhas):")
-      print(df.head(exibir_linhas).to_string(index=False))
-      
-      if nome_csv:
-         os.makedirs(os.path.dirname(nome_csv), exist_ok=True)
-         df.to_csv(nome_csv, index=False)
-         print(f"\n💾 Salvo em: {nome_csv}")
+         if nome_csv:
+            # O formato segue a extensão do arquivo (.csv, .parquet, .feather)
+            inicio = time.perf_counter()
+            salvar_resultado(df, nome_csv)
+            medicao["segundos_escrita"] = time.perf_counter() - inicio
+            print(f"\n💾 Salvo em: {nome_csv}")
          
       return df
       
    except Exception as e:
       print(f"\n❌ Erro ao executar consulta: {str(e)}")
-      return pd.DataFrame()
\ No newline at end of file
+      return pd.DataFrame()
@@ -0,0 +1,101 @@
+# rollups.py
+import sys
+import pandas as pd
+from sqlalchemy import text
+from conexao_sqlalchemy import criar_engine_mysql, InteracaoDiaria, VersaoDadosDia
+from upsert_lotes import upsert_em_lotes, TAMANHO_LOTE_PADRAO
+from cache_relatorios import incrementar_versao_dados
+
+CHAVES_ROLLUP = ["dia", "id_conteudo", "id_plataforma", "tipo_interacao"]
+METRICAS_ROLLUP = ["total_interacoes", "soma_watch_seconds", "qtd_watch"]
+
+# Agregação da tabela bruta no mesmo formato de interacao_diaria
+SQL_AGREGADO_BRUTO = """
+   SELECT
+      DATE(data_interacao) AS dia,
+      id_conteudo,
+      id_plataforma,
+      tipo_interacao,
+      COUNT(*) AS total_interacoes,
+      COALESCE(SUM(watch_duration_seconds), 0) AS soma_watch_seconds,
+      COUNT(watch_duration_seconds) AS qtd_watch
+   FROM interacao
+   GROUP BY DATE(data_interacao), id_conteudo, id_plataforma, tipo_interacao
+"""
+
+def agregar_interacoes(df_final: pd.DataFrame) -> pd.DataFrame:
+   """Agrega as interações de uma carga por (dia, conteúdo, plataforma, tipo)"""
+   dia = pd.to_datetime(df_final["data_interacao"]).dt.date.rename("dia")
+   agregado = df_final.groupby(
+      [dia, df_final["id_conteudo"], df_final["id_plataforma"], df_final["tipo_interacao"]],
+      observed=True
+   )["watch_duration_seconds"].agg(["size", "sum", "count"])
+   agregado.columns = METRICAS_ROLLUP
+   return agregado.reset_index()
+
+def atualizar_rollups(conn, df_final: pd.DataFrame, tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> int:
+   """Soma as interações recém-inseridas em interacao_diaria (mesma transação da carga)"""
+   if df_final.empty:
+      return 0
+   agregado = agregar_interacoes(df_final)
+   return upsert_em_lotes(
+      conn, "interacao_diaria", agregado.to_dict("records"),
+      chaves=CHAVES_ROLLUP,
+      somar=METRICAS_ROLLUP,
+      tamanho_lote=tamanho_lote
+   )
+
+def reconstruir_rollups(engine):
+   """Recalcula interacao_diaria a partir da tabela interacao (carga inicial ou correção)"""
+   InteracaoDiaria.__table__.create(engine, checkfirst=True)
+   VersaoDadosDia.__table__.create(engine, checkfirst=True)
+   with engine.begin() as conn:
+      conn.execute(text("DELETE FROM interacao_diaria"))
+      conn.execute(text(
+         f"INSERT INTO interacao_diaria ({', '.join(CHAVES_ROLLUP + METRICAS_ROLLUP)}) " + SQL_AGREGADO_BRUTO
+      ))
+      incrementar_versao_dados(conn)
+      total = conn.execute(text("SELECT COUNT(*) FROM interacao_diaria")).scalar()
+   print(f"✅ interacao_diaria reconstruída: {total} linhas.")
+
+def verificar_rollups(engine) -> pd.DataFrame:
+   """Compara interacao_diaria com a agregação da tabela interacao.
+
+   Retorna as linhas divergentes (vazio quando o rollup está consistente).
+   """
+   with engine.connect() as conn:
+      bruto = pd.read_sql(text(SQL_AGREGADO_BRUTO), con=conn)
+      rollup = pd.read_sql(
+         text(f"SELECT {', '.join(CHAVES_ROLLUP + METRICAS_ROLLUP)} FROM interacao_diaria"), con=conn
+      )
+
+   for df in (bruto, rollup):
+      df["dia"] = pd.to_datetime(df["dia"])
+      df["tipo_interacao"] = df["tipo_interacao"].astype(str)
+      df[METRICAS_ROLLUP] = df[METRICAS_ROLLUP].astype("int64")
+
+   comparacao = bruto.merge(rollup, on=CHAVES_ROLLUP, how="outer", suffixes=("_bruto", "_rollup"))
+   comparacao = comparacao.fillna({f"{m}_{lado}": 0 for m in METRICAS_ROLLUP for lado in ("bruto", "rollup")})
+   divergente = pd.Series(False, index=comparacao.index)
+   for metrica in METRICAS_ROLLUP:
+      divergente |= comparacao[f"{metrica}_bruto"] != comparacao[f"{metrica}_rollup"]
+   divergencias = comparacao[divergente]
+
+   if divergencias.empty:
+      print(f"✅ interacao_diaria consistente com interacao ({len(bruto)} grupos verificados).")
+   else:
+      print(f"❌ interacao_diaria diverge de interacao em {len(divergencias)} grupos:")
+      print(divergencias.head(20).to_string(index=False))
+   return divergencias
+
+
+if __name__ == "__main__":
+   comando = sys.argv[1] if len(sys.argv) > 1 else "verificar"
+   engine = criar_engine_mysql()
+   if comando == "reconstruir":
+      reconstruir_rollups(engine)
+   elif comando == "verificar":
+      sys.exit(1 if len(verificar_rollups(engine)) else 0)
+   else:
+      print("Uso: python rollups.py [verificar|reconstruir]")
+      sys.exit(2)
@@ -0,0 +1,387 @@
+# sketches.py
+import argparse
+import sys
+import time
+import zlib
+from functools import partial
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, bindparam, Date, Integer, String
+from conexao_sqlalchemy import criar_engine_mysql, SketchDiario
+from instrumentacao import medir_relatorio, registrar_resultado
+
+# HyperLogLog com 2^11 registradores de 1 byte: erro padrão relativo de 1,04/sqrt(2048) ≈ 2,3%
+# (≈ 4,5% com 95% de confiança), qualquer que seja a quantidade de usuários ou de linhas mescladas.
+PRECISAO_HLL = 11
+REGISTRADORES_HLL = 1 << PRECISAO_HLL
+ERRO_PADRAO_HLL = 1.04 / np.sqrt(REGISTRADORES_HLL)
+_ALFA_HLL = 0.7213 / (1 + 1.079 / REGISTRADORES_HLL)
+
+# Resumo Misra-Gries (a versão mesclável do Space-Saving) com até K contadores por linha.
+# A contagem estimada de um usuário nunca passa da real e fica no máximo
+# (N - soma dos contadores) / (K + 1) abaixo dela, também depois de mesclar resumos
+# (N = interações resumidas). Só usuários com mais de N / (K + 1) interações têm garantia de aparecer.
+CONTADORES_TOPK = 64
+
+# id_conteudo das linhas que resumem todos os conteúdos da plataforma no dia
+TODOS_CONTEUDOS = 0
+CHAVES_SKETCH = ["dia", "id_conteudo", "id_plataforma"]
+LINHAS_POR_LOTE_RECONSTRUCAO = 500_000
+
+def _hash64(valores) -> np.ndarray:
+   """splitmix64: espalha os ids pelos 64 bits (o HyperLogLog depende de bits uniformes)"""
+   with np.errstate(over="ignore"):
+      x = np.asarray(valores, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+      x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+      x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+   return x ^ (x >> np.uint64(31))
+
+def _posicoes_hll(id_usuario) -> tuple:
+   """Registrador (bits altos do hash) e posição do primeiro bit 1 nos 32 bits seguintes"""
+   h = _hash64(id_usuario)
+   registrador = (h >> np.uint64(64 - PRECISAO_HLL)).astype(np.int64)
+   resto = ((h >> np.uint64(64 - PRECISAO_HLL - 32)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+   # frexp dá o número de bits de `resto` (exato em float64 para 32 bits; 0 quando resto = 0)
+   return registrador, (33 - np.frexp(resto)[1]).astype(np.uint8)
+
+def estimar_hll(registradores: np.ndarray) -> np.ndarray:
+   """Usuários distintos estimados para cada linha de uma matriz (sketches x registradores)"""
+   registradores = np.atleast_2d(registradores)
+   m = registradores.shape[1]
+   estimativa = _ALFA_HLL * m * m / np.ldexp(1.0, -registradores.astype(np.int32)).sum(axis=1)
+   zeros = (registradores == 0).sum(axis=1)
+   # Poucos usuários: contagem linear, mais precisa enquanto há registradores zerados
+   linear = m * np.log(m / np.maximum(zeros, 1))
+   return np.where((estimativa <= 2.5 * m) & (zeros > 0), linear, estimativa)
+
+def _codificar_hll(registradores: np.ndarray) -> bytes:
+   return zlib.compress(registradores.tobytes())
+
+def _decodificar_hll(blobs: list) -> np.ndarray:
+   dados = b"".join(zlib.decompress(blob) for blob in blobs)
+   return np.frombuffer(dados, dtype=np.uint8).reshape(-1, REGISTRADORES_HLL)
+
+def _codificar_top(ids: np.ndarray, contagens: np.ndarray) -> bytes:
+   return zlib.compress(np.concatenate([ids, contagens]).astype("<i8").tobytes())
+
+def _decodificar_top(blob: bytes) -> tuple:
+   valores = np.frombuffer(zlib.decompress(blob), dtype="<i8")
+   metade = len(valores) // 2
+   return valores[:metade], valores[metade:]
+
+def reduzir_topk(contagens: pd.DataFrame, chaves: list, k: int = CONTADORES_TOPK) -> pd.DataFrame:
+   """Deixa no máximo k contadores por chave, subtraindo de todos o (k+1)-ésimo maior (Misra-Gries)"""
+   ordenado = contagens.sort_values(chaves + ["contagem"], ascending=[True] * len(chaves) + [False], kind="stable")
+   posicao = ordenado.groupby(chaves, sort=False).cumcount()
+   limiar = ordenado["contagem"].where(posicao == k, 0).groupby([ordenado[c] for c in chaves], sort=False) \
+      .transform("max")
+   ordenado = ordenado.assign(contagem=ordenado["contagem"] - limiar)
+   return ordenado[(posicao < k) & (ordenado["contagem"] > 0)]
+
+def _registradores_por_grupo(codigos: np.ndarray, id_usuario: np.ndarray, grupos: int) -> np.ndarray:
+   registrador, posicao = _posicoes_hll(id_usuario)
+   maximos = pd.Series(posicao).groupby(codigos * REGISTRADORES_HLL + registrador).max()
+   registradores = np.zeros(grupos * REGISTRADORES_HLL, dtype=np.uint8)
+   registradores[maximos.index.to_numpy()] = maximos.to_numpy()
+   return registradores.reshape(grupos, REGISTRADORES_HLL)
+
+def _blobs_top(reduzido: pd.DataFrame, grupos: int) -> list:
+   """Um blob por código de grupo (0..grupos-1); `reduzido` vem ordenado por código"""
+   codigos = reduzido["codigo"].to_numpy()
+   limites = np.searchsorted(codigos, np.arange(grupos + 1))
+   ids = reduzido["id_usuario"].to_numpy()
+   contagens = reduzido["contagem"].to_numpy()
+   return [_codificar_top(ids[a:b], contagens[a:b]) for a, b in zip(limites[:-1], limites[1:])]
+
+def calcular_sketches(df_final: pd.DataFrame) -> pd.DataFrame:
+   """Sketches de um lote por (dia, conteúdo, plataforma) e por (dia, plataforma) com id_conteudo = 0"""
+   base = pd.DataFrame({
+      "dia": pd.to_datetime(df_final["data_interacao"]).dt.normalize().to_numpy(),
+      "id_conteudo": df_final["id_conteudo"].to_numpy(dtype="int64"),
+      "id_plataforma": df_final["id_plataforma"].to_numpy(dtype="int64"),
+      "id_usuario": df_final["id_usuario"].to_numpy(dtype="int64"),
+   })
+   base = pd.concat([base, base.assign(id_conteudo=TODOS_CONTEUDOS)], ignore_index=True)
+
+   agrupado = base.groupby(CHAVES_SKETCH, sort=True)
+   base["codigo"] = agrupado.ngroup()
+   chaves = agrupado.size().rename("total_interacoes").reset_index()
+   registradores = _registradores_por_grupo(base["codigo"].to_numpy(), base["id_usuario"].to_numpy(), len(chaves))
+
+   contagens = base.groupby(["codigo", "id_usuario"]).size().rename("contagem").reset_index()
+   reduzido = reduzir_topk(contagens, ["codigo"])
+
+   chaves["dia"] = chaves["dia"].dt.date
+   chaves["hll"] = [_codificar_hll(linha) for linha in registradores]
+   chaves["top_usuarios"] = _blobs_top(reduzido, len(chaves))
+   return chaves
+
+def atualizar_sketches(conn, df_final: pd.DataFrame) -> int:
+   """Acrescenta os sketches do lote em sketch_diario (mesma transação da carga).
+
+   Só insere: as linhas da mesma chave são mescladas na consulta (ou por
+   compactar_sketches), então cargas concorrentes nunca disputam a mesma linha.
+   """
+   if df_final.empty:
+      return 0
+   sketches = calcular_sketches(df_final)
+   conn.execute(SketchDiario.__table__.insert(), sketches.to_dict("records"))
+   return len(sketches)
+
+def _maximo_por_grupo(matriz: np.ndarray, codigos: np.ndarray, grupos: int) -> np.ndarray:
+   """Máximo elemento a elemento das linhas de cada grupo.
+
+   Uma passada por posição dentro do grupo (no máximo uma por dia do período),
+   bem mais rápido que np.maximum.reduceat com milhares de grupos pequenos.
+   """
+   ordem = np.argsort(codigos, kind="stable")
+   posicao = pd.Series(codigos[ordem]).groupby(codigos[ordem]).cumcount().to_numpy()
+   registradores = np.zeros((grupos, matriz.shape[1]), dtype=np.uint8)
+   for passo in range(int(posicao.max()) + 1 if len(posicao) else 0):
+      linhas = ordem[posicao == passo]
+      destino = codigos[linhas]
+      registradores[destino] = np.maximum(registradores[destino], matriz[linhas])
+   return registradores
+
+def _mesclar(linhas: pd.DataFrame, chaves: list, com_contadores: bool = True) -> tuple:
+   """Mescla as linhas de sketch_diario por `chaves`: (chaves + total, registradores, contadores)"""
+   agrupado = linhas.groupby(chaves, sort=True)
+   codigos = agrupado.ngroup().to_numpy()
+   resultado = agrupado["total_interacoes"].sum().reset_index()
+   registradores = _maximo_por_grupo(_decodificar_hll(linhas["hll"].to_numpy()), codigos, len(resultado))
+   if not com_contadores:
+      return resultado, registradores, None
+
+   ids, contagens, origem = [], [], []
+   for codigo, blob in zip(codigos, linhas["top_usuarios"]):
+      ids_linha, contagens_linha = _decodificar_top(blob)
+      ids.append(ids_linha)
+      contagens.append(contagens_linha)
+      origem.append(np.full(len(ids_linha), codigo))
+   contadores = pd.DataFrame({
+      "codigo": np.concatenate(origem) if origem else np.array([], dtype=np.int64),
+      "id_usuario": np.concatenate(ids) if ids else np.array([], dtype=np.int64),
+      "contagem": np.concatenate(contagens) if contagens else np.array([], dtype=np.int64),
+   })
+   contadores = contadores.groupby(["codigo", "id_usuario"], as_index=False)["contagem"].sum()
+   return resultado, registradores, reduzir_topk(contadores, ["codigo"])
+
+def compactar_sketches(engine) -> int:
+   """Junta as linhas de cada chave (uma por lote de carga) numa só, um dia por transação"""
+   with engine.connect() as conn:
+      # SELECT textual: o SQLite devolve o dia como texto, e o bindparam Date só aceita date
+      dias = [pd.Timestamp(linha[0]).date() for linha in conn.execute(text(
+         "SELECT DISTINCT dia FROM (SELECT dia FROM sketch_diario "
+         "GROUP BY dia, id_conteudo, id_plataforma HAVING COUNT(*) > 1) AS repetidas"
+      ))]
+
+   removidas = 0
+   for dia in dias:
+      with engine.begin() as conn:
+         linhas = pd.read_sql(
+            text("SELECT id_sketch, dia, id_conteudo, id_plataforma, total_interacoes, hll, top_usuarios "
+                 "FROM sketch_diario WHERE dia = :dia").bindparams(bindparam("dia", type_=Date)),
+            con=conn, params={"dia": dia},
+         )
+         resultado, registradores, contadores = _mesclar(linhas, ["id_conteudo", "id_plataforma"])
+         resultado["dia"] = dia
+         resultado["hll"] = [_codificar_hll(linha) for linha in registradores]
+         resultado["top_usuarios"] = _blobs_top(contadores, len(resultado))
+         # Remove só as linhas lidas: as inseridas por cargas em andamento ficam para a próxima vez
+         ids = [int(i) for i in linhas["id_sketch"]]
+         for inicio in range(0, len(ids), 1000):
+            conn.execute(
+               text("DELETE FROM sketch_diario WHERE id_sketch IN :ids").bindparams(bindparam("ids", expanding=True)),
+               {"ids": ids[inicio:inicio + 1000]},
+            )
+         conn.execute(SketchDiario.__table__.insert(), resultado[CHAVES_SKETCH + ["total_interacoes", "hll", "top_usuarios"]]
+                      .to_dict("records"))
+         removidas += len(linhas) - len(resultado)
+   print(f"✅ sketch_diario compactada: {len(dias)} dias, {removidas} linhas a menos.")
+   return removidas
+
+def reconstruir_sketches(engine, linhas_por_lote: int = LINHAS_POR_LOTE_RECONSTRUCAO):
+   """Recalcula sketch_diario a partir da tabela interacao (bancos carregados antes dela existir).
+
+   Lê interacao em faixas da chave primária, cada uma numa conexão própria e
+   curta, e grava e confirma os sketches de cada faixa em outra transação:
+   nenhum cursor fica aberto durante as escritas (no SQLite isso travaria o
+   banco) e a transação não cresce com a tabela. Durante a reconstrução os
+   relatórios de sketch veem só as faixas já confirmadas.
+   """
+   SketchDiario.__table__.create(engine, checkfirst=True)
+   with engine.begin() as conn:
+      conn.execute(text("DELETE FROM sketch_diario"))
+   leitura = text("SELECT id_interacao, id_usuario, id_conteudo, id_plataforma, data_interacao FROM interacao "
+                  "WHERE id_interacao > :ultimo ORDER BY id_interacao LIMIT :limite")
+   ultimo = 0
+   while True:
+      with engine.connect() as conn:
+         lote = pd.read_sql(leitura, con=conn, params={"ultimo": ultimo, "limite": linhas_por_lote})
+      if lote.empty:
+         break
+      with engine.begin() as conn:
+         atualizar_sketches(conn, lote)
+      ultimo = int(lote["id_interacao"].iloc[-1])
+   compactar_sketches(engine)
+   print("✅ sketch_diario reconstruída.")
+
+def _ler_sketches(engine, conteudos: str, data_inicio=None, data_fim=None, plataforma: str = None,
+                  id_conteudo: int = None) -> pd.DataFrame:
+   """Linhas de sketch_diario do período; `conteudos` = 'todos' (linhas id_conteudo = 0) ou 'cada'"""
+   condicoes, valores, parametros = [], {}, []
+   if id_conteudo is not None:
+      condicoes.append("s.id_conteudo = :id_conteudo")
+      valores["id_conteudo"] = int(id_conteudo)
+      parametros.append(bindparam("id_conteudo", type_=Integer))
+   else:
+      condicoes.append("s.id_conteudo = 0" if conteudos == "todos" else "s.id_conteudo <> 0")
+   if data_inicio:
+      condicoes.append("s.dia >= :data_inicio")
+      valores["data_inicio"] = pd.Timestamp(data_inicio).date()
+      parametros.append(bindparam("data_inicio", type_=Date))
+   if data_fim:
+      condicoes.append("s.dia <= :data_fim")
+      valores["data_fim"] = pd.Timestamp(data_fim).date()
+      parametros.append(bindparam("data_fim", type_=Date))
+   if plataforma:
+      condicoes.append("s.id_plataforma = (SELECT id_plataforma FROM plataforma WHERE nome = :plataforma)")
+      valores["plataforma"] = plataforma
+      parametros.append(bindparam("plataforma", type_=String))
+   sql = ("SELECT s.id_conteudo, s.id_plataforma, s.total_interacoes, s.hll, s.top_usuarios "
+          "FROM sketch_diario s WHERE " + " AND ".join(condicoes))
+   with engine.connect() as conn:
+      return pd.read_sql(text(sql).bindparams(*parametros), con=conn, params=valores)
+
+def usuarios_unicos(engine, por: str = "plataforma", data_inicio=None, data_fim=None, plataforma: str = None,
+                    id_conteudo: int = None, limite: int = None) -> pd.DataFrame:
+   """Usuários distintos estimados por plataforma ou por conteúdo, com o intervalo de 95%.
+
+   Mescla só os sketches do período (um por dia e chave), sem ler interacao:
+   o custo não depende da quantidade de interações.
+   """
+   if por not in ("plataforma", "conteudo"):
+      raise ValueError(f"Agrupamento inválido: '{por}'. Use plataforma ou conteudo")
+   coluna = "id_plataforma" if por == "plataforma" else "id_conteudo"
+   linhas = _ler_sketches(engine, "todos" if por == "plataforma" else "cada", data_inicio, data_fim,
+                          plataforma, id_conteudo)
+   if linhas.empty:
+      return pd.DataFrame(columns=[coluna, por, "usuarios_unicos", "minimo_95", "maximo_95", "total_interacoes"])
+
+   resultado, registradores, _ = _mesclar(linhas, [coluna], com_contadores=False)
+   estimativa = estimar_hll(registradores)
+   resultado["usuarios_unicos"] = np.rint(estimativa).astype("int64")
+   resultado["minimo_95"] = np.floor(estimativa * (1 - 1.96 * ERRO_PADRAO_HLL)).astype("int64")
+   resultado["maximo_95"] = np.ceil(estimativa * (1 + 1.96 * ERRO_PADRAO_HLL)).astype("int64")
+
+   tabela, nome = ("plataforma", "nome") if por == "plataforma" else ("conteudo", "nome_conteudo")
+   with engine.connect() as conn:
+      nomes = pd.read_sql(text(f"SELECT {coluna}, {nome} AS {por} FROM {tabela}"), con=conn)
+   resultado = resultado.merge(nomes, on=coluna, how="left")
+   resultado = resultado[[coluna, por, "usuarios_unicos", "minimo_95", "maximo_95", "total_interacoes"]]
+   resultado = resultado.sort_values(["usuarios_unicos", coluna], ascending=[False, True]).reset_index(drop=True)
+   return resultado.head(limite) if limite else resultado
+
+def usuarios_mais_engajados(engine, data_inicio=None, data_fim=None, plataforma: str = None,
+                            id_conteudo: int = None, limite: int = 10) -> pd.DataFrame:
+   """Usuários com mais interações no período (todas as plataformas, uma plataforma ou um conteúdo).
+
+   `interacoes_minimas` é a contagem estimada (nunca acima da real) e
+   `interacoes_maximas` soma o erro máximo do resumo mesclado.
+   """
+   limite = min(int(limite or CONTADORES_TOPK), CONTADORES_TOPK)
+   linhas = _ler_sketches(engine, "todos", data_inicio, data_fim, plataforma, id_conteudo)
+   if linhas.empty:
+      return pd.DataFrame(columns=["id_usuario", "interacoes_minimas", "interacoes_maximas"])
+
+   _, _, contadores = _mesclar(linhas.assign(grupo=0), ["grupo"])
+   erro_maximo = (int(linhas["total_interacoes"].sum()) - int(contadores["contagem"].sum())) // (CONTADORES_TOPK + 1)
+   resultado = contadores.sort_values(["contagem", "id_usuario"], ascending=[False, True]).head(limite)
+   return pd.DataFrame({
+      "id_usuario": resultado["id_usuario"].to_numpy(),
+      "interacoes_minimas": resultado["contagem"].to_numpy(),
+      "interacoes_maximas": resultado["contagem"].to_numpy() + erro_maximo,
+   })
+
+# Relatórios respondidos pelos sketches (parâmetros: data_inicio, data_fim, plataforma, limite)
+RELATORIOS_SKETCH = {
+   "usuarios_unicos_por_plataforma": partial(usuarios_unicos, por="plataforma"),
+   "usuarios_unicos_por_conteudo": partial(usuarios_unicos, por="conteudo"),
+   "usuarios_mais_engajados": usuarios_mais_engajados,
+}
+PARAMETROS_SKETCH = ["data_inicio", "data_fim", "plataforma", "limite"]
+
+def parametros_sketch(parametros: dict) -> dict:
+   """Só os parâmetros informados que os relatórios de sketch aceitam"""
+   return {p: v for p, v in (parametros or {}).items() if p in PARAMETROS_SKETCH and v not in (None, "")}
+
+def executar_relatorio_sketch(nome: str, engine, **parametros) -> pd.DataFrame:
+   """Executa um relatório de RELATORIOS_SKETCH com a mesma medição dos relatórios SQL"""
+   if nome not in RELATORIOS_SKETCH:
+      raise KeyError(f"Relatório não encontrado: {nome}")
+   with medir_relatorio(nome, engine) as medicao:
+      inicio = time.perf_counter()
+      df = RELATORIOS_SKETCH[nome](engine, **parametros_sketch(parametros))
+      registrar_resultado(medicao, df, inicio)
+   return df
+
+def verificar_sketches(engine, limite: int = 10) -> bool:
+   """Confere as estimativas com as contagens exatas em interacao (consulta cara, só para conferência).
+
+   Usuários únicos por plataforma devem ficar a até 3 erros padrão do valor
+   exato (99,7% das vezes); o top de usuários deve conter a contagem exata
+   de cada um entre o mínimo e o máximo informados.
+   """
+   with engine.connect() as conn:
+      exato = pd.read_sql(text("SELECT id_plataforma, COUNT(DISTINCT id_usuario) AS exato "
+                               "FROM interacao GROUP BY id_plataforma"), con=conn)
+   estimado = usuarios_unicos(engine, por="plataforma").merge(exato, on="id_plataforma")
+   erro_relativo = (estimado["usuarios_unicos"] - estimado["exato"]) / estimado["exato"]
+   fora = estimado[erro_relativo.abs() > 3 * ERRO_PADRAO_HLL]
+   print(f"📊 Usuários únicos por plataforma: erro relativo médio {erro_relativo.abs().mean():.2%}, "
+         f"máximo {erro_relativo.abs().max():.2%} (erro padrão teórico {ERRO_PADRAO_HLL:.2%})")
+
+   top = usuarios_mais_engajados(engine, limite=limite)
+   with engine.connect() as conn:
+      exatas = pd.read_sql(
+         text("SELECT id_usuario, COUNT(*) AS exato FROM interacao WHERE id_usuario IN :ids GROUP BY id_usuario")
+         .bindparams(bindparam("ids", expanding=True)),
+         con=conn, params={"ids": [int(i) for i in top["id_usuario"]] or [-1]},
+      )
+   top = top.merge(exatas, on="id_usuario", how="left")
+   fora_top = top[(top["exato"] < top["interacoes_minimas"]) | (top["exato"] > top["interacoes_maximas"])]
+
+   if fora.empty and fora_top.empty:
+      print(f"✅ Sketches dentro do limite de erro ({len(estimado)} plataformas, top {len(top)} usuários).")
+      return True
+   if not fora.empty:
+      print("❌ Plataformas fora de 3 erros padrão:")
+      print(fora.to_string(index=False))
+   if not fora_top.empty:
+      print("❌ Usuários com contagem exata fora do intervalo estimado:")
+      print(fora_top.to_string(index=False))
+   return False
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Relatórios aproximados a partir de sketch_diario")
+   parser.add_argument("comando", choices=sorted(RELATORIOS_SKETCH) + ["compactar", "reconstruir", "verificar"])
+   parser.add_argument("--data-inicio")
+   parser.add_argument("--data-fim")
+   parser.add_argument("--plataforma")
+   parser.add_argument("--limite", type=int)
+   args = parser.parse_args()
+
+   engine = criar_engine_mysql()
+   if args.comando == "compactar":
+      compactar_sketches(engine)
+   elif args.comando == "reconstruir":
+      reconstruir_sketches(engine)
+   elif args.comando == "verificar":
+      sys.exit(0 if verificar_sketches(engine) else 1)
+   else:
+      inicio = time.perf_counter()
+      df = executar_relatorio_sketch(args.comando, engine, data_inicio=args.data_inicio, data_fim=args.data_fim,
+                                     plataforma=args.plataforma, limite=args.limite)
+      print(f"\n🔍 {args.comando} ({len(df)} linhas, {(time.perf_counter() - inicio) * 1000:.0f} ms):")
+      print(df.to_string(index=False))
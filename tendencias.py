@@ -0,0 +1,292 @@
+# tendencias.py
+import argparse
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, bindparam, Date, DateTime, String
+from conexao_sqlalchemy import criar_engine_mysql
+from sqlalchemy.exc import SQLAlchemyError
+from cache_relatorios import ler_versao_dados, ler_menor_dia_alterado
+from instrumentacao import medir_relatorio, registrar_resultado
+
+# Granularidade -> granularidade lida do banco (a semana é montada com os dias)
+GRANULARIDADE_BASE = {"hora": "hora", "dia": "dia", "semana": "dia"}
+PASSOS = {"hora": pd.Timedelta(hours=1), "dia": pd.Timedelta(days=1), "semana": pd.Timedelta(days=7)}
+METRICAS = ["interacoes", "watch_seconds"]
+
+# Coluna agrupada e consulta com os nomes de cada dimensão (None = total geral)
+DIMENSOES = {
+   "plataforma": ("id_plataforma", "SELECT id_plataforma AS chave, nome FROM plataforma"),
+   "conteudo": ("id_conteudo", "SELECT id_conteudo AS chave, nome_conteudo AS nome FROM conteudo"),
+   None: (None, None),
+}
+
+# Períodos que terminaram há mais que este atraso ficam no cache até uma carga gravar o dia
+# deles (versao_dados_dia); linhas atrasadas que chegarem por outro caminho exigem CacheTendencias.invalidar().
+ATRASO_MAXIMO = pd.Timedelta(hours=float(os.getenv("TENDENCIAS_ATRASO_HORAS", "2")))
+
+# Hora truncada de data_interacao em cada banco (padrão: MySQL)
+TRUNCAR_HORA = {
+   "sqlite": "strftime('%Y-%m-%d %H:00:00', data_interacao)",
+   "mysql": "DATE_FORMAT(data_interacao, '%Y-%m-%d %H:00:00')",
+}
+
+# Por hora lê a tabela bruta pelo índice de data; por dia, o agregado interacao_diaria
+# (pelo início da chave primária). O tipo de interação é filtrado na agregação, não no
+# WHERE: com `tipo_interacao = ...` o otimizador prefere os índices por tipo de
+# interacao_diaria e percorre todas as linhas daquele tipo em vez de só o intervalo pedido.
+SQL_POR_HORA = """
+   SELECT {periodo} AS periodo{colunas},
+      SUM(CASE WHEN {condicao} THEN 1 ELSE 0 END) AS interacoes,
+      COALESCE(SUM(CASE WHEN {condicao} THEN watch_duration_seconds END), 0) AS watch_seconds
+   FROM interacao
+   WHERE data_interacao >= :inicio AND data_interacao < :fim
+   GROUP BY {periodo}{colunas}
+"""
+SQL_POR_DIA = """
+   SELECT dia AS periodo{colunas},
+      SUM(CASE WHEN {condicao} THEN total_interacoes ELSE 0 END) AS interacoes,
+      SUM(CASE WHEN {condicao} THEN soma_watch_seconds ELSE 0 END) AS watch_seconds
+   FROM interacao_diaria
+   WHERE dia >= :inicio AND dia < :fim
+   GROUP BY dia{colunas}
+"""
+
+# Relatórios de tendência prontos (argumentos de `tendencia`)
+TENDENCIAS = {
+   "views_por_hora_por_plataforma": {"granularidade": "hora", "dimensao": "plataforma",
+                                     "tipo_interacao": "view", "janela": 24, "periodos": 24},
+   "interacoes_por_dia_por_plataforma": {"granularidade": "dia", "dimensao": "plataforma", "janela": 7, "periodos": 7},
+   "tempo_assistido_por_dia_por_conteudo": {"granularidade": "dia", "dimensao": "conteudo",
+                                            "metrica": "watch_seconds", "janela": 7, "periodos": 1},
+   "interacoes_por_semana": {"granularidade": "semana", "dimensao": None, "janela": 4, "periodos": 1},
+}
+
+def inicio_periodo(momento, granularidade: str):
+   """Início do período (hora, dia ou semana começando na segunda) de um Timestamp ou Series"""
+   if isinstance(momento, pd.Series):
+      dia = momento.dt.floor("D")
+      if granularidade == "hora":
+         return momento.dt.floor("h")
+      return dia - pd.to_timedelta(momento.dt.weekday, unit="D") if granularidade == "semana" else dia
+   momento = pd.Timestamp(momento)
+   if granularidade == "hora":
+      return momento.floor("h")
+   dia = momento.normalize()
+   return dia - pd.Timedelta(days=dia.weekday()) if granularidade == "semana" else dia
+
+def _ler_periodos(engine, base: str, dimensao: str, tipo_interacao: str, inicio, fim) -> pd.DataFrame:
+   """Métricas por período base (hora ou dia) e dimensão em [inicio, fim)"""
+   coluna, _ = DIMENSOES[dimensao]
+   colunas = f", {coluna}" if coluna else ""
+   condicao = "tipo_interacao = :tipo_interacao" if tipo_interacao else "1 = 1"
+   if base == "hora":
+      periodo = TRUNCAR_HORA.get(engine.dialect.name, TRUNCAR_HORA["mysql"])
+      sql = SQL_POR_HORA.format(periodo=periodo, colunas=colunas, condicao=condicao)
+      tipo_limite, valores = DateTime, {"inicio": inicio.to_pydatetime(), "fim": fim.to_pydatetime()}
+   else:
+      sql = SQL_POR_DIA.format(colunas=colunas, condicao=condicao)
+      tipo_limite, valores = Date, {"inicio": inicio.date(), "fim": fim.date()}
+   instrucao = text(sql).bindparams(bindparam("inicio", type_=tipo_limite), bindparam("fim", type_=tipo_limite))
+   if tipo_interacao:
+      instrucao = instrucao.bindparams(bindparam("tipo_interacao", type_=String))
+      valores["tipo_interacao"] = tipo_interacao
+
+   with engine.connect() as conn:
+      df = pd.read_sql(instrucao, con=conn, params=valores)
+   df["periodo"] = pd.to_datetime(df["periodo"])
+   df = df.rename(columns={coluna: "chave"}) if coluna else df.assign(chave=0)
+   df["chave"] = df["chave"].astype("int64")
+   df[METRICAS] = df[METRICAS].astype("int64")
+   return df[["periodo", "chave"] + METRICAS]
+
+class CacheTendencias:
+   """Séries por período base guardadas só até o último período fechado.
+
+   Para cada série (banco, granularidade base, dimensão, tipo) guarda um
+   intervalo contínuo [desde, ate) de períodos já fechados. Um pedido lê do
+   banco apenas o que falta nas pontas desse intervalo e os períodos ainda
+   abertos (os que terminaram há menos de `atraso_maximo`), que nunca são
+   guardados. Cada intervalo vale para uma versao_dados: depois de uma carga
+   ele é cortado no menor dia que ela gravou (versao_dados_dia), e só esse
+   final é lido de novo. Assim, uma tendência de 90 dias custa, depois da
+   primeira vez, o mesmo que uma de um dia, mesmo com a ingestão contínua
+   gravando micro-lotes do dia atual.
+   """
+
+   def __init__(self, atraso_maximo: pd.Timedelta = ATRASO_MAXIMO):
+      self.atraso_maximo = atraso_maximo
+      self._series = {}
+      self._lock = threading.Lock()
+      self.estatisticas = {"periodos_cache": 0, "leituras_banco": 0}
+
+   def limite_fechado(self, base: str, agora) -> pd.Timestamp:
+      """Primeiro período base ainda aberto: tudo antes dele é definitivo"""
+      return inicio_periodo(pd.Timestamp(agora) - self.atraso_maximo, base)
+
+   def _ler(self, engine, chave: tuple, inicio, fim) -> pd.DataFrame:
+      self.estatisticas["leituras_banco"] += 1
+      _, base, dimensao, tipo_interacao = chave
+      return _ler_periodos(engine, base, dimensao, tipo_interacao, inicio, fim)
+
+   @staticmethod
+   def _aparar(engine, entrada: tuple):
+      """Intervalo guardado sem os dias gravados depois dele; None se nada dele continua válido"""
+      desde, ate, serie, versao = entrada
+      try:
+         with engine.connect() as conn:
+            alterado = ler_menor_dia_alterado(conn, versao)
+      except SQLAlchemyError:
+         # Banco sem versao_dados_dia: não há como saber o que mudou
+         return None
+      if alterado is not None:
+         ate = min(ate, alterado)
+      if ate <= desde:
+         return None
+      return desde, ate, serie[serie["periodo"] < ate], versao
+
+   def obter(self, engine, base: str, dimensao: str, tipo_interacao: str, inicio, fim, agora) -> tuple:
+      """Períodos base em [inicio, fim); retorna (DataFrame, quantos períodos vieram do cache)"""
+      chave = (engine.url.render_as_string(hide_password=True), base, dimensao, tipo_interacao)
+      limite = self.limite_fechado(base, agora)
+      fechado_ate = min(fim, limite)
+      partes = []
+      do_cache = 0
+
+      if inicio < fechado_ate:
+         # Lida antes dos dados: uma carga no meio só faz a próxima chamada reler
+         with engine.connect() as conn:
+            versao = ler_versao_dados(conn)
+         with self._lock:
+            entrada = self._series.get(chave)
+         if entrada is not None and entrada[3] != versao:
+            entrada = self._aparar(engine, entrada)
+         if entrada is None:
+            desde, ate = inicio, fechado_ate
+            serie = self._ler(engine, chave, inicio, fechado_ate)
+         else:
+            desde, ate, serie, _ = entrada
+            do_cache = int((min(ate, fechado_ate) - max(desde, inicio)) / PASSOS[base])
+            novas = []
+            # Completa só as pontas que faltam, mantendo o intervalo guardado contínuo
+            if inicio < desde:
+               novas.append(self._ler(engine, chave, inicio, desde))
+            if fechado_ate > ate:
+               novas.append(self._ler(engine, chave, ate, fechado_ate))
+            if novas:
+               serie = pd.concat([serie] + novas, ignore_index=True)
+               desde, ate = min(desde, inicio), max(ate, fechado_ate)
+         with self._lock:
+            self._series[chave] = (desde, ate, serie, versao)
+         self.estatisticas["periodos_cache"] += max(do_cache, 0)
+         partes.append(serie[(serie["periodo"] >= inicio) & (serie["periodo"] < fechado_ate)])
+
+      # Períodos abertos: sempre do banco
+      if fim > limite:
+         partes.append(self._ler(engine, chave, max(inicio, limite), fim))
+      return pd.concat(partes, ignore_index=True), max(do_cache, 0)
+
+   def invalidar(self):
+      with self._lock:
+         self._series.clear()
+
+cache_tendencias = CacheTendencias()
+
+def calcular_janelas(serie: pd.DataFrame, metrica: str, indice: pd.DatetimeIndex, janela: int,
+                     periodos: int, chaves: list = None) -> pd.DataFrame:
+   """Média móvel e variação sobre o período anterior, numa passada vetorizada por todas as chaves.
+
+   Os períodos sem interações entram com zero (a média móvel é de `janela`
+   períodos, não de `janela` linhas). Sem `chaves`, entram as que têm
+   alguma interação no intervalo.
+   """
+   larga = serie.pivot_table(index="periodo", columns="chave", values=metrica, aggfunc="sum")
+   if chaves is not None:
+      larga = larga.reindex(columns=chaves)
+   larga = larga.reindex(indice).fillna(0).astype("int64")
+   larga.index.name = "periodo"
+   anterior = larga.shift(periodos)
+   resultado = pd.DataFrame({
+      "valor": larga.stack(),
+      "media_movel": larga.rolling(janela, min_periods=1).mean().stack(),
+      "valor_anterior": anterior.stack(),
+      "variacao": (larga - anterior).stack(),
+      "variacao_pct": (larga / anterior.replace(0, np.nan) - 1).stack(),
+   })
+   return resultado.reset_index()
+
+def tendencia(engine, granularidade: str = "dia", dimensao: str = "plataforma", metrica: str = "interacoes",
+              tipo_interacao: str = None, inicio=None, fim=None, ultimos: int = 30, janela: int = 7,
+              periodos: int = 1, cache: CacheTendencias = None, agora=None, nome: str = None) -> pd.DataFrame:
+   """Série temporal de uma métrica por hora, dia ou semana, com média móvel e variação.
+
+   Sem `inicio`/`fim`, retorna os `ultimos` períodos até o atual (ainda
+   aberto). Os períodos fechados vêm de `cache` (cache_tendencias); só os
+   abertos e os que faltam no cache são lidos do banco. `periodos` define a
+   comparação: 1 é o período anterior; 24 com `hora` ou 7 com `dia` comparam
+   com o mesmo período do dia/semana anterior.
+   """
+   if granularidade not in PASSOS:
+      raise ValueError(f"Granularidade inválida: '{granularidade}'. Use {', '.join(PASSOS)}")
+   if dimensao not in DIMENSOES:
+      raise ValueError(f"Dimensão inválida: '{dimensao}'. Use plataforma, conteudo ou None")
+   if metrica not in METRICAS:
+      raise ValueError(f"Métrica inválida: '{metrica}'. Use {', '.join(METRICAS)}")
+
+   cache = cache or cache_tendencias
+   agora = pd.Timestamp(agora) if agora is not None else pd.Timestamp.now()
+   passo = PASSOS[granularidade]
+   fim = inicio_periodo(fim, granularidade) if fim is not None else inicio_periodo(agora, granularidade) + passo
+   inicio = inicio_periodo(inicio, granularidade) if inicio is not None else fim - ultimos * passo
+   # Períodos anteriores ao início, só para a média móvel e a variação do começo da série
+   aquecimento = inicio - max(janela - 1, periodos) * passo
+
+   nome = nome or f"tendencia_{granularidade}_{dimensao or 'total'}"
+   with medir_relatorio(nome, engine) as medicao:
+      inicio_leitura = time.perf_counter()
+      base = GRANULARIDADE_BASE[granularidade]
+      serie, do_cache = cache.obter(engine, base, dimensao, tipo_interacao, aquecimento, fim, agora)
+      medicao["cache"] = do_cache > 0
+      if granularidade != base:
+         serie = serie.assign(periodo=inicio_periodo(serie["periodo"], granularidade))
+
+      indice = pd.date_range(aquecimento, fim - passo, freq=passo, name="periodo")
+      df = calcular_janelas(serie, metrica, indice, janela, periodos, chaves=None if dimensao else [0])
+      df = df[df["periodo"] >= inicio].reset_index(drop=True)
+
+      coluna, sql_nomes = DIMENSOES[dimensao]
+      if coluna:
+         with engine.connect() as conn:
+            nomes = pd.read_sql(text(sql_nomes), con=conn).astype({"chave": "int64"})
+         df = df.merge(nomes, on="chave", how="left").rename(columns={"chave": coluna, "nome": dimensao})
+         df = df[["periodo", dimensao, coluna, "valor", "media_movel", "valor_anterior", "variacao", "variacao_pct"]]
+      else:
+         df = df.drop(columns="chave")
+      registrar_resultado(medicao, df, inicio_leitura)
+   return df.rename(columns={"valor": metrica})
+
+def executar_tendencia(nome: str, engine=None, **opcoes) -> pd.DataFrame:
+   """Executa um relatório de TENDENCIAS; `opcoes` sobrepõe os argumentos padrão dele"""
+   if nome not in TENDENCIAS:
+      raise KeyError(f"Tendência não encontrada: {nome}")
+   return tendencia(engine or criar_engine_mysql(), nome=nome, **{**TENDENCIAS[nome], **opcoes})
+
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Relatórios de tendência por hora, dia ou semana")
+   parser.add_argument("nome", choices=sorted(TENDENCIAS))
+   parser.add_argument("--ultimos", type=int, default=30, help="Quantidade de períodos até o atual")
+   parser.add_argument("--inicio", help="Primeiro período (AAAA-MM-DD ou AAAA-MM-DD HH:MM)")
+   parser.add_argument("--fim", help="Período final, exclusivo")
+   parser.add_argument("--saida", help="Arquivo de saída (.csv, .parquet, .feather)")
+   args = parser.parse_args()
+
+   df = executar_tendencia(args.nome, ultimos=args.ultimos, inicio=args.inicio, fim=args.fim)
+   print(f"\n📈 {args.nome} ({len(df)} linhas):")
+   print(df.tail(20).to_string(index=False))
+   if args.saida:
+      from exportacao import salvar_resultado
+      salvar_resultado(df, args.saida)
+      print(f"\n💾 Salvo em: {args.saida}")
@@ -0,0 +1,72 @@
+# test_sketches.py
+# Uso: python -m pytest test_sketches.py
+import numpy as np
+import pandas as pd
+import pytest
+from sketches import (
+   CONTADORES_TOPK, ERRO_PADRAO_HLL, TODOS_CONTEUDOS, calcular_sketches, estimar_hll, _mesclar
+)
+
+SEMENTE = 20241001
+
+def _interacoes(id_usuario: np.ndarray, dias: int = 1) -> pd.DataFrame:
+   """Interações sintéticas de um conteúdo numa plataforma, espalhadas por `dias` dias"""
+   rng = np.random.default_rng(SEMENTE)
+   inicio = pd.Timestamp("2024-10-01")
+   return pd.DataFrame({
+      "id_usuario": id_usuario,
+      "id_conteudo": 1,
+      "id_plataforma": 1,
+      "data_interacao": inicio + pd.to_timedelta(rng.integers(0, dias * 86_400, len(id_usuario)), unit="s"),
+   })
+
+def _sketches_em_lotes(df: pd.DataFrame, lotes: int) -> pd.DataFrame:
+   """Linhas de sketch_diario como as cargas deixam: uma por lote e chave"""
+   limites = np.linspace(0, len(df), lotes + 1).astype(int)
+   return pd.concat([calcular_sketches(df.iloc[a:b]) for a, b in zip(limites[:-1], limites[1:])], ignore_index=True)
+
+@pytest.mark.parametrize("distintos", [300, 5_000, 100_000])
+def test_hll_dentro_do_erro_padrao(distintos):
+   rng = np.random.default_rng(SEMENTE)
+   ids = rng.choice(10_000_000, size=distintos, replace=False)
+   # Cada usuário aparece em média 3 vezes, em lotes e dias diferentes
+   df = _interacoes(rng.choice(ids, size=3 * distintos), dias=7)
+   exato = df["id_usuario"].nunique()
+
+   linhas = _sketches_em_lotes(df, lotes=5)
+   resultado, registradores, _ = _mesclar(linhas[linhas["id_conteudo"] == TODOS_CONTEUDOS].assign(grupo=0),
+                                          ["grupo"], com_contadores=False)
+   estimativa = estimar_hll(registradores)[0]
+
+   assert resultado["total_interacoes"].iloc[0] == len(df)
+   assert abs(estimativa - exato) / exato <= 3 * ERRO_PADRAO_HLL
+
+def test_hll_mesclado_igual_ao_de_um_lote():
+   rng = np.random.default_rng(SEMENTE)
+   df = _interacoes(rng.integers(1, 50_000, size=40_000), dias=3)
+   _, unico, _ = _mesclar(_sketches_em_lotes(df, lotes=1).assign(grupo=0), ["grupo"], com_contadores=False)
+   _, mesclado, _ = _mesclar(_sketches_em_lotes(df, lotes=7).assign(grupo=0), ["grupo"], com_contadores=False)
+   np.testing.assert_array_equal(unico, mesclado)
+
+@pytest.mark.parametrize("lotes", [1, 4, 12])
+def test_misra_gries_contem_contagem_exata(lotes):
+   rng = np.random.default_rng(SEMENTE)
+   # Distribuição concentrada: poucos usuários com muitas interações e uma cauda longa
+   df = _interacoes(rng.zipf(1.3, size=60_000) % 20_000, dias=5)
+   exatas = df["id_usuario"].value_counts()
+
+   linhas = _sketches_em_lotes(df, lotes)
+   linhas = linhas[linhas["id_conteudo"] == TODOS_CONTEUDOS]
+   _, _, contadores = _mesclar(linhas.assign(grupo=0), ["grupo"])
+   # O mesmo intervalo de usuarios_mais_engajados
+   erro_maximo = (int(linhas["total_interacoes"].sum()) - int(contadores["contagem"].sum())) // (CONTADORES_TOPK + 1)
+
+   assert len(contadores) <= CONTADORES_TOPK
+   minimas = contadores.set_index("id_usuario")["contagem"]
+   reais = exatas.reindex(minimas.index)
+   assert (minimas <= reais).all()
+   assert (reais <= minimas + erro_maximo).all()
+   # Quem passa de N / (K + 1) interações tem de estar no resumo
+   frequentes = exatas[exatas > len(df) / (CONTADORES_TOPK + 1)]
+   assert not frequentes.empty
+   assert set(frequentes.index) <= set(minimas.index)
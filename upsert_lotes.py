@@ -0,0 +1,93 @@
+# upsert_lotes.py
+import pandas as pd
+from sqlalchemy import text, bindparam
+
+TAMANHO_LOTE_PADRAO = 1000
+
+# SQLite antigo limita a 999 parâmetros por comando
+LIMITE_PARAMETROS_SQLITE = 999
+
+def _para_python(valor):
+   """Converte tipos numpy/pandas e NaN/NA em tipos nativos aceitos pelo driver"""
+   if valor is None or pd.isna(valor):
+      return None
+   return valor.item() if hasattr(valor, "item") else valor
+
+def _montar_upsert(dialeto: str, tabela: str, colunas: list, chaves: list, atualizar: list, qtd_linhas: int,
+                   somar: list = ()):
+   valores = ", ".join(
+      "(" + ", ".join(f":{col}_{i}" for col in colunas) + ")"
+      for i in range(qtd_linhas)
+   )
+   sql = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES {valores}"
+
+   if dialeto == "mysql":
+      # Sem colunas a atualizar, reaproveita a própria chave (mesmo padrão do carregamento original)
+      alvo = atualizar or ([] if somar else chaves)
+      sql += " ON DUPLICATE KEY UPDATE " + ", ".join(
+         [f"{col} = VALUES({col})" for col in alvo] + [f"{col} = {col} + VALUES({col})" for col in somar]
+      )
+   elif atualizar or somar:
+      sql += f" ON CONFLICT ({', '.join(chaves)}) DO UPDATE SET " + ", ".join(
+         [f"{col} = excluded.{col}" for col in atualizar] + [f"{col} = {tabela}.{col} + excluded.{col}" for col in somar]
+      )
+   else:
+      sql += f" ON CONFLICT ({', '.join(chaves)}) DO NOTHING"
+   return text(sql)
+
+def _filtrar_existentes(conn, tabela: str, linhas: list, chaves: list, atualizar: list) -> list:
+   """Remove do lote as linhas que já existem na tabela com os mesmos valores"""
+   chave = chaves[0]
+   colunas = [chave] + list(atualizar)
+   consulta = text(
+      f"SELECT {', '.join(colunas)} FROM {tabela} WHERE {chave} IN :valores"
+   ).bindparams(bindparam("valores", expanding=True))
+
+   valores = list({linha[chave] for linha in linhas})
+   existentes = {
+      tuple(registro) for registro in conn.execute(consulta, {"valores": valores})
+   }
+   return [linha for linha in linhas if tuple(linha[col] for col in colunas) not in existentes]
+
+def upsert_em_lotes(conn, tabela: str, linhas: list, chaves: list, atualizar: list = None,
+                    tamanho_lote: int = TAMANHO_LOTE_PADRAO, pular_existentes: bool = True,
+                    somar: list = None) -> int:
+   """Insere/atualiza `linhas` (lista de dicts) em lotes com VALUES de múltiplas linhas.
+
+   Colunas em `somar` são acumuladas (valor atual + novo) quando a chave já existe.
+   Retorna a quantidade de linhas efetivamente enviadas ao banco.
+   """
+   if not linhas:
+      return 0
+
+   atualizar = list(atualizar or [])
+   somar = list(somar or [])
+   # Acumular exige enviar todas as linhas, mesmo as que já existem
+   pular_existentes = pular_existentes and not somar
+   colunas = list(linhas[0].keys())
+   dialeto = conn.dialect.name
+
+   if dialeto == "sqlite":
+      tamanho_lote = min(tamanho_lote, max(1, LIMITE_PARAMETROS_SQLITE // len(colunas)))
+
+   linhas = [{col: _para_python(linha[col]) for col in colunas} for linha in linhas]
+
+   enviadas = 0
+   for inicio in range(0, len(linhas), tamanho_lote):
+      lote = linhas[inicio:inicio + tamanho_lote]
+
+      # A diferença só é feita por chave simples (todas as tabelas de dimensão do projeto)
+      if pular_existentes and len(chaves) == 1:
+         lote = _filtrar_existentes(conn, tabela, lote, chaves, atualizar)
+         if not lote:
+            continue
+
+      parametros = {
+         f"{col}_{i}": linha[col]
+         for i, linha in enumerate(lote)
+         for col in colunas
+      }
+      conn.execute(_montar_upsert(dialeto, tabela, colunas, chaves, atualizar, len(lote), somar), parametros)
+      enviadas += len(lote)
+
+   return enviadas
@@ -2,6 +2,8 @@
 import pandas as pd
 
 def validar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-   df = df.dropna(subset=["id_usuario", "id_conteudo", "plataforma"])
-   df = df[df["watch_duration_seconds"] >= 0]
-   return df
\ No newline at end of file
+   valido = df[["id_usuario", "id_conteudo", "plataforma"]].notna().all(axis=1)
+   # fillna(False): com tipos anuláveis (Int64) a comparação com nulo retorna <NA>
+   valido &= (df["watch_duration_seconds"] >= 0).fillna(False)
+   # Um único filtro; sem linhas inválidas, o próprio DataFrame é devolvido
+   return df if valido.all() else df[valido]
\ No newline at end of file